@@ -0,0 +1,589 @@
+"""Performance benchmark suite for analyzers, enhancers and the full pipeline.
+
+All cases run on deterministic synthetic images, so no dataset is needed.
+Each case reports latency percentiles, throughput and peak traced memory,
+and results are stored as JSON baselines that can be compared later.
+
+Usage (from the project root)::
+
+    python -m src.bench.benchmark_suite run --out bench/baseline.json
+    python -m src.bench.benchmark_suite run --large --filter analyzer/ codec/ --out bench/large.json
+    python -m src.bench.benchmark_suite run --resolutions 1 4 --filter enhancer/ --out bench/new.json
+    python -m src.bench.benchmark_suite compare bench/baseline.json bench/new.json --threshold 0.10
+    python -m src.bench.benchmark_suite denoise-quality --resolutions 1 4 --qualities 0 0.5 1
+    python -m src.bench.benchmark_suite run --filter codec/ --resolutions 1 4 12
+
+``codec/*`` cases are generated for every installed codec backend (see
+:mod:`src.main.image_codec`), so the same command compares them.
+
+A bare ``run`` uses 1 MP images and 3 repeats and takes minutes;
+``--large`` adds the 4, 12 and 24 MP sizes, which takes hours for the
+denoise cases, so combine it with ``--filter``.
+
+``compare`` exits with status 1 when any case regressed by more than the
+threshold (relative change of the median latency). Cases found in only one
+of the two files are listed as added or removed. ``denoise-quality``
+reports the latency and PSNR (against the exact mode) of the fast
+``DenoiseStrongEnhancer`` mode at several quality settings.
+
+Peak memory is measured with :mod:`tracemalloc` during one extra, untimed
+iteration. It covers NumPy allocations, which include all OpenCV outputs
+returned to Python, but not OpenCV-internal scratch buffers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.main.buffer_arena import ImageArena
+from src.main.distortion_analyser import DistortionAnalyzer, DistortionMetrics
+from src.main.distortion_component.analysis_frame import AnalysisFrame
+from src.main.distortion_component.blur_sharpness import BlurSharpnessAnalyzer
+from src.main.distortion_component.illumination_uniformity import IlluminationUniformityAnalyzer
+from src.main.distortion_component.noise_variance import NoiseVarianceAnalyzer
+from src.main.distortion_component.overexposure_ratio import OverExposureAnalyzer
+from src.main.enhancement import EnhancementConfig
+from src.main.enhancement_strategy import EnhancementPlanner
+from src.main.enhancers_denoise import DenoiseLightEnhancer, DenoiseStrongEnhancer, fast_nlm_parameters
+from src.main.enhancers_executor import apply_enhancement_plan
+from src.main.enhancers_sharpen_deblur import (
+    DeblurAggressiveEnhancer,
+    DeblurEnhancer,
+    SharpenLightEnhancer,
+    SharpenMediumEnhancer,
+)
+from src.main.enhancers_tone_localcontrast import CLAHEEnhancer, GammaAdjustEnhancer
+from src.main.image_codec import CodecConfig, available_backends, decode_image, get_codec
+from src.main.tiled_executor import apply_tiled
+
+# Defaults keep a bare ``run`` to a few minutes; the NLM/bilateral cases scale
+# linearly with image size, so the large sizes are opt-in (``--large``).
+DEFAULT_RESOLUTIONS_MP = (1.0,)
+LARGE_RESOLUTIONS_MP = (4.0, 12.0, 24.0)
+DEFAULT_REPEATS = 3
+
+# A case builder receives the synthetic BGR image and returns the callable to
+# time. Work that should not be measured (e.g. encoding a JPEG for a decode
+# case) belongs in the builder.
+CaseBuilder = Callable[[np.ndarray], Callable[[], Any]]
+
+
+@dataclass
+class BenchmarkCase:
+    """One benchmarked operation."""
+
+    group: str
+    name: str
+    build: CaseBuilder
+
+    @property
+    def case_id(self) -> str:
+        return f"{self.group}/{self.name}"
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing and memory statistics of one case at one resolution."""
+
+    case: str
+    megapixels: float
+    shape: List[int]
+    repeats: int
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    min_ms: float
+    images_per_s: float
+    megapixels_per_s: float
+    peak_mem_mb: float
+
+    @property
+    def key(self) -> str:
+        return result_key(self.case, self.megapixels)
+
+
+def result_key(case_id: str, megapixels: float) -> str:
+    return f"{case_id}@{megapixels:g}MP"
+
+
+# ---------------------------------------------------------------------------
+# Synthetic inputs
+# ---------------------------------------------------------------------------
+
+
+def synthetic_image(megapixels: float, seed: int = 0) -> np.ndarray:
+    """Deterministic 4:3 BGR test image resembling a lit, textured panel.
+
+    Combines a smooth illumination gradient, mid-frequency texture, a few
+    sharp edges, a saturated highlight and sensor-like noise, so that every
+    analyzer and enhancer has realistic work to do.
+    """
+
+    width = max(8, int(round(math.sqrt(megapixels * 1e6 * 4.0 / 3.0))))
+    height = max(6, int(round(width * 3.0 / 4.0)))
+    rng = np.random.default_rng(seed)
+
+    yy, xx = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = 90.0 + 80.0 * (xx / width) + 30.0 * np.sin(yy / max(1.0, height / 6.0))
+    texture = rng.normal(0.0, 1.0, size=(max(2, height // 16), max(2, width // 16))).astype(np.float32)
+    base += 12.0 * cv2.resize(texture, (width, height), interpolation=cv2.INTER_CUBIC)
+    base[(xx // max(1, width // 8)) % 2 == 0] += 25.0
+
+    img = np.repeat(base[..., None], 3, axis=2)
+    img *= np.array([0.9, 1.0, 1.1], dtype=np.float32)
+    cy, cx, r = height * 0.3, width * 0.7, min(height, width) * 0.08
+    img[(yy - cy) ** 2 + (xx - cx) ** 2 < r * r] = 255.0
+    img += rng.normal(0.0, 4.0, size=img.shape).astype(np.float32)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+# ---------------------------------------------------------------------------
+# Case registry
+# ---------------------------------------------------------------------------
+
+
+def _component_case(component_cls: type) -> CaseBuilder:
+    def build(img: np.ndarray) -> Callable[[], Any]:
+        component = component_cls()
+
+        def run() -> Any:
+            # Fresh frame per call so gray conversion / derivatives are timed
+            component.bind_frame(AnalysisFrame(img))
+            return component.analyze()
+
+        return run
+
+    return build
+
+
+_FAST_DENOISE = {"denoise_strong_mode": "fast"}
+_GUIDED_DENOISE = {"denoise_light_backend": "guided"}
+
+
+def _enhancer_case(enhancer_cls: type, strength: float, metadata: Optional[Dict[str, Any]] = None) -> CaseBuilder:
+    def build(img: np.ndarray) -> Callable[[], Any]:
+        enhancer = enhancer_cls(config=EnhancementConfig(metadata=dict(metadata or {})), strength=strength)
+
+        def run() -> Any:
+            enhancer.bind_image(image=img)
+            return enhancer.enhance()
+
+        return run
+
+    return build
+
+
+def _tiled_enhancer_case(enhancer_cls: type, strength: float) -> CaseBuilder:
+    def build(img: np.ndarray) -> Callable[[], Any]:
+        enhancer = enhancer_cls()
+        return lambda: apply_tiled(enhancer, img, strength)
+
+    return build
+
+
+def _jpeg_payload(img: np.ndarray) -> np.ndarray:
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+    if not ok:
+        raise RuntimeError("JPEG encoding failed")
+    return buf
+
+
+def _decode_case(backend: str, scale: int = 1) -> CaseBuilder:
+    def build(img: np.ndarray) -> Callable[[], Any]:
+        buf = _jpeg_payload(img)
+        return lambda: decode_image(buf, scale=scale, grayscale=scale > 1, backend=backend)
+
+    return build
+
+
+def _encode_case(backend: str) -> CaseBuilder:
+    def build(img: np.ndarray) -> Callable[[], Any]:
+        codec = get_codec(backend)
+        config = CodecConfig(backend=backend, jpeg_quality=92)
+        return lambda: codec.encode(img, ".jpg", config)
+
+    return build
+
+
+def _codec_cases() -> List[BenchmarkCase]:
+    """Decode/encode cases for every installed codec backend."""
+
+    cases = []
+    for backend in available_backends():
+        # Keep the historical case id for the default backend
+        suffix = "" if backend == "opencv" else f"_{backend}"
+        cases += [
+            BenchmarkCase("codec", f"decode_jpeg_q92{suffix}", _decode_case(backend)),
+            BenchmarkCase("codec", f"decode_jpeg_q92_gray_1of4{suffix}", _decode_case(backend, scale=4)),
+            BenchmarkCase("codec", f"encode_jpeg_q92{suffix}", _encode_case(backend)),
+        ]
+    return cases
+
+
+def _analyzer_case(img: np.ndarray) -> Callable[[], Any]:
+    analyzer = DistortionAnalyzer()
+
+    def run() -> Any:
+        analyzer.bind_image(image=img)
+        return analyzer.analyze()
+
+    return run
+
+
+def _pipeline_case(
+    sharpness: float,
+    noise: float,
+    illum: float,
+    *,
+    debug: bool = False,
+    arena: bool = False,
+    luminance: bool = False,
+) -> CaseBuilder:
+    def build(img: np.ndarray) -> Callable[[], Any]:
+        metrics = DistortionMetrics(
+            sharpness=sharpness,
+            noise_variance=noise,
+            illumination_uniformity=illum,
+            overexposure_ratio=0.0,
+        )
+        plan = EnhancementPlanner().build_plan(metrics)
+        buffers = ImageArena() if arena else None
+        return lambda: apply_enhancement_plan(img, plan, debug=debug, arena=buffers, luminance=luminance)
+
+    return build
+
+
+def default_cases() -> List[BenchmarkCase]:
+    """All registered benchmark cases."""
+
+    cases = _codec_cases() + [
+        BenchmarkCase("analyzer", "blur_sharpness", _component_case(BlurSharpnessAnalyzer)),
+        BenchmarkCase("analyzer", "noise_variance", _component_case(NoiseVarianceAnalyzer)),
+        BenchmarkCase("analyzer", "illumination_uniformity", _component_case(IlluminationUniformityAnalyzer)),
+        BenchmarkCase("analyzer", "overexposure_ratio", _component_case(OverExposureAnalyzer)),
+        BenchmarkCase("analyzer", "distortion_analyzer", _analyzer_case),
+        BenchmarkCase("enhancer", "denoise_light", _enhancer_case(DenoiseLightEnhancer, 0.5)),
+        BenchmarkCase("enhancer", "denoise_strong", _enhancer_case(DenoiseStrongEnhancer, 0.8)),
+        BenchmarkCase("enhancer", "denoise_light_tiled", _tiled_enhancer_case(DenoiseLightEnhancer, 0.5)),
+        BenchmarkCase("enhancer", "denoise_light_guided", _enhancer_case(DenoiseLightEnhancer, 0.5, _GUIDED_DENOISE)),
+        BenchmarkCase("enhancer", "denoise_strong_tiled", _tiled_enhancer_case(DenoiseStrongEnhancer, 0.8)),
+        BenchmarkCase("enhancer", "denoise_strong_fast", _enhancer_case(DenoiseStrongEnhancer, 0.8, _FAST_DENOISE)),
+        BenchmarkCase("enhancer", "sharpen_light", _enhancer_case(SharpenLightEnhancer, 0.5)),
+        BenchmarkCase("enhancer", "sharpen_medium", _enhancer_case(SharpenMediumEnhancer, 0.7)),
+        BenchmarkCase("enhancer", "deblur", _enhancer_case(DeblurEnhancer, 0.6)),
+        BenchmarkCase("enhancer", "deblur_aggressive", _enhancer_case(DeblurAggressiveEnhancer, 1.0)),
+        BenchmarkCase("enhancer", "gamma", _enhancer_case(GammaAdjustEnhancer, 0.2)),
+        BenchmarkCase("enhancer", "clahe", _enhancer_case(CLAHEEnhancer, 1.0)),
+        # One representative plan per sharpness level (see EnhancementPlanner)
+        BenchmarkCase("pipeline", "plan_clear", _pipeline_case(30.0, 0.1, 0.1)),
+        BenchmarkCase("pipeline", "plan_clear_arena", _pipeline_case(30.0, 0.1, 0.1, arena=True)),
+        BenchmarkCase("pipeline", "plan_slight_blur", _pipeline_case(20.0, 0.6, 0.1)),
+        BenchmarkCase("pipeline", "plan_moderate_blur", _pipeline_case(10.0, 0.6, 0.1)),
+        BenchmarkCase("pipeline", "plan_moderate_blur_op_by_op", _pipeline_case(10.0, 0.6, 0.1, debug=True)),
+        BenchmarkCase("pipeline", "plan_moderate_blur_luminance", _pipeline_case(10.0, 0.6, 0.1, luminance=True)),
+        BenchmarkCase("pipeline", "plan_heavy_blur", _pipeline_case(3.0, 0.2, 0.3)),
+    ]
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# Running and comparing
+# ---------------------------------------------------------------------------
+
+
+def measure(fn: Callable[[], Any], *, repeats: int, warmup: int = 1) -> Dict[str, Any]:
+    """Time ``fn`` and trace its peak memory; returns raw statistics."""
+
+    for _ in range(warmup):
+        fn()
+
+    latencies = []
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"latencies_s": latencies, "peak_bytes": peak}
+
+
+def run_benchmarks(
+    cases: Sequence[BenchmarkCase],
+    resolutions_mp: Sequence[float] = DEFAULT_RESOLUTIONS_MP,
+    *,
+    repeats: int = DEFAULT_REPEATS,
+    warmup: int = 1,
+    log: Optional[Callable[[str], None]] = print,
+) -> List[BenchmarkResult]:
+    """Run ``cases`` at each resolution and return their results."""
+
+    results: List[BenchmarkResult] = []
+    for mp in resolutions_mp:
+        img = synthetic_image(mp)
+        actual_mp = img.shape[0] * img.shape[1] / 1e6
+        for case in cases:
+            stats = measure(case.build(img), repeats=repeats, warmup=warmup)
+            lat_ms = np.asarray(stats["latencies_s"]) * 1e3
+            mean_s = float(lat_ms.mean()) / 1e3
+            result = BenchmarkResult(
+                case=case.case_id,
+                megapixels=float(mp),
+                shape=list(img.shape),
+                repeats=len(lat_ms),
+                mean_ms=float(lat_ms.mean()),
+                p50_ms=float(np.percentile(lat_ms, 50)),
+                p90_ms=float(np.percentile(lat_ms, 90)),
+                p99_ms=float(np.percentile(lat_ms, 99)),
+                min_ms=float(lat_ms.min()),
+                images_per_s=1.0 / mean_s if mean_s > 0 else float("inf"),
+                megapixels_per_s=actual_mp / mean_s if mean_s > 0 else float("inf"),
+                peak_mem_mb=stats["peak_bytes"] / 2**20,
+            )
+            results.append(result)
+            if log is not None:
+                log(
+                    f"{result.key:<45} p50={result.p50_ms:9.2f} ms  p99={result.p99_ms:9.2f} ms  "
+                    f"{result.megapixels_per_s:8.1f} MP/s  peak={result.peak_mem_mb:8.1f} MB"
+                )
+    return results
+
+
+@dataclass
+class DenoiseQualityResult:
+    """Fast vs exact ``DenoiseStrongEnhancer`` at one quality setting."""
+
+    megapixels: float
+    quality: float
+    search_window: int
+    chroma_factor: int
+    exact_ms: float
+    fast_ms: float
+    psnr_db: float
+
+    @property
+    def speedup(self) -> float:
+        return self.exact_ms / self.fast_ms if self.fast_ms > 0 else float("inf")
+
+
+def denoise_quality_report(
+    resolutions_mp: Sequence[float] = (1.0,),
+    qualities: Sequence[float] = (0.0, 0.25, 0.5, 0.75, 1.0),
+    *,
+    strength: float = 0.8,
+    repeats: int = 3,
+    log: Optional[Callable[[str], None]] = print,
+) -> List[DenoiseQualityResult]:
+    """Compare the fast strong-denoise mode against the exact mode.
+
+    PSNR is computed between the fast and the exact output, i.e. it measures
+    the approximation error, not the denoising quality itself.
+    """
+
+    results: List[DenoiseQualityResult] = []
+    for mp in resolutions_mp:
+        img = synthetic_image(mp)
+        exact = DenoiseStrongEnhancer()
+        exact_stats = measure(lambda: exact.apply(img, strength), repeats=repeats, warmup=0)
+        reference = exact.apply(img, strength)
+        exact_ms = float(np.median(exact_stats["latencies_s"])) * 1e3
+        for quality in qualities:
+            fast = DenoiseStrongEnhancer(
+                EnhancementConfig(metadata={"denoise_strong_mode": "fast", "denoise_strong_quality": quality})
+            )
+            stats = measure(lambda: fast.apply(img, strength), repeats=repeats, warmup=0)
+            search, factor = fast_nlm_parameters(fast.quality)
+            result = DenoiseQualityResult(
+                megapixels=float(mp),
+                quality=float(quality),
+                search_window=search,
+                chroma_factor=factor,
+                exact_ms=exact_ms,
+                fast_ms=float(np.median(stats["latencies_s"])) * 1e3,
+                psnr_db=float(cv2.PSNR(reference, fast.apply(img, strength))),
+            )
+            results.append(result)
+            if log is not None:
+                log(
+                    f"{mp:g}MP quality={quality:<5g} search={search:<3d} chroma/{factor}  "
+                    f"exact={result.exact_ms:9.2f} ms  fast={result.fast_ms:9.2f} ms  "
+                    f"x{result.speedup:5.1f}  PSNR={result.psnr_db:6.2f} dB"
+                )
+    return results
+
+
+def environment_info() -> Dict[str, Any]:
+    """Versions and host information stored alongside a baseline."""
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "opencv_threads": cv2.getNumThreads(),
+    }
+
+
+def save_results(results: Sequence[BenchmarkResult], path: Path) -> None:
+    """Write results and environment info as a JSON baseline."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "environment": environment_info(),
+        "results": {r.key: asdict(r) for r in results},
+    }
+    path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+
+def load_results(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Load the ``results`` mapping of a JSON baseline."""
+
+    return json.loads(path.read_text(encoding="utf-8"))["results"]
+
+
+@dataclass
+class Comparison:
+    key: str
+    baseline_ms: float
+    current_ms: float
+
+    @property
+    def change(self) -> float:
+        """Relative change of the median latency (positive = slower)."""
+
+        if self.baseline_ms <= 0:
+            return 0.0
+        return self.current_ms / self.baseline_ms - 1.0
+
+
+def compare_results(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    *,
+    metric: str = "p50_ms",
+) -> List[Comparison]:
+    """Pair cases present in both result sets (see :func:`unmatched_cases` for the rest)."""
+
+    return [
+        Comparison(key=key, baseline_ms=float(baseline[key][metric]), current_ms=float(current[key][metric]))
+        for key in sorted(set(baseline) & set(current))
+    ]
+
+
+def unmatched_cases(
+    baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]]
+) -> Tuple[List[str], List[str]]:
+    """Result keys only in ``current`` (added) and only in ``baseline`` (removed)."""
+
+    return sorted(set(current) - set(baseline)), sorted(set(baseline) - set(current))
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    cases = [c for c in default_cases() if not args.filter or any(f in c.case_id for f in args.filter)]
+    if not cases:
+        print("No benchmark cases match the filter.", file=sys.stderr)
+        return 2
+    resolutions = list(args.resolutions) + [mp for mp in LARGE_RESOLUTIONS_MP if args.large and mp not in args.resolutions]
+    results = run_benchmarks(cases, resolutions, repeats=args.repeats, warmup=args.warmup)
+    if args.out:
+        save_results(results, Path(args.out))
+        print(f"Saved: {args.out}")
+    return 0
+
+
+def _cmd_compare(args: argparse.Namespace) -> int:
+    baseline, current = load_results(Path(args.baseline)), load_results(Path(args.current))
+    comparisons = compare_results(baseline, current, metric=args.metric)
+    regressions = 0
+    for c in comparisons:
+        flag = ""
+        if c.change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif c.change < -args.threshold:
+            flag = "  improved"
+        print(f"{c.key:<45} {c.baseline_ms:9.2f} -> {c.current_ms:9.2f} ms  {c.change:+7.1%}{flag}")
+    added, removed = unmatched_cases(baseline, current)
+    for key in added:
+        print(f"{key:<45} added (not in baseline)")
+    for key in removed:
+        print(f"{key:<45} removed (not in current results)")
+    print(
+        f"{len(comparisons)} cases compared, {len(added)} added, {len(removed)} removed, "
+        f"{regressions} regression(s) above {args.threshold:.0%}."
+    )
+    return 1 if regressions else 0
+
+
+def _cmd_denoise_quality(args: argparse.Namespace) -> int:
+    results = denoise_quality_report(args.resolutions, args.qualities, repeats=args.repeats)
+    if args.out:
+        path = Path(args.out)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"environment": environment_info(), "results": [asdict(r) for r in results]}
+        path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"Saved: {args.out}")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run benchmarks and optionally save a JSON baseline.")
+    p_run.add_argument("--resolutions", type=float, nargs="+", default=list(DEFAULT_RESOLUTIONS_MP),
+                       help="Image sizes in megapixels (default: 1).")
+    p_run.add_argument("--large", action="store_true",
+                       help=f"Also run {', '.join(f'{mp:g}' for mp in LARGE_RESOLUTIONS_MP)} MP (slow: hours for all cases).")
+    p_run.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    p_run.add_argument("--warmup", type=int, default=1)
+    p_run.add_argument("--filter", nargs="*", default=[], help="Only run cases whose id contains any of these.")
+    p_run.add_argument("--out", help="Path of the JSON file to write.")
+    p_run.set_defaults(func=_cmd_run)
+
+    p_cmp = sub.add_parser("compare", help="Compare two JSON baselines.")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown treated as a regression.")
+    p_cmp.add_argument("--metric", default="p50_ms", choices=["p50_ms", "p90_ms", "p99_ms", "mean_ms", "min_ms"])
+    p_cmp.set_defaults(func=_cmd_compare)
+
+    p_dq = sub.add_parser("denoise-quality", help="Latency and PSNR of the fast strong-denoise mode.")
+    p_dq.add_argument("--resolutions", type=float, nargs="+", default=[1.0], help="Image sizes in megapixels.")
+    p_dq.add_argument("--qualities", type=float, nargs="+", default=[0.0, 0.25, 0.5, 0.75, 1.0])
+    p_dq.add_argument("--repeats", type=int, default=3)
+    p_dq.add_argument("--out", help="Path of the JSON file to write.")
+    p_dq.set_defaults(func=_cmd_denoise_quality)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,177 @@
+"""asyncio-native entry points for distortion analysis and enhancement.
+
+Decoding, analysis and enhancement are CPU bound and would block the event
+loop for hundreds of milliseconds per image. :class:`AsyncImageProcessor`
+offloads them to a bounded thread pool (OpenCV releases the GIL in its heavy
+kernels) and caps the number of in-flight images to bound memory usage::
+
+    processor = AsyncImageProcessor(max_workers=4, max_concurrency=8)
+    metrics = await processor.analyze_async("a.jpg")
+    plan = processor.planner.build_plan(metrics)
+    enhanced = await processor.enhance_async(img, plan)
+
+The module-level :func:`analyze_async` and :func:`enhance_async` use a shared
+default processor.
+
+Cancellation
+------------
+Cancelling an awaiting task cancels work that has not started yet. Work that
+is already running cannot be interrupted; its result is discarded and its
+concurrency slot is only released once it has actually finished, so the
+memory cap holds even under cancellation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional, TypeVar, Union
+
+import numpy as np
+
+from .distortion_analyser import DistortionAnalyzer, DistortionMetrics
+from .enhancement import ImageLike
+from .enhancement_strategy import EnhancementPlan, EnhancementPlanner
+from .enhancers_executor import apply_enhancement_plan
+
+if TYPE_CHECKING:
+    from .metrics_cache import MetricsCache
+
+T = TypeVar("T")
+
+ImageSource = Union[np.ndarray, str, Path]
+
+
+class AsyncImageProcessor:
+    """Bounded, awaitable wrapper around analysis and enhancement.
+
+    Parameters
+    ----------
+    max_workers:
+        Threads used to run decode and compute. ``None`` uses the
+        :class:`~concurrent.futures.ThreadPoolExecutor` default.
+    max_concurrency:
+        Maximum number of images queued or running at once; further callers
+        wait (without blocking the loop) for a free slot. Defaults to the
+        number of worker threads.
+    overexposure_threshold, scale, cache:
+        Forwarded to the :class:`DistortionAnalyzer` created per call.
+    planner:
+        Planner exposed as :attr:`planner` for building plans.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        overexposure_threshold: int = 250,
+        scale: int = 1,
+        cache: Optional["MetricsCache"] = None,
+        planner: Optional[EnhancementPlanner] = None,
+    ) -> None:
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="car-paint-async")
+        self._max_concurrency = max_concurrency or max_workers
+        # asyncio primitives are bound to one loop; keep one semaphore per loop
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._analyzer_options = {
+            "overexposure_threshold": overexposure_threshold,
+            "scale": scale,
+            "cache": cache,
+        }
+        self.planner = planner or EnhancementPlanner()
+
+    # ------------------------------------------------------------------
+    # Public coroutines
+    # ------------------------------------------------------------------
+    async def analyze_async(self, source: ImageSource) -> DistortionMetrics:
+        """Decode (if ``source`` is a path) and analyze an image off the loop."""
+
+        return await self._submit(self._analyze, source)
+
+    async def enhance_async(self, image: ImageLike, plan: EnhancementPlan) -> ImageLike:
+        """Apply ``plan`` to ``image`` off the loop."""
+
+        return await self._submit(apply_enhancement_plan, image, plan)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self, wait: bool = True) -> None:
+        """Shut down the worker threads."""
+
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def __aenter__(self) -> "AsyncImageProcessor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close(wait=False)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _analyze(self, source: ImageSource) -> DistortionMetrics:
+        analyzer = DistortionAnalyzer(**self._analyzer_options)
+        if isinstance(source, np.ndarray):
+            analyzer.bind_image(image=source)
+        else:
+            analyzer.bind_image(path=source)
+        return analyzer.analyze()
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self._max_concurrency)
+
+        await semaphore.acquire()
+        try:
+            cf: Future = self._executor.submit(fn, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+        # Release the slot when the work really ends, not when the awaiting
+        # task is cancelled, so running work keeps counting against the cap.
+        def release(_: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # loop already closed; nobody is waiting for the slot
+
+        cf.add_done_callback(release)
+        return await asyncio.wrap_future(cf, loop=loop)
+
+
+_default_processor: Optional[AsyncImageProcessor] = None
+_default_lock = threading.Lock()
+
+
+def default_processor() -> AsyncImageProcessor:
+    """Return the shared processor used by the module-level coroutines."""
+
+    global _default_processor
+    with _default_lock:
+        if _default_processor is None:
+            _default_processor = AsyncImageProcessor()
+        return _default_processor
+
+
+async def analyze_async(source: ImageSource) -> DistortionMetrics:
+    """Analyze an image (array or path) on the default processor."""
+
+    return await default_processor().analyze_async(source)
+
+
+async def enhance_async(image: ImageLike, plan: EnhancementPlan) -> ImageLike:
+    """Apply ``plan`` to ``image`` on the default processor."""
+
+    return await default_processor().enhance_async(image, plan)
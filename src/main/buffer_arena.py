@@ -0,0 +1,85 @@
+"""Reusable image buffers for allocation-free enhancement.
+
+With large images, every enhancement op allocating a fresh full-size
+output (plus its own temporaries) causes RSS spikes and page-fault
+overhead. Two kinds of reusable buffers remove this churn:
+
+- :class:`ImageArena` owns two full-size buffers that
+  ``apply_enhancement_plan(..., arena=...)`` ping-pongs between: each step
+  reads the previous step's buffer and writes into the other one. Create one
+  arena per worker; the image returned from a plan run lives in the arena
+  and is only valid until the next run that uses the same arena.
+- :func:`scratch_buffer` hands out per-thread temporaries (blurred copies,
+  colour-space conversions, ...) used by the enhancers when they are asked
+  to write into an ``out`` buffer.
+
+Buffers are reallocated only when the requested shape or dtype changes, so
+steady-state processing of same-sized images allocates nothing per image.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+Shape = Tuple[int, ...]
+
+
+def _fit(buf: Optional[np.ndarray], shape: Shape, dtype: np.dtype) -> np.ndarray:
+    if buf is not None and buf.shape == shape and buf.dtype == dtype:
+        return buf
+    return np.empty(shape, dtype=dtype)
+
+
+class ImageArena:
+    """Two ping-pong output buffers sized to the image being enhanced."""
+
+    def __init__(self) -> None:
+        self._slots: List[Optional[np.ndarray]] = [None, None]
+
+    def output_for(self, src: np.ndarray) -> np.ndarray:
+        """Return a buffer shaped like ``src`` that does not overlap it."""
+
+        for i, buf in enumerate(self._slots):
+            if buf is not None and np.may_share_memory(buf, src):
+                continue
+            self._slots[i] = _fit(buf, src.shape, src.dtype)
+            return self._slots[i]
+        raise ValueError("Source image overlaps both arena buffers.")
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buf.nbytes for buf in self._slots if buf is not None)
+
+    def release(self) -> None:
+        """Drop both buffers; they are reallocated on next use."""
+
+        self._slots = [None, None]
+
+
+class _ScratchBuffers(threading.local):
+    def __init__(self) -> None:
+        self.buffers: Dict[Hashable, np.ndarray] = {}
+
+
+_scratch = _ScratchBuffers()
+
+
+def scratch_buffer(key: Hashable, shape: Shape, dtype=np.uint8) -> np.ndarray:
+    """Return the calling thread's temporary buffer for ``key``.
+
+    The contents are undefined; callers must overwrite the buffer before
+    reading it and must not hold on to it after returning.
+    """
+
+    buf = _fit(_scratch.buffers.get(key), tuple(shape), np.dtype(dtype))
+    _scratch.buffers[key] = buf
+    return buf
+
+
+def release_scratch() -> None:
+    """Drop the calling thread's temporary buffers."""
+
+    _scratch.buffers.clear()
@@ -10,34 +10,60 @@ Supported distortion metrics
 - Noise level           : Global intensity variance
 - Illumination uneven   : U = σ_L / μ_L
 - Over-exposure         : Over-exposed pixel ratio
+
+All metrics can optionally be computed on a reduced-resolution luminance
+plane (``scale`` in {2, 4, 8}), which is much cheaper for large images.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, asdict, field
 from pathlib import Path
-from typing import Dict, Optional, Sequence, Union
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
+from .distortion_component.analysis_frame import SUPPORTED_SCALES, AnalysisFrame
 from .distortion_component.blur_sharpness import BlurSharpnessAnalyzer
 from .distortion_component.noise_variance import NoiseVarianceAnalyzer
 from .distortion_component.illumination_uniformity import (
     IlluminationUniformityAnalyzer,
 )
 from .distortion_component.overexposure_ratio import OverExposureAnalyzer
+from .distortion_component.tile_statistics import tile_edges, tile_mean_var, tile_sums
+from .instrumentation import timed
+
+if TYPE_CHECKING:
+    from .metrics_cache import FileIdentity, MetricsCache
 
 ImageLike = np.ndarray
 
+# Version stamp of the metric computation code. Bump whenever a change alters
+# metric values, so that persisted results (see metrics_cache) are invalidated.
+METRICS_VERSION = 1
+
+# File extensions picked up by directory-level analysis helpers
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".bmp"})
+
 
 @dataclass
 class DistortionMetrics:
-    """All supported distortion metrics for a single image."""
+    """All supported distortion metrics for a single image.
+
+    ``scale`` records the analysis reduction factor (1 = full resolution).
+    Laplacian variance depends on scale, so consumers such as
+    :class:`~.enhancement_strategy.SharpnessCriteria` need it to interpret
+    ``sharpness``. It is not part of :meth:`as_vector`.
+    """
 
     sharpness: float
     noise_variance: float
     illumination_uniformity: float
     overexposure_ratio: float
+    scale: int = 1
 
     def as_vector(self) -> np.ndarray:
         """Return metrics as a 1D numpy vector in a fixed order."""
@@ -58,6 +84,60 @@ class DistortionMetrics:
         return asdict(self)
 
 
+@dataclass
+class DistortionTileMaps:
+    """Per-tile distortion metrics on a ``(gy, gx)`` grid.
+
+    Each map has shape ``(gy, gx)``; ``row_edges`` / ``col_edges`` give the
+    tile boundaries in pixels of the analyzed (possibly reduced) plane.
+    """
+
+    sharpness: np.ndarray
+    noise_variance: np.ndarray
+    illumination_uniformity: np.ndarray
+    overexposure_ratio: np.ndarray
+    row_edges: np.ndarray
+    col_edges: np.ndarray
+    scale: int = 1
+
+    def as_stack(self) -> np.ndarray:
+        """Return the maps stacked as ``(4, gy, gx)`` in metric order."""
+
+        return np.stack(
+            [
+                self.sharpness,
+                self.noise_variance,
+                self.illumination_uniformity,
+                self.overexposure_ratio,
+            ]
+        )
+
+
+@dataclass
+class BatchAnalysisResult:
+    """Result of :meth:`DistortionAnalyzer.analyze_batch`.
+
+    Attributes
+    ----------
+    metrics:
+        ``(N, 4)`` float array in the column order of
+        :meth:`DistortionAnalyzer.metrics_names`. Rows of failed items are NaN.
+    errors:
+        Mapping from item index to an error message for failed items.
+    """
+
+    metrics: np.ndarray
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> np.ndarray:
+        """Boolean mask of items that were analyzed successfully."""
+
+        mask = np.ones(self.metrics.shape[0], dtype=bool)
+        mask[list(self.errors)] = False
+        return mask
+
+
 class DistortionAnalyzer:
     """High-level image distortion analyzer.
 
@@ -67,11 +147,35 @@ class DistortionAnalyzer:
     2. Bind an image via :meth:`bind_image`.
     3. Call :meth:`analyze` to compute all supported distortion metrics.
     4. Access metrics via :attr:`metrics` or :meth:`metrics_vector`.
+
+    Parameters
+    ----------
+    overexposure_threshold:
+        Intensity threshold passed to :class:`OverExposureAnalyzer`.
+    scale:
+        Analysis reduction factor (1, 2, 4 or 8). With ``scale > 1`` path
+        sources are decoded as reduced grayscale and all metrics are computed
+        on the 1/scale luminance plane.
+    cache:
+        Optional :class:`~.metrics_cache.MetricsCache`. Path-bound images are
+        looked up before decoding and stored after analysis.
     """
 
-    def __init__(self, *, overexposure_threshold: int = 250) -> None:
+    def __init__(
+        self,
+        *,
+        overexposure_threshold: int = 250,
+        scale: int = 1,
+        cache: Optional["MetricsCache"] = None,
+    ) -> None:
+        if scale not in SUPPORTED_SCALES:
+            raise ValueError(f"Unsupported analysis scale {scale!r}; expected one of {SUPPORTED_SCALES}.")
+        self._overexposure_threshold = overexposure_threshold
+        self._scale = scale
+        self._cache = cache
         self._image: Optional[ImageLike] = None
         self._image_path: Optional[Path] = None
+        self._frame: Optional[AnalysisFrame] = None
 
         # Component analyzers
         self._blur_analyzer = BlurSharpnessAnalyzer()
@@ -92,6 +196,7 @@ class DistortionAnalyzer:
 
         self._image = image
         self._image_path = Path(path) if path is not None else None
+        self._frame = None
         self._metrics = None
 
     @property
@@ -102,38 +207,287 @@ class DistortionAnalyzer:
             return self._image
         return self._image_path
 
+    @property
+    def scale(self) -> int:
+        """Analysis reduction factor (1 = full resolution)."""
+
+        return self._scale
+
+    @property
+    def frame(self) -> AnalysisFrame:
+        """Shared analysis frame of the bound image.
+
+        The image is decoded (and converted to grayscale) at most once per
+        binding; all component analyzers read from this frame.
+        """
+
+        if self._frame is None:
+            if self._image is None and self._image_path is None:
+                raise RuntimeError("No image bound. Call bind_image() first.")
+            self._frame = AnalysisFrame(self._image, path=self._image_path, scale=self._scale)
+        return self._frame
+
     # ------------------------------------------------------------------
     # Analysis
     # ------------------------------------------------------------------
     def analyze(self) -> DistortionMetrics:
-        """Run all component analyzers on the currently bound image."""
-
-        if self._image is not None:
-            img_arg = {"image": self._image}
-        elif self._image_path is not None:
-            img_arg = {"path": self._image_path}
-        else:
-            raise RuntimeError("No image bound. Call bind_image() first.")
+        """Run all component analyzers on the currently bound image.
 
-        # Propagate binding to all components
-        self._blur_analyzer.bind_image(**img_arg)
-        self._noise_analyzer.bind_image(**img_arg)
-        self._illum_analyzer.bind_image(**img_arg)
-        self._overexp_analyzer.bind_image(**img_arg)
+        With a cache configured, a path-bound image whose file and analyzer
+        configuration are unchanged is served without decoding.
+        """
 
-        blur_res = self._blur_analyzer.analyze()
-        noise_res = self._noise_analyzer.analyze()
-        illum_res = self._illum_analyzer.analyze()
-        overexp_res = self._overexp_analyzer.analyze()
+        cache_path = self._image_path if self._cache is not None and self._image is None else None
+        # Identify the file before decoding it, so a concurrent rewrite is never cached as current
+        identity = self._cache.identify(cache_path) if cache_path is not None else None
+        if identity is not None:
+            cached = self._cache.get(cache_path, self.cache_config(), identity=identity)
+            if cached is not None:
+                self._metrics = cached
+                return cached
+
+        frame = self.frame
+
+        # Share one decoded frame across all components
+        self._blur_analyzer.bind_frame(frame)
+        self._noise_analyzer.bind_frame(frame)
+        self._illum_analyzer.bind_frame(frame)
+        self._overexp_analyzer.bind_frame(frame)
+
+        with timed("analysis.sharpness"):
+            blur_res = self._blur_analyzer.analyze()
+        with timed("analysis.noise_variance"):
+            noise_res = self._noise_analyzer.analyze()
+        with timed("analysis.illumination_uniformity"):
+            illum_res = self._illum_analyzer.analyze()
+        with timed("analysis.overexposure_ratio"):
+            overexp_res = self._overexp_analyzer.analyze()
 
         self._metrics = DistortionMetrics(
             sharpness=blur_res.sharpness,
             noise_variance=noise_res.variance,
             illumination_uniformity=illum_res.uniformity,
             overexposure_ratio=overexp_res.ratio,
+            scale=self._scale,
         )
+        if identity is not None:
+            self._cache.put(cache_path, self.cache_config(), self._metrics, identity=identity)
         return self._metrics
 
+    def analyze_tiles(self, grid: Tuple[int, int] = (4, 4)) -> DistortionTileMaps:
+        """Compute local distortion maps of the bound image.
+
+        The image is split into ``grid = (gx, gy)`` tiles (columns, rows).
+        Integral images of the gray plane, of the Laplacian response and of
+        the over-exposure mask are built once per frame, after which each
+        tile's mean and variance cost O(1) regardless of the tile count.
+        The Laplacian is taken over the whole image, so tile borders see
+        their true neighbours rather than a crop border.
+        """
+
+        gx, gy = grid
+        frame = self.frame
+        gray = frame.gray
+        rows = tile_edges(gray.shape[0], int(gy))
+        cols = tile_edges(gray.shape[1], int(gx))
+        counts = np.diff(rows)[:, None] * np.diff(cols)[None, :]
+
+        _, lap_var = tile_mean_var(*frame.laplacian_integrals, rows, cols)
+        mean, var = tile_mean_var(*frame.gray_integrals, rows, cols)
+        std = np.sqrt(var)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            uniformity = np.where(mean == 0.0, np.where(std > 0, np.inf, 0.0), std / mean)
+        over = tile_sums(frame.overexposure_integral(self._overexposure_threshold), rows, cols) / counts
+
+        return DistortionTileMaps(
+            sharpness=lap_var,
+            noise_variance=var,
+            illumination_uniformity=uniformity,
+            overexposure_ratio=over,
+            row_edges=rows,
+            col_edges=cols,
+            scale=self._scale,
+        )
+
+    def analyze_batch(
+        self,
+        paths_or_arrays: Sequence[Union[ImageLike, str, Path]],
+        *,
+        workers: Optional[int] = None,
+        chunksize: Optional[int] = None,
+    ) -> BatchAnalysisResult:
+        """Analyze many images on a process pool.
+
+        Parameters
+        ----------
+        paths_or_arrays:
+            Image paths and/or in-memory images. Arrays are pickled to the
+            worker processes, so paths are preferred for large batches.
+        workers:
+            Number of worker processes. ``None`` uses ``os.cpu_count()``;
+            ``1`` (or less) analyzes in the calling process.
+        chunksize:
+            Items sent to a worker per task. Defaults to a value that gives
+            each worker about four chunks.
+
+        Failures (unreadable or corrupt files, ...) do not abort the batch;
+        they are reported per item in :attr:`BatchAnalysisResult.errors`.
+        The bound image and :attr:`metrics` of this analyzer are untouched.
+
+        With a cache configured, all path items are looked up in bulk first
+        and only misses are sent to the pool; new results are stored in one
+        transaction.
+        """
+
+        items = list(paths_or_arrays)
+        n = len(items)
+        out = np.full((n, len(self.metrics_names())), np.nan, dtype=float)
+        errors: Dict[int, str] = {}
+
+        todo = list(range(n))
+        identities: Dict[int, Optional["FileIdentity"]] = {}
+        if self._cache is not None:
+            path_idx = [i for i in todo if not isinstance(items[i], np.ndarray)]
+            # Captured before decoding and reused when storing the results
+            identities = {i: self._cache.identify(items[i]) for i in path_idx}
+            hit_idx = set()
+            lookups = self._cache.get_many(
+                [items[i] for i in path_idx], self.cache_config(), identities=[identities[i] for i in path_idx]
+            )
+            for i, metrics in zip(path_idx, lookups):
+                if metrics is not None:
+                    out[i] = metrics.as_vector()
+                    hit_idx.add(i)
+            todo = [i for i in todo if i not in hit_idx]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(int(workers), len(todo) or 1))
+        options = self._options()
+        args = [(items[i], options) for i in todo]
+
+        if workers == 1:
+            self._collect_batch(todo, map(_analyze_batch_item, args), out, errors)
+        else:
+            if chunksize is None:
+                chunksize = max(1, len(todo) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                self._collect_batch(todo, pool.map(_analyze_batch_item, args, chunksize=chunksize), out, errors)
+
+        if self._cache is not None:
+            fresh = [i for i in todo if i not in errors and not isinstance(items[i], np.ndarray)]
+            self._cache.put_many(
+                [(items[i], DistortionMetrics(*out[i].tolist(), scale=self._scale)) for i in fresh],
+                self.cache_config(),
+                identities=[identities[i] for i in fresh],
+            )
+        return BatchAnalysisResult(metrics=out, errors=errors)
+
+    def iter_analyze(
+        self,
+        directory: Union[str, Path],
+        *,
+        prefetch: int = 4,
+        recursive: bool = False,
+        skip_errors: bool = False,
+    ) -> Iterator[Tuple[Path, DistortionMetrics]]:
+        """Lazily analyze all images in ``directory``.
+
+        The directory is walked lazily (no full listing or sorting up front)
+        and up to ``prefetch`` images are decoded and analyzed concurrently
+        on a thread pool; OpenCV releases the GIL while decoding. Pairs of
+        ``(path, DistortionMetrics)`` are yielded in completion order.
+        Cache hits (if a cache is configured) are yielded without decoding.
+
+        Parameters
+        ----------
+        directory:
+            Directory to scan for files with an extension in
+            :data:`IMAGE_EXTENSIONS`.
+        prefetch:
+            Maximum number of images in flight.
+        recursive:
+            Whether to descend into sub-directories.
+        skip_errors:
+            Skip unreadable images instead of raising.
+        """
+
+        prefetch = max(1, int(prefetch))
+        paths = _iter_image_paths(Path(directory), recursive=recursive)
+        options = self._options()
+        cache_config = self.cache_config() if self._cache is not None else None
+        pool = ThreadPoolExecutor(max_workers=prefetch)
+        pending: Dict[Future, Tuple[Path, Optional["FileIdentity"]]] = {}
+        ready: Deque[Tuple[Path, DistortionMetrics]] = deque()
+
+        def submit_next() -> bool:
+            path = next(paths, None)
+            if path is None:
+                return False
+            identity = None
+            if cache_config is not None:
+                identity = self._cache.identify(path)
+                hit = self._cache.get(path, cache_config, identity=identity) if identity is not None else None
+                if hit is not None:
+                    ready.append((path, hit))
+                    return True
+            pending[pool.submit(_analyze_item, path, options)] = (path, identity)
+            return True
+
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and not ready and len(pending) < prefetch:
+                    exhausted = not submit_next()
+                while ready:
+                    yield ready.popleft()
+                if not pending:
+                    if exhausted:
+                        break
+                    continue
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    path, identity = pending.pop(fut)
+                    try:
+                        metrics = fut.result()
+                    except Exception:
+                        if skip_errors:
+                            continue
+                        raise
+                    if identity is not None:
+                        self._cache.put(path, cache_config, metrics, identity=identity)
+                    yield path, metrics
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def cache_config(self) -> str:
+        """Configuration stamp under which metrics are cached.
+
+        Changes whenever the metric code version, the over-exposure
+        threshold or the analysis scale changes, so cached entries written
+        under other settings are never returned.
+        """
+
+        return (
+            f"metrics=v{METRICS_VERSION};"
+            f"overexposure_threshold={self._overexposure_threshold};"
+            f"scale={self._scale}"
+        )
+
+    def _options(self) -> Dict[str, Any]:
+        """Constructor options used to recreate this analyzer in workers."""
+
+        return {"overexposure_threshold": self._overexposure_threshold, "scale": self._scale}
+
+    @staticmethod
+    def _collect_batch(indices: List[int], results, out: np.ndarray, errors: Dict[int, str]) -> None:
+        for idx, (vec, err) in zip(indices, results):
+            if err is None:
+                out[idx] = vec
+            else:
+                errors[idx] = err
+
     # ------------------------------------------------------------------
     # Metrics accessors
     # ------------------------------------------------------------------
@@ -166,3 +520,45 @@ class DistortionAnalyzer:
             "overexposure_ratio",
         ]
 
+
+def _iter_image_paths(
+    directory: Path, *, recursive: bool = False, exclude: Sequence[Path] = ()
+) -> Iterator[Path]:
+    """Yield image files below ``directory`` without materializing the listing.
+
+    Subdirectories resolving to one of ``exclude`` are not entered.
+    """
+
+    excluded = {Path(p).resolve() for p in exclude}
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive and not (excluded and Path(entry.path).resolve() in excluded):
+                        stack.append(Path(entry.path))
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    yield Path(entry.path)
+
+
+def _analyze_item(item: Union[ImageLike, str, Path], options: Dict[str, Any]) -> DistortionMetrics:
+    """Analyze one image with a private analyzer (safe to call from workers)."""
+
+    analyzer = DistortionAnalyzer(**options)
+    if isinstance(item, np.ndarray):
+        analyzer.bind_image(image=item)
+    else:
+        analyzer.bind_image(path=item)
+    return analyzer.analyze()
+
+
+def _analyze_batch_item(
+    args: Tuple[Union[ImageLike, str, Path], Dict[str, Any]],
+) -> Tuple[Optional[np.ndarray], Optional[str]]:
+    """Worker for :meth:`DistortionAnalyzer.analyze_batch` (module level for pickling)."""
+
+    item, options = args
+    try:
+        return _analyze_item(item, options).as_vector(), None
+    except Exception as exc:  # reported per item, never aborts the batch
+        return None, f"{type(exc).__name__}: {exc}"
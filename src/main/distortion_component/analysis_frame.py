@@ -0,0 +1,143 @@
+"""Shared per-image analysis frame for the distortion components.
+
+A frame decodes its image at most once and caches the grayscale plane as
+well as any derived quantities (Laplacian response, statistics, ...), so
+that several distortion components can analyze the same image without
+re-reading it from disk or re-converting it to grayscale.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+import cv2
+import numpy as np
+
+from ..image_codec import read_image
+from ..instrumentation import timed
+from .intensity_statistics import IntensityStatistics
+
+ImageLike = np.ndarray
+
+T = TypeVar("T")
+
+# Supported decode reduction factors
+SUPPORTED_SCALES = (1, 2, 4, 8)
+
+
+class AnalysisFrame:
+    """Decoded image plus lazily computed, cached derivatives.
+
+    Parameters
+    ----------
+    image:
+        BGR image (H, W, C) or grayscale image (H, W) already in memory.
+    path:
+        Path to an image file. When ``image`` is None, the image is decoded
+        in BGR format on first access.
+    scale:
+        Analysis reduction factor (1, 2, 4 or 8). With ``scale > 1`` and a
+        path source only the reduced grayscale plane is decoded, and
+        :attr:`image` returns that plane.
+    """
+
+    def __init__(
+        self,
+        image: Optional[ImageLike] = None,
+        *,
+        path: Optional[Union[str, Path]] = None,
+        scale: int = 1,
+    ) -> None:
+        if image is None and path is None:
+            raise ValueError("Either 'image' or 'path' must be provided to AnalysisFrame().")
+        if scale not in SUPPORTED_SCALES:
+            raise ValueError(f"Unsupported analysis scale {scale!r}; expected one of {SUPPORTED_SCALES}.")
+
+        self.scale = scale
+
+        self._image: Optional[ImageLike] = image
+        self._image_path: Optional[Path] = Path(path) if path is not None else None
+        self._gray: Optional[ImageLike] = None
+        self._cache: Dict[str, Any] = {}
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Path of the image, if the frame was created from a file."""
+
+        return self._image_path
+
+    @property
+    def image(self) -> ImageLike:
+        """Return the decoded image, reading it from disk on first access."""
+
+        if self._image is None:
+            with timed("analysis.decode"):
+                img = read_image(self._image_path, scale=self.scale, grayscale=self.scale > 1)
+            self._image = img
+            if self.scale > 1:
+                # Already the reduced luminance plane
+                self._gray = img
+        return self._image
+
+    @property
+    def gray(self) -> ImageLike:
+        """Grayscale plane of the image (at 1/scale), converted once and cached."""
+
+        if self._gray is None:
+            img = self.image  # a reduced decode fills the gray plane directly
+            if self._gray is None:
+                with timed("analysis.gray"):
+                    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+                    if self.scale > 1:
+                        # Match libjpeg's ceil(size / scale) output geometry
+                        h, w = gray.shape[:2]
+                        size = (-(-w // self.scale), -(-h // self.scale))
+                        gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+                self._gray = gray
+        return self._gray
+
+    @property
+    def laplacian(self) -> ImageLike:
+        """Laplacian response of the grayscale plane (``CV_64F``)."""
+
+        return self.cached("laplacian", lambda: cv2.Laplacian(self.gray, ddepth=cv2.CV_64F))
+
+    @property
+    def statistics(self) -> IntensityStatistics:
+        """Fused intensity statistics of the grayscale plane (single pass)."""
+
+        return self.cached("statistics", lambda: IntensityStatistics.from_gray(self.gray))
+
+    @property
+    def gray_integrals(self) -> Tuple[ImageLike, ImageLike]:
+        """``(sum, sqsum)`` integral images (``CV_64F``) of the grayscale plane."""
+
+        return self.cached(
+            "gray_integrals",
+            lambda: cv2.integral2(self.gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F),
+        )
+
+    @property
+    def laplacian_integrals(self) -> Tuple[ImageLike, ImageLike]:
+        """``(sum, sqsum)`` integral images (``CV_64F``) of the Laplacian response."""
+
+        return self.cached(
+            "laplacian_integrals",
+            lambda: cv2.integral2(self.laplacian, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F),
+        )
+
+    def overexposure_integral(self, threshold: float) -> ImageLike:
+        """Integral image of the ``gray >= threshold`` mask."""
+
+        return self.cached(
+            f"overexposure_integral:{threshold!r}",
+            lambda: cv2.integral((self.gray >= threshold).view(np.uint8)),
+        )
+
+    def cached(self, key: str, factory: Callable[[], T]) -> T:
+        """Return the derivative stored under ``key``, computing it once."""
+
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
@@ -14,9 +14,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Union
 
-import cv2
 import numpy as np
 
+from .analysis_frame import AnalysisFrame
+
 ImageLike = np.ndarray
 
 
@@ -37,8 +38,7 @@ class BlurSharpnessAnalyzer:
     """Analyze image blur using Laplacian variance as a sharpness metric."""
 
     def __init__(self) -> None:
-        self._image: Optional[ImageLike] = None
-        self._image_path: Optional[Path] = None
+        self._frame: Optional[AnalysisFrame] = None
         self._result: Optional[BlurSharpnessResult] = None
 
     # ------------------------------------------------------------------
@@ -60,22 +60,27 @@ class BlurSharpnessAnalyzer:
         if image is None and path is None:
             raise ValueError("Either 'image' or 'path' must be provided to bind_image().")
 
-        self._image = image
-        self._image_path = Path(path) if path is not None else None
+        self.bind_frame(AnalysisFrame(image, path=path))
+
+    def bind_frame(self, frame: AnalysisFrame) -> None:
+        """Bind a shared analysis frame (decoded image and cached derivatives)."""
+
+        self._frame = frame
         self._result = None
 
+    @property
+    def frame(self) -> AnalysisFrame:
+        """Return the bound analysis frame."""
+
+        if self._frame is None:
+            raise RuntimeError("No image bound. Call bind_image() first.")
+        return self._frame
+
     @property
     def image(self) -> ImageLike:
         """Return the bound image, loading from disk if necessary."""
 
-        if self._image is None:
-            if self._image_path is None:
-                raise RuntimeError("No image bound. Call bind_image() first.")
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
-            self._image = img
-        return self._image
+        return self.frame.image
 
     # ------------------------------------------------------------------
     # Analysis
@@ -83,13 +88,7 @@ class BlurSharpnessAnalyzer:
     def analyze(self) -> BlurSharpnessResult:
         """Run sharpness analysis on the currently bound image."""
 
-        img = self.image
-        if img.ndim == 3:
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = img
-
-        lap = cv2.Laplacian(gray, ddepth=cv2.CV_64F)
+        lap = self.frame.laplacian
         var_lap = float(lap.var())
         self._result = BlurSharpnessResult(sharpness=var_lap)
         return self._result
@@ -0,0 +1,112 @@
+"""Fused single-pass intensity statistics of a grayscale plane.
+
+The noise, illumination and over-exposure metrics are all first/second
+order statistics of the same grayscale plane. Instead of scanning the plane
+once per metric, a 256-bin histogram is computed in a single pass (for 8-bit
+images) and every statistic is derived from it:
+
+- mean      : Σ h[i] · i / N
+- variance  : Σ h[i] · (i - mean)² / N
+- count ≥ T : Σ_{i ≥ T} h[i]   (any threshold, without rescanning pixels)
+
+Planes with other depths fall back to a single mean/std pass; threshold
+counts then require scanning the plane.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import cv2
+import numpy as np
+
+ImageLike = np.ndarray
+
+# float32 histogram bins hold exact integer counts only up to 2**24, so
+# calcHist is run over row chunks of at most this many pixels.
+_EXACT_FLOAT32_COUNT = 1 << 24
+
+_LEVELS = np.arange(256, dtype=np.float64)
+
+
+def intensity_histogram(gray: ImageLike) -> np.ndarray:
+    """Return the exact 256-bin histogram (int64) of an 8-bit plane."""
+
+    hist = np.zeros(256, dtype=np.int64)
+    if gray.size == 0:
+        return hist
+
+    width = gray.shape[1] if gray.ndim > 1 else gray.shape[0]
+    rows_per_chunk = max(1, _EXACT_FLOAT32_COUNT // max(1, width))
+    for start in range(0, gray.shape[0], rows_per_chunk):
+        chunk = gray[start:start + rows_per_chunk]
+        hist += cv2.calcHist([chunk], [0], None, [256], [0, 256]).ravel().astype(np.int64)
+    return hist
+
+
+class IntensityStatistics:
+    """Mean, variance and threshold counts of a grayscale plane.
+
+    Use :meth:`from_gray` to build an instance; for 8-bit planes all
+    statistics come from one histogram pass.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        mean: float,
+        variance: float,
+        histogram: Optional[np.ndarray] = None,
+        gray: Optional[ImageLike] = None,
+    ) -> None:
+        self.count = int(count)
+        self.mean = float(mean)
+        self.variance = float(variance)
+        self.histogram = histogram
+        self._gray = gray
+        # tail[i] = number of pixels with intensity >= i (tail[256] == 0)
+        self._tail: Optional[np.ndarray] = None
+        if histogram is not None:
+            self._tail = np.concatenate([np.cumsum(histogram[::-1])[::-1], [0]])
+
+    @classmethod
+    def from_gray(cls, gray: ImageLike) -> "IntensityStatistics":
+        """Compute the statistics of ``gray`` in a single pass."""
+
+        count = int(gray.size)
+        if gray.dtype == np.uint8:
+            hist = intensity_histogram(gray)
+            if count == 0:
+                return cls(0, 0.0, 0.0, histogram=hist)
+            mean = float(hist @ _LEVELS) / count
+            variance = float(hist @ (_LEVELS - mean) ** 2) / count
+            return cls(count, mean, variance, histogram=hist)
+
+        if count == 0:
+            return cls(0, 0.0, 0.0, gray=gray)
+        mean, std = cv2.meanStdDev(gray)
+        return cls(count, float(mean[0, 0]), float(std[0, 0]) ** 2, gray=gray)
+
+    @property
+    def std(self) -> float:
+        """Standard deviation of the intensities."""
+
+        return math.sqrt(max(self.variance, 0.0))
+
+    def count_at_least(self, threshold: float) -> int:
+        """Number of pixels with intensity ``>= threshold``."""
+
+        if self._tail is not None:
+            idx = min(max(math.ceil(threshold), 0), 256)
+            return int(self._tail[idx])
+        if self._gray is None:
+            return 0
+        return int(np.count_nonzero(self._gray >= threshold))
+
+    def ratio_at_least(self, threshold: float) -> float:
+        """Fraction of pixels with intensity ``>= threshold``."""
+
+        if self.count == 0:
+            return 0.0
+        return float(self.count_at_least(threshold)) / float(self.count)
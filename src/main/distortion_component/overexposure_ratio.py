@@ -14,9 +14,10 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Union
 
-import cv2
 import numpy as np
 
+from .analysis_frame import AnalysisFrame
+
 ImageLike = np.ndarray
 
 
@@ -33,8 +34,7 @@ class OverExposureAnalyzer:
 
     def __init__(self, threshold: int = 250) -> None:
         self.threshold = threshold
-        self._image: Optional[ImageLike] = None
-        self._image_path: Optional[Path] = None
+        self._frame: Optional[AnalysisFrame] = None
         self._result: Optional[OverExposureResult] = None
 
     def bind_image(self, image: Optional[ImageLike] = None, *, path: Optional[Union[str, Path]] = None) -> None:
@@ -43,36 +43,31 @@ class OverExposureAnalyzer:
         if image is None and path is None:
             raise ValueError("Either 'image' or 'path' must be provided to bind_image().")
 
-        self._image = image
-        self._image_path = Path(path) if path is not None else None
+        self.bind_frame(AnalysisFrame(image, path=path))
+
+    def bind_frame(self, frame: AnalysisFrame) -> None:
+        """Bind a shared analysis frame (decoded image and cached derivatives)."""
+
+        self._frame = frame
         self._result = None
 
+    @property
+    def frame(self) -> AnalysisFrame:
+        """Return the bound analysis frame."""
+
+        if self._frame is None:
+            raise RuntimeError("No image bound. Call bind_image() first.")
+        return self._frame
+
     @property
     def image(self) -> ImageLike:
-        if self._image is None:
-            if self._image_path is None:
-                raise RuntimeError("No image bound. Call bind_image() first.")
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
-            self._image = img
-        return self._image
+        return self.frame.image
 
     def analyze(self) -> OverExposureResult:
         """Run over-exposure analysis on the bound image."""
 
-        img = self.image
-        if img.ndim == 3:
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = img
-
-        total = gray.size
-        if total == 0:
-            ratio = 0.0
-        else:
-            over = np.count_nonzero(gray >= self.threshold)
-            ratio = float(over) / float(total)
+        # Served from the frame's shared histogram; no extra pixel pass
+        ratio = self.frame.statistics.ratio_at_least(self.threshold)
 
         self._result = OverExposureResult(ratio=ratio, threshold=float(self.threshold))
         return self._result
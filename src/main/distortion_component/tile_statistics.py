@@ -0,0 +1,48 @@
+"""Per-tile statistics from integral images.
+
+Given the integral image ``S`` (and squared integral ``Q``) of a plane, the
+sum over any rectangle is obtained from four corner lookups, so the mean and
+variance of every tile in a grid cost O(1) each, independent of tile size:
+
+    sum(tile)  = S[y1, x1] - S[y0, x1] - S[y1, x0] + S[y0, x0]
+    mean       = sum / n
+    variance   = sum(Q) / n - mean²
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+
+def tile_edges(length: int, count: int) -> np.ndarray:
+    """Split ``length`` pixels into ``count`` near-equal tiles; return the edges."""
+
+    if count < 1 or count > length:
+        raise ValueError(f"Cannot split {length} pixels into {count} tiles.")
+    return np.linspace(0, length, count + 1).round().astype(np.intp)
+
+
+def tile_sums(integral: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Sum of the underlying plane over each tile of the (rows x cols) grid."""
+
+    y0, y1 = rows[:-1, None], rows[1:, None]
+    x0, x1 = cols[None, :-1], cols[None, 1:]
+    integral = integral.astype(np.float64, copy=False)
+    return integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+
+
+def tile_mean_var(
+    sum_integral: np.ndarray,
+    sqsum_integral: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-tile mean and (population) variance from ``cv2.integral2`` outputs."""
+
+    counts = np.diff(rows)[:, None] * np.diff(cols)[None, :]
+    mean = tile_sums(sum_integral, rows, cols) / counts
+    var = tile_sums(sqsum_integral, rows, cols) / counts - mean ** 2
+    # Clamp tiny negative values caused by floating point cancellation
+    return mean, np.maximum(var, 0.0)
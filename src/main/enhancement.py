@@ -100,6 +100,18 @@ class BaseImageEnhancer(ABC):
 
         return self._image_path
 
+    def _load_image(self) -> ImageLike:
+        """Return the bound image, reading it from :attr:`image_path` if needed."""
+
+        if self._image is None and self._image_path is None:
+            raise RuntimeError("No image bound. Call bind_image() first.")
+        if self._image is not None:
+            return self._image
+
+        from .image_codec import read_image
+
+        return read_image(self._image_path)
+
     # ------------------------------------------------------------------
     # Shared configuration (getters / setters)
     # ------------------------------------------------------------------
@@ -168,6 +180,83 @@ class BaseImageEnhancer(ABC):
 
         raise NotImplementedError
 
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
+        """Stateless form of :meth:`enhance`.
+
+        Runs the algorithm on ``image`` without binding it, using
+        ``strength`` instead of the instance's own strength when given.
+        Implementations must not modify instance state, so that a single
+        long-lived instance can serve many images and threads (see
+        ``enhancers_executor.EnhancerRegistry``).
+
+        When ``out`` is given (an array shaped like ``image`` that does not
+        overlap it), the result is written into it and returned, and
+        temporaries come from :func:`.buffer_arena.scratch_buffer`, so
+        repeated calls allocate nothing.
+        """
+
+        raise NotImplementedError(f"{type(self).__name__} does not support stateless apply().")
+
+    def lut(self, strength: Optional[float] = None) -> Optional[np.ndarray]:
+        """Lookup table of a pure per-pixel point operation.
+
+        Enhancers whose output pixel depends only on the input pixel value
+        (e.g. gamma curves) return their 256-entry ``uint8`` table here, so
+        consecutive point operations can be composed into a single
+        ``cv2.LUT`` pass (see :mod:`.point_ops`). Returns ``None`` for all
+        other enhancers.
+        """
+
+        return None
+
+    def kernel(self, strength: Optional[float] = None) -> Optional[np.ndarray]:
+        """Correlation kernel of a pure linear filter.
+
+        Enhancers that are exactly ``cv2.filter2D(image, -1, kernel)``
+        return their ``float32`` kernel here, so the plan compiler can fold
+        consecutive filters into one pass (see :mod:`.plan_compiler`).
+        Returns ``None`` for all other enhancers.
+        """
+
+        return None
+
+    def luminance_space(self) -> Optional[str]:
+        """Colour space in which the algorithm needs only the luminance plane.
+
+        Enhancers that only change brightness/detail return ``"any"`` when
+        :meth:`apply_luminance` works on the luma plane of either YCrCb or
+        LAB, or the one space they require (``"lab"``). The plan compiler
+        can then run consecutive such ops on a single plane between one pair
+        of colour conversions (see :mod:`.plan_compiler`). Returns ``None``
+        (the default) for enhancers that need all colour channels.
+        """
+
+        return None
+
+    def apply_luminance(
+        self, plane: np.ndarray, strength: Optional[float] = None, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Run the algorithm on a single ``H x W`` luminance plane.
+
+        Only called when :meth:`luminance_space` is not ``None``. The default
+        forwards to :meth:`apply`, which handles single-channel input for
+        most per-channel algorithms.
+        """
+
+        return self.apply(plane, strength) if out is None else self.apply(plane, strength, out)
+
+    def halo(self, strength: Optional[float] = None) -> Optional[int]:
+        """Spatial support radius of the algorithm, in pixels.
+
+        An output pixel must depend only on input pixels at most ``halo``
+        pixels away (0 for point operations), so the image can be split into
+        tiles overlapping by that margin and processed in parallel with the
+        same result (see :mod:`.tiled_executor`). ``None`` (the default)
+        marks the algorithm as non-local; it then always runs untiled.
+        """
+
+        return None
+
     def reset(self) -> None:
         """Reset internal state while keeping the current configuration.
 
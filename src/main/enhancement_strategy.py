@@ -10,11 +10,18 @@ from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum, auto
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import bisect
 import csv
+import math
+import threading
+import time
+
+import numpy as np
 
 from .distortion_analyser import DistortionMetrics
+from .instrumentation import timed
 
 # ---------------------------------------------------------------------------
 # Configuration constants
@@ -61,6 +68,7 @@ class SharpnessRule:
     lower_bound: float
     upper_bound: float
     description: str = ""
+    scale: int = 1
 
 
 class EnhancementOpType(Enum):
@@ -94,24 +102,152 @@ class EnhancementPlan:
 # ---------------------------------------------------------------------------
 
 
-class SharpnessCriteria:
-    """Loads and classifies sharpness scores based on a CSV file."""
+# Level codes used by the compiled interval index
+_LEVELS: Tuple[SharpnessLevel, ...] = tuple(SharpnessLevel)
+_LEVEL_CODES: Dict[SharpnessLevel, int] = {level: code for code, level in enumerate(_LEVELS)}
+_DEFAULT_CODE = _LEVEL_CODES[SharpnessLevel.HEAVY_BLUR]
+
+
+@dataclass(frozen=True)
+class _IntervalIndex:
+    """Rules of one scale compiled into elementary score cells.
+
+    With sorted unique bounds ``b[0] < ... < b[m-1]``, cell ``2i + 1`` is the
+    single point ``b[i]`` and cell ``2i`` the open interval ``(b[i-1], b[i])``
+    (cell ``0`` and ``2m`` are unbounded). Which rules contain a score does
+    not change inside a cell, so each cell stores the level the
+    narrowest-interval-first scan gives for any score in it.
+    """
+
+    breakpoints: np.ndarray
+    codes: np.ndarray
+    # Python copies of the arrays for fast scalar lookups
+    breakpoint_list: Tuple[float, ...]
+    code_list: Tuple[int, ...]
+
+    @classmethod
+    def compile(cls, rules: Sequence[SharpnessRule]) -> "_IntervalIndex":
+        bounds = sorted({b for r in rules for b in (r.lower_bound, r.upper_bound) if not math.isnan(b)})
+
+        def scan(score: float) -> int:
+            for rule in rules:
+                if rule.lower_bound <= score <= rule.upper_bound:
+                    return _LEVEL_CODES[rule.level]
+            return _DEFAULT_CODE
+
+        # One score inside every cell: each bound, and a value strictly between neighbours
+        inner = [math.nextafter(lo, hi) for lo, hi in zip(bounds, bounds[1:])]
+        samples = [-math.inf]
+        for i, bound in enumerate(bounds):
+            samples.append(bound)
+            samples.append(inner[i] if i < len(inner) else math.inf)
+        codes = [scan(x) for x in samples]
+        return cls(np.asarray(bounds, dtype=np.float64), np.asarray(codes, dtype=np.int8), tuple(bounds), tuple(codes))
+
+    def lookup(self, score: float) -> int:
+        if score != score:  # NaN
+            return _DEFAULT_CODE
+        bounds = self.breakpoint_list
+        i = bisect.bisect_left(bounds, score)
+        return self.code_list[2 * i + (i < len(bounds) and bounds[i] == score)]
+
+    def lookup_many(self, scores: np.ndarray) -> np.ndarray:
+        i = np.searchsorted(self.breakpoints, scores, side="left")
+        if self.breakpoints.size:
+            exact = self.breakpoints[np.minimum(i, self.breakpoints.size - 1)] == scores
+        else:
+            exact = np.zeros(scores.shape, dtype=bool)
+        codes = self.codes[2 * i + exact]
+        codes[np.isnan(scores)] = _DEFAULT_CODE
+        return codes
+
+
+@dataclass(frozen=True)
+class _CompiledCriteria:
+    """Everything loaded from one version of the CSV; swapped as a whole on reload."""
+
+    rules_by_scale: Dict[int, List[SharpnessRule]]
+    index_by_scale: Dict[int, _IntervalIndex]
+    # (st_mtime_ns, st_size) of the file that was loaded
+    signature: Tuple[int, int]
 
-    def __init__(self, csv_path: Path = SHARPNESS_CRITERIA_CSV) -> None:
+
+class SharpnessCriteria:
+    """Loads and classifies sharpness scores based on a CSV file.
+
+    The CSV may contain an optional ``Scale`` column (1, 2, 4 or 8) holding
+    bounds for sharpness scores measured at reduced analysis resolution.
+    Rows without a scale apply to full-resolution scores. The ratio between
+    full and reduced-resolution scores depends on how blurred the image is,
+    so there is no fixed conversion between scales: classifying at a scale
+    without dedicated rows raises :class:`ValueError`. Derive the rows from
+    paired scores with :func:`calibrate_scale_rules`.
+
+    On load, the rules of each scale are compiled into a sorted breakpoint
+    array (see :class:`_IntervalIndex`), so :meth:`classify` is a binary
+    search and :meth:`classify_many` a single ``np.searchsorted``.
+
+    The CSV is reloaded when its modification time or size changes, checked
+    at most once every ``reload_interval`` seconds (``None`` disables the
+    check; :meth:`reload` forces one). Replace the file atomically (write a
+    copy, then rename it) so that a half-written file is never read. If the
+    file disappears after a successful load, the loaded rules stay in use.
+    """
+
+    def __init__(
+        self,
+        csv_path: Path = SHARPNESS_CRITERIA_CSV,
+        *,
+        reload_interval: Optional[float] = 1.0,
+    ) -> None:
         self.csv_path = csv_path
-        self._rules: List[SharpnessRule] = []
-        self._loaded = False
+        self.reload_interval = reload_interval
+        self._compiled: Optional[_CompiledCriteria] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
 
     @property
     def rules(self) -> List[SharpnessRule]:
-        if not self._loaded:
-            self._load()
-        return self._rules
-
-    def _load(self) -> None:
-        if not self.csv_path.exists():
-            raise FileNotFoundError(f"Sharpness criteria CSV not found: {self.csv_path!s}")
-
+        """Full-resolution rules, narrowest interval first."""
+
+        return self.rules_for_scale(1)
+
+    def rules_for_scale(self, scale: int) -> List[SharpnessRule]:
+        """Rules declared for ``scale`` (empty if the CSV has none)."""
+
+        return self._current().rules_by_scale.get(int(scale), [])
+
+    def reload(self) -> bool:
+        """Reload the CSV if it changed since the last load; returns whether it did."""
+
+        with self._lock:
+            return self._reload_locked()
+
+    def _current(self) -> _CompiledCriteria:
+        compiled = self._compiled
+        if compiled is not None and (self.reload_interval is None or time.monotonic() < self._next_check):
+            return compiled
+        with self._lock:
+            if self._compiled is None or self.reload_interval is None or time.monotonic() >= self._next_check:
+                self._reload_locked()
+            return self._compiled  # type: ignore[return-value]
+
+    def _reload_locked(self) -> bool:
+        if self.reload_interval is not None:
+            self._next_check = time.monotonic() + self.reload_interval
+        try:
+            stat = self.csv_path.stat()
+        except FileNotFoundError:
+            if self._compiled is not None:
+                return False
+            raise FileNotFoundError(f"Sharpness criteria CSV not found: {self.csv_path!s}") from None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._compiled is not None and self._compiled.signature == signature:
+            return False
+        self._compiled = self._load(signature)
+        return True
+
+    def _load(self, signature: Tuple[int, int]) -> _CompiledCriteria:
         rules: List[SharpnessRule] = []
         with self.csv_path.open("r", newline="", encoding="utf-8-sig") as f:
             reader = csv.DictReader(f)
@@ -131,31 +267,126 @@ class SharpnessCriteria:
                 try:
                     lower = float(row["Lower_Bound"])
                     upper = float(row["Upper_Bound"])
+                    scale = int((row.get("Scale") or "").strip() or 1)
                 except (TypeError, ValueError) as exc:
                     raise ValueError(f"Invalid bounds in CSV row: {row!r}") from exc
 
-                desc = row.get("Description", "").strip()
-                rules.append(SharpnessRule(level=level, lower_bound=lower, upper_bound=upper, description=desc))
+                desc = (row.get("Description") or "").strip()
+                rules.append(
+                    SharpnessRule(level=level, lower_bound=lower, upper_bound=upper, description=desc, scale=scale)
+                )
 
         # Sort by interval width so that narrower ranges are matched first
         rules.sort(key=lambda r: (r.upper_bound - r.lower_bound, r.lower_bound))
 
-        self._rules = rules
-        self._loaded = True
+        by_scale: Dict[int, List[SharpnessRule]] = {}
+        for rule in rules:
+            by_scale.setdefault(rule.scale, []).append(rule)
+
+        index = {scale: _IntervalIndex.compile(scale_rules) for scale, scale_rules in by_scale.items()}
+        # Scales without rules (or a CSV without full-resolution rows) fall back to the default level
+        index.setdefault(1, _IntervalIndex.compile([]))
+        return _CompiledCriteria(by_scale, index, signature)
+
+    def _index_for(self, scale: int) -> _IntervalIndex:
+        """Compiled rules of ``scale``.
 
-    def classify(self, sharpness_score: float) -> SharpnessLevel:
+        Raises
+        ------
+        ValueError
+            If the CSV has no rows for ``scale``.
+        """
+
+        index = self._current().index_by_scale.get(int(scale))
+        if index is None:
+            raise ValueError(
+                f"No sharpness criteria for analysis scale {scale} in {self.csv_path}; "
+                "add rows with that Scale (see calibrate_scale_rules()) or analyze at scale 1."
+            )
+        return index
+
+    def classify(self, sharpness_score: float, scale: int = 1) -> SharpnessLevel:
         """Classify a sharpness score to a level.
 
         Strategy:
+        - Use the rules declared for ``scale`` (a :class:`ValueError` if
+          there are none).
         - Narrowest interval match wins.
         - If nothing matches, default to HEAVY_BLUR (conservative).
         """
 
-        for rule in self.rules:
-            if rule.lower_bound <= sharpness_score <= rule.upper_bound:
-                return rule.level
+        return _LEVELS[self._index_for(scale).lookup(float(sharpness_score))]
 
-        return SharpnessLevel.HEAVY_BLUR
+    def classify_many(self, sharpness_scores: np.ndarray, scale: int = 1) -> np.ndarray:
+        """Vectorized :meth:`classify` over an array of scores.
+
+        Returns an object array of :class:`SharpnessLevel` with the shape of
+        ``sharpness_scores``; use :meth:`classify_codes` for the integer
+        codes.
+        """
+
+        codes = self.classify_codes(sharpness_scores, scale)
+        # Index with a 1-d array so that 0-d input gives a 0-d array, not a bare level
+        return np.asarray(_LEVELS, dtype=object)[codes.reshape(-1)].reshape(codes.shape)
+
+    def classify_codes(self, sharpness_scores: np.ndarray, scale: int = 1) -> np.ndarray:
+        """Like :meth:`classify_many`, but returns ``int8`` indices into ``tuple(SharpnessLevel)``."""
+
+        index = self._index_for(scale)
+        scores = np.asarray(sharpness_scores, dtype=np.float64)
+        # lookup_many assigns into its result, which needs an array even for a scalar input
+        return index.lookup_many(np.atleast_1d(scores)).reshape(scores.shape)
+
+
+def calibrate_scale_rules(
+    full_scores: Sequence[float],
+    reduced_scores: Sequence[float],
+    scale: int,
+    rules: Sequence[SharpnessRule],
+) -> List[SharpnessRule]:
+    """Translate full-resolution ``rules`` into rules for ``scale``.
+
+    Takes paired sharpness scores of the same images analyzed at full and at
+    reduced resolution (covering the range from sharp to heavily blurred).
+    Every bound is mapped separately by interpolating between the pairs
+    sorted by full-resolution score, so the result follows however the
+    ratio between the two scores changes with blur. Bounds outside the
+    calibrated range are scaled by the ratio at the nearest end. Write the
+    returned rules to the CSV with their ``Scale``.
+    """
+
+    if scale <= 1:
+        raise ValueError("scale must be greater than 1 for calibration.")
+
+    full = np.asarray(full_scores, dtype=np.float64)
+    reduced = np.asarray(reduced_scores, dtype=np.float64)
+    if full.shape != reduced.shape or full.ndim != 1:
+        raise ValueError("full_scores and reduced_scores must be 1-d sequences of equal length.")
+    keep = (full > 0) & (reduced > 0) & np.isfinite(full) & np.isfinite(reduced)
+    if np.count_nonzero(keep) < 2:
+        raise ValueError("Need at least two positive score pairs to calibrate from.")
+    order = np.argsort(full[keep], kind="stable")
+    full, reduced = full[keep][order], reduced[keep][order]
+    # A sharper image must not map below a blurrier one
+    reduced = np.maximum.accumulate(reduced)
+
+    def convert(bound: float) -> float:
+        if bound <= full[0]:
+            return float(bound * reduced[0] / full[0])
+        if bound >= full[-1]:
+            return float(bound * reduced[-1] / full[-1])
+        return float(np.interp(bound, full, reduced))
+
+    return [
+        SharpnessRule(
+            level=rule.level,
+            lower_bound=convert(rule.lower_bound),
+            upper_bound=convert(rule.upper_bound),
+            description=rule.description,
+            scale=int(scale),
+        )
+        for rule in rules
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -169,13 +400,17 @@ class EnhancementPlanner:
     def __init__(self, criteria: Optional[SharpnessCriteria] = None) -> None:
         self.criteria = criteria or SharpnessCriteria()
 
-    def classify_sharpness(self, sharpness_score: float) -> SharpnessLevel:
-        return self.criteria.classify(sharpness_score)
+    def classify_sharpness(self, sharpness_score: float, scale: int = 1) -> SharpnessLevel:
+        return self.criteria.classify(sharpness_score, scale=scale)
 
     def build_plan(self, metrics: DistortionMetrics) -> EnhancementPlan:
         """Build an enhancement plan for the given distortion metrics."""
 
-        level = self.classify_sharpness(metrics.sharpness)
+        with timed("plan.build"):
+            return self._build_plan(metrics)
+
+    def _build_plan(self, metrics: DistortionMetrics) -> EnhancementPlan:
+        level = self.classify_sharpness(metrics.sharpness, scale=metrics.scale)
 
         # Heuristic proxies (can be replaced by explicit brightness/contrast metrics later)
         brightness_proxy = max(0.0, min(1.0, 1.0 - float(metrics.illumination_uniformity)))
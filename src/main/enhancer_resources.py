@@ -0,0 +1,75 @@
+"""Per-strength resource cache shared by the concrete enhancers.
+
+Enhancers derive small resources from their strength: convolution kernels,
+lookup tables, ``cv2.CLAHE`` objects. Building them on every call is wasted
+work in batch enhancement, so they are memoized here, keyed by the resource
+name and the *quantized* strength (see :func:`quantize_strength`):
+
+- :meth:`ResourceCache.shared` holds immutable resources (kernels, LUTs)
+  shared by all threads; arrays are marked read-only.
+- :meth:`ResourceCache.per_thread` holds stateful OpenCV objects such as
+  ``cv2.CLAHE`` that must not be used from several threads at once; each
+  thread gets its own instance.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+# Strength resolution of cached resources. Plans use strengths with at most
+# two decimals, so quantizing to 0.01 never changes their results.
+STRENGTH_QUANTUM = 0.01
+
+
+def quantize_strength(strength: float, quantum: float = STRENGTH_QUANTUM) -> float:
+    """Round ``strength`` to the cache resolution."""
+
+    return round(round(float(strength) / quantum) * quantum, 6)
+
+
+class ResourceCache:
+    """Memoizes enhancer resources by key."""
+
+    def __init__(self) -> None:
+        self._shared: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def shared(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """Return the immutable resource for ``key``, building it once."""
+
+        try:
+            return self._shared[key]
+        except KeyError:
+            pass
+        value = factory()
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+        with self._lock:
+            return self._shared.setdefault(key, value)
+
+    def per_thread(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """Return this thread's instance of the resource for ``key``."""
+
+        store = getattr(self._local, "store", None)
+        if store is None:
+            store = self._local.store = {}
+        if key not in store:
+            store[key] = factory()
+        return store[key]
+
+    def clear(self) -> None:
+        """Drop shared resources and the calling thread's instances."""
+
+        with self._lock:
+            self._shared.clear()
+        self._local.store = {}
+
+
+# Process-wide cache used by the enhancers in this package
+resource_cache = ResourceCache()
@@ -3,21 +3,38 @@
 This module provides two concrete enhancers:
 
 - DenoiseLightEnhancer  : light, edge-preserving denoising
-- DenoiseStrongEnhancer : stronger non-local means denoising
+- DenoiseStrongEnhancer : stronger non-local means denoising, with an
+  approximate luminance-only fast mode
 """
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Tuple
 
 import cv2
 import numpy as np
 
+from .buffer_arena import scratch_buffer
 from .enhancement import BaseImageEnhancer, EnhancementConfig, ImageLike
 
 
+_NLM_TEMPLATE_WINDOW = 7
+_NLM_SEARCH_WINDOW = 21
+
+
 class DenoiseLightEnhancer(BaseImageEnhancer):
-    """Light denoising using bilateral filtering.
+    """Light, edge-preserving denoising.
+
+    The backend is selected through ``config.metadata["denoise_light_backend"]``:
+
+    - ``"bilateral"`` (default): ``cv2.bilateralFilter`` with
+      ``sigmaColor = sigmaSpace = 25 * strength``. Its window radius is
+      ``1.5 * sigmaSpace``, so the cost grows with the square of the strength.
+    - ``"guided"``: self-guided filter (He et al.) built from box filters,
+      whose cost does not depend on the radius. The same sigmas map to
+      ``radius = max(1, round(0.3 * sigmaSpace))`` and
+      ``eps = (0.5 * sigmaColor) ** 2``, chosen to best match the bilateral
+      output on synthetic panels (about 42-55 dB PSNR).
 
     Parameters
     ----------
@@ -30,42 +47,145 @@ class DenoiseLightEnhancer(BaseImageEnhancer):
         self.strength = strength
 
     def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
-
-        img = self._image
-        if img is None:
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
+        return self.apply(self._load_image())
 
-        # Map strength to sigmaColor/sigmaSpace for bilateralFilter
-        s = max(0.1, min(1.0, float(self.strength)))
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
+        # Map strength to sigmaColor/sigmaSpace
+        s = max(0.1, min(1.0, float(self.strength if strength is None else strength)))
         sigma_color = 25 * s
         sigma_space = 25 * s
-        denoised = cv2.bilateralFilter(img, d=0, sigmaColor=sigma_color, sigmaSpace=sigma_space)
-        return denoised
+        if self.backend == "guided":
+            return _guided_filter(image, *guided_filter_parameters(sigma_color, sigma_space), out)
+        return cv2.bilateralFilter(image, d=0, sigmaColor=sigma_color, sigmaSpace=sigma_space, dst=out)
+
+    @property
+    def backend(self) -> str:
+        backend = str(self.metadata.get("denoise_light_backend", "bilateral"))
+        if backend not in ("bilateral", "guided"):
+            raise ValueError(f"Unknown denoise_light_backend {backend!r}; expected 'bilateral' or 'guided'.")
+        return backend
+
+    def halo(self, strength: Optional[float] = None) -> int:
+        s = max(0.1, min(1.0, float(self.strength if strength is None else strength)))
+        if self.backend == "guided":
+            # Two box filters of the guided radius in sequence
+            return 2 * guided_filter_parameters(25 * s, 25 * s)[0]
+        # With d=0, bilateralFilter uses a radius of round(1.5 * sigmaSpace)
+        return int(round(1.5 * 25 * s))
+
+
+def guided_filter_parameters(sigma_color: float, sigma_space: float) -> Tuple[int, float]:
+    """Guided-filter ``(radius, eps)`` matching bilateral sigmas."""
+
+    return max(1, int(round(0.3 * sigma_space))), (0.5 * sigma_color) ** 2
+
+
+def _guided_filter(image: np.ndarray, radius: int, eps: float, out: Optional[np.ndarray]) -> np.ndarray:
+    """Per-channel self-guided filter using four float32 work buffers."""
+
+    def buf(key: str) -> Optional[np.ndarray]:
+        return None if out is None else scratch_buffer(("guided", key), image.shape, np.float32)
+
+    ksize = (2 * radius + 1, 2 * radius + 1)
+    guide = buf("guide")
+    if guide is None:
+        guide = image.astype(np.float32)
+    else:
+        np.copyto(guide, image)
+    # cv2 arithmetic with a Python scalar only touches the first channel
+    eps4 = (eps, eps, eps, eps)
+
+    mean = cv2.boxFilter(guide, -1, ksize, dst=buf("mean"))
+    tmp = cv2.multiply(guide, guide, dst=buf("tmp"))
+    var = cv2.boxFilter(tmp, -1, ksize, dst=buf("var"))
+    cv2.multiply(mean, mean, dst=tmp)
+    cv2.subtract(var, tmp, dst=var)
+    cv2.add(var, eps4, dst=tmp)
+    a = cv2.divide(var, tmp, dst=var)
+    cv2.multiply(a, mean, dst=tmp)
+    b = cv2.subtract(mean, tmp, dst=mean)
+    mean_a = cv2.boxFilter(a, -1, ksize, dst=tmp)
+    mean_b = cv2.boxFilter(b, -1, ksize, dst=var)
+    cv2.multiply(mean_a, guide, dst=mean_a)
+    return cv2.add(mean_a, mean_b, dst=out, dtype=cv2.CV_8U)
 
 
 class DenoiseStrongEnhancer(BaseImageEnhancer):
-    """Stronger denoising using non-local means (fastNlMeansDenoisingColored)."""
+    """Stronger denoising using non-local means.
+
+    Two modes are selected through ``config.metadata``:
+
+    - ``"denoise_strong_mode": "exact"`` (default): full-resolution
+      ``fastNlMeansDenoisingColored`` with a 21x21 search window.
+    - ``"denoise_strong_mode": "fast"``: NLM on the LAB luminance only,
+      while the two chroma channels are denoised at reduced resolution and
+      upsampled. ``"denoise_strong_quality"`` in [0, 1] (default 0.5)
+      trades quality for latency: it sets the search window (7 at 0, 21
+      at 1) and downsamples chroma by 2 (quality >= 0.5) or 4.
+    """
 
     def __init__(self, config: Optional[EnhancementConfig] = None, strength: float = 0.8) -> None:
         super().__init__(config=config)
         self.strength = strength
 
     def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
-
-        img = self._image
-        if img is None:
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
+        return self.apply(self._load_image())
 
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
         # Map strength to the h parameter controlling filter strength
-        h = 10 * max(0.1, min(1.0, float(self.strength)))
-        denoised = cv2.fastNlMeansDenoisingColored(img, None, h, h, 7, 21)
-        return denoised
-
+        h = 10 * max(0.1, min(1.0, float(self.strength if strength is None else strength)))
+        if self.mode == "fast":
+            return _fast_nlm(image, h, self.quality, out)
+        return cv2.fastNlMeansDenoisingColored(image, out, h, h, _NLM_TEMPLATE_WINDOW, _NLM_SEARCH_WINDOW)
+
+    @property
+    def mode(self) -> str:
+        mode = str(self.metadata.get("denoise_strong_mode", "exact"))
+        if mode not in ("exact", "fast"):
+            raise ValueError(f"Unknown denoise_strong_mode {mode!r}; expected 'exact' or 'fast'.")
+        return mode
+
+    @property
+    def quality(self) -> float:
+        return max(0.0, min(1.0, float(self.metadata.get("denoise_strong_quality", 0.5))))
+
+    def halo(self, strength: Optional[float] = None) -> Optional[int]:
+        if self.mode == "fast":
+            # Chroma resampling depends on where tile edges fall; run untiled
+            return None
+        # Patches of the template window are compared across the search window
+        return _NLM_SEARCH_WINDOW // 2 + _NLM_TEMPLATE_WINDOW // 2
+
+
+def fast_nlm_parameters(quality: float) -> Tuple[int, int]:
+    """Search window and chroma downsampling factor for a quality in [0, 1]."""
+
+    search = 2 * int(round(3 + 7 * quality)) + 1
+    return search, 2 if quality >= 0.5 else 4
+
+
+def _fast_nlm(image: np.ndarray, h: float, quality: float, out: Optional[np.ndarray]) -> np.ndarray:
+    search, factor = fast_nlm_parameters(quality)
+    height, width = image.shape[:2]
+    small_size = (-(-width // factor), -(-height // factor))
+
+    def buf(key: str, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        # Temporaries come from scratch buffers when writing into ``out``
+        return None if out is None else scratch_buffer(("fast_nlm", key), shape)
+
+    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB, dst=buf("lab", image.shape))
+    luma = cv2.extractChannel(lab, 0, dst=buf("luma", (height, width)))
+    chroma = buf("chroma", (height, width, 2))
+    if chroma is None:
+        chroma = np.empty((height, width, 2), dtype=np.uint8)
+    cv2.mixChannels([lab], [chroma], [1, 0, 2, 1])
+
+    luma = cv2.fastNlMeansDenoising(luma, buf("luma_out", (height, width)), h, _NLM_TEMPLATE_WINDOW, search)
+    small = cv2.resize(chroma, small_size, dst=buf("small", small_size[::-1] + (2,)), interpolation=cv2.INTER_AREA)
+    small_search = max(_NLM_TEMPLATE_WINDOW, (search // factor) | 1)
+    small = cv2.fastNlMeansDenoising(small, buf("small_out", small.shape), h, _NLM_TEMPLATE_WINDOW, small_search)
+    chroma = cv2.resize(small, (width, height), dst=chroma, interpolation=cv2.INTER_LINEAR)
+
+    lab = cv2.insertChannel(luma, lab, 0)
+    cv2.mixChannels([chroma], [lab], [0, 1, 1, 2])
+    return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=out)
@@ -1,11 +1,28 @@
-"""Executor that maps EnhancementPlan to concrete BaseImageEnhancer instances."""
+"""Executor that maps EnhancementPlan to concrete BaseImageEnhancer instances.
+
+Op types are resolved through an :class:`EnhancerRegistry` holding one
+long-lived enhancer per :class:`EnhancementOpType`. Enhancers are invoked via
+their stateless :meth:`~.enhancement.BaseImageEnhancer.apply`, and memoize
+their per-strength resources (kernels, LUTs, CLAHE objects) in
+``enhancer_resources.resource_cache``, so batch enhancement does not pay
+construction costs per image and the registry is safe to use from several
+threads. :func:`apply_enhancement_batch` additionally groups a batch by
+:func:`plan_signature` so each distinct plan is compiled only once.
+"""
 
 from __future__ import annotations
 
-from typing import List
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
+from .buffer_arena import ImageArena
 from .enhancement import BaseImageEnhancer, ImageLike
-from .enhancement_strategy import EnhancementOpType, EnhancementPlan
+from .enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan
 from .enhancers_denoise import DenoiseLightEnhancer, DenoiseStrongEnhancer
 from .enhancers_sharpen_deblur import (
     DeblurAggressiveEnhancer,
@@ -14,51 +31,263 @@ from .enhancers_sharpen_deblur import (
     SharpenMediumEnhancer,
 )
 from .enhancers_tone_localcontrast import CLAHEEnhancer, GammaAdjustEnhancer
+from .instrumentation import timed
+from .plan_compiler import ExecutionProgram, compile_plan
+
+
+def _identity(strength: float) -> float:
+    return strength
+
+
+def _effective_strength(strength: Optional[float]) -> float:
+    # Ops without an explicit strength run at full strength
+    return strength or 1.0
+
+
+@dataclass(frozen=True)
+class RegisteredEnhancer:
+    """Registry entry: a shared enhancer and how op strengths map onto it."""
+
+    enhancer: BaseImageEnhancer
+    strength_map: Callable[[float], float] = _identity
+
+    def apply(self, image: ImageLike, strength: Optional[float], out: Optional[np.ndarray] = None) -> ImageLike:
+        strength = self.strength_map(_effective_strength(strength))
+        if out is None:
+            # Keeps enhancers written against the two-argument apply() working
+            return self.enhancer.apply(image, strength)
+        return self.enhancer.apply(image, strength, out)
+
+    def lut(self, strength: Optional[float]) -> Optional[np.ndarray]:
+        """Lookup table if the enhancer is a point operation, else ``None``."""
+
+        return self.enhancer.lut(self.strength_map(_effective_strength(strength)))
+
+    def kernel(self, strength: Optional[float]) -> Optional[np.ndarray]:
+        """Filter kernel if the enhancer is a pure linear filter, else ``None``."""
+
+        return self.enhancer.kernel(self.strength_map(_effective_strength(strength)))
+
+    def luminance_space(self) -> Optional[str]:
+        """Luminance space the enhancer can run in, else ``None``."""
+
+        return self.enhancer.luminance_space()
+
+    def apply_luminance(
+        self, plane: np.ndarray, strength: Optional[float], out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        return self.enhancer.apply_luminance(plane, self.strength_map(_effective_strength(strength)), out)
+
+
+class EnhancerRegistry:
+    """Maps :class:`EnhancementOpType` to long-lived enhancer instances.
+
+    Op types without a registered enhancer (e.g. ``MARK_AS_LOW_QUALITY``)
+    leave the image unchanged. New op types plug in via :meth:`register`.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[EnhancementOpType, RegisteredEnhancer] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        op_type: EnhancementOpType,
+        enhancer: BaseImageEnhancer,
+        *,
+        strength_map: Callable[[float], float] = _identity,
+    ) -> None:
+        """Register (or replace) the enhancer used for ``op_type``.
+
+        ``enhancer`` must implement the stateless ``apply()``.
+        ``strength_map`` converts the op strength into the enhancer's
+        strength (e.g. negation for ``GAMMA_DECREASE``).
+        """
+
+        with self._lock:
+            self._entries[op_type] = RegisteredEnhancer(enhancer, strength_map)
+
+    def unregister(self, op_type: EnhancementOpType) -> None:
+        with self._lock:
+            self._entries.pop(op_type, None)
+
+    def get(self, op_type: EnhancementOpType) -> Optional[RegisteredEnhancer]:
+        return self._entries.get(op_type)
+
+    def items(self) -> List[Tuple[EnhancementOpType, RegisteredEnhancer]]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def __contains__(self, op_type: EnhancementOpType) -> bool:
+        return op_type in self._entries
+
+    def apply(self, op: EnhancementOp, image: ImageLike, out: Optional[np.ndarray] = None) -> ImageLike:
+        """Apply a single op; unregistered op types are no-ops.
+
+        A no-op returns ``image`` itself, not ``out``.
+        """
 
+        entry = self._entries.get(op.type)
+        if entry is None:
+            return image
+        return entry.apply(image, op.strength, out)
 
-def _make_enhancer_for_op(op_type: EnhancementOpType, strength: float = 1.0) -> BaseImageEnhancer:
-    if op_type is EnhancementOpType.DENOISE_LIGHT:
-        return DenoiseLightEnhancer(strength=strength)
-    if op_type is EnhancementOpType.DENOISE_STRONG:
-        return DenoiseStrongEnhancer(strength=strength)
-    if op_type is EnhancementOpType.SHARPEN_LIGHT:
-        return SharpenLightEnhancer(strength=strength)
-    if op_type is EnhancementOpType.SHARPEN_MEDIUM:
-        return SharpenMediumEnhancer(strength=strength)
-    if op_type is EnhancementOpType.DEBLUR:
-        return DeblurEnhancer(strength=strength)
-    if op_type is EnhancementOpType.DEBLUR_AGGRESSIVE:
-        return DeblurAggressiveEnhancer(strength=strength)
-    if op_type is EnhancementOpType.GAMMA_INCREASE:
-        return GammaAdjustEnhancer(strength=abs(strength))
-    if op_type is EnhancementOpType.GAMMA_DECREASE:
-        return GammaAdjustEnhancer(strength=-abs(strength))
-    if op_type is EnhancementOpType.CLAHE:
-        return CLAHEEnhancer(strength=strength)
-    # MARK_AS_LOW_QUALITY and unknown ops: no-op enhancer
-    return _NoOpEnhancer()
-
-
-class _NoOpEnhancer(BaseImageEnhancer):
-    def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
-        if self._image is not None:
-            return self._image
-        import cv2
-
-        img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-        if img is None:
-            raise IOError(f"Failed to read image from {self._image_path!s}")
-        return img
-
-
-def apply_enhancement_plan(image: ImageLike, plan: EnhancementPlan) -> ImageLike:
-    """Apply all operations in an EnhancementPlan sequentially to an image."""
+
+def build_default_registry() -> EnhancerRegistry:
+    """Registry with the enhancers for all built-in op types."""
+
+    registry = EnhancerRegistry()
+    registry.register(EnhancementOpType.DENOISE_LIGHT, DenoiseLightEnhancer())
+    registry.register(EnhancementOpType.DENOISE_STRONG, DenoiseStrongEnhancer())
+    registry.register(EnhancementOpType.SHARPEN_LIGHT, SharpenLightEnhancer())
+    registry.register(EnhancementOpType.SHARPEN_MEDIUM, SharpenMediumEnhancer())
+    registry.register(EnhancementOpType.DEBLUR, DeblurEnhancer())
+    registry.register(EnhancementOpType.DEBLUR_AGGRESSIVE, DeblurAggressiveEnhancer())
+    registry.register(EnhancementOpType.GAMMA_INCREASE, GammaAdjustEnhancer(), strength_map=abs)
+    registry.register(EnhancementOpType.GAMMA_DECREASE, GammaAdjustEnhancer(), strength_map=lambda s: -abs(s))
+    registry.register(EnhancementOpType.CLAHE, CLAHEEnhancer())
+    # MARK_AS_LOW_QUALITY is intentionally unregistered: it does not touch pixels
+    return registry
+
+
+_default_registry: Optional[EnhancerRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def default_registry() -> EnhancerRegistry:
+    """Process-wide registry used when no registry is passed explicitly."""
+
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = build_default_registry()
+        return _default_registry
+
+
+def apply_enhancement_plan(
+    image: ImageLike,
+    plan: EnhancementPlan,
+    *,
+    registry: Optional[EnhancerRegistry] = None,
+    debug: bool = False,
+    arena: Optional[ImageArena] = None,
+    luminance: bool = False,
+    fuse_filters: bool = False,
+) -> ImageLike:
+    """Apply all operations in an EnhancementPlan to an image.
+
+    The plan is first compiled into an execution program (see
+    :mod:`.plan_compiler`): no-op entries are dropped and runs of point
+    operations are composed into one ``cv2.LUT`` pass. With ``debug=True``
+    the plan is run op by op instead, one ``enhance.<op>`` stage per entry,
+    so the two can be compared.
+
+    With an ``arena`` (one per worker), every step writes into one of the
+    arena's two buffers instead of allocating its output. ``image`` itself
+    is never modified, but the returned image lives in the arena and is
+    only valid until the next call using the same arena; copy it to keep
+    it.
+
+    ``luminance=True`` runs consecutive luminance-only ops (gamma,
+    sharpening, deblurring, CLAHE) on a single luma plane between one pair
+    of colour conversions. Chroma is then left untouched, so the result
+    differs from the default per-channel execution.
+
+    ``fuse_filters=True`` folds consecutive small linear filters into one
+    kernel. The intermediate image is then not saturated to ``uint8``, so
+    the result can differ from op-by-op execution at clipped pixels.
+    """
+
+    registry = registry or default_registry()
+    if not debug:
+        return compile_plan(plan, registry, fuse_filters=fuse_filters, luminance=luminance).run(image, arena=arena)
 
     result: ImageLike = image
     for op in plan.ops:
-        enhancer = _make_enhancer_for_op(op.type, strength=op.strength or 1.0)
-        enhancer.bind_image(image=result)
-        result = enhancer.enhance()
+        with timed(f"enhance.{op.type.name.lower()}"):
+            if op.type in registry:
+                result = registry.apply(op, result, None if arena is None else arena.output_for(result))
     return result
+
+
+PlanSignature = Tuple[Tuple[str, float], ...]
+
+
+def plan_signature(plan: EnhancementPlan) -> PlanSignature:
+    """Hashable key of the pixel operations in ``plan``.
+
+    Plans with equal signatures (same op types and strengths, in the same
+    order) produce the same output for the same input; the sharpness level
+    and quality penalty do not take part. Strengths are normalized the way
+    the registry applies them, so an op without a strength and the same op
+    at strength 1.0 share a signature.
+    """
+
+    return tuple((op.type.name, _effective_strength(op.strength)) for op in plan.ops)
+
+
+def apply_enhancement_batch(
+    images: Sequence[ImageLike],
+    plans: Sequence[EnhancementPlan],
+    *,
+    registry: Optional[EnhancerRegistry] = None,
+    workers: Optional[int] = None,
+    luminance: bool = False,
+    fuse_filters: bool = False,
+) -> List[ImageLike]:
+    """Apply ``plans[i]`` to ``images[i]`` for a whole batch.
+
+    Images are grouped by :func:`plan_signature`; each group's plan is
+    compiled once (which also fetches its LUTs and kernels from the resource
+    cache) and the group's images are then run back to back, so consecutive
+    work on a thread reuses the same program and scratch buffers. Per-thread
+    resources such as CLAHE objects are not created ahead of time; each
+    thread builds them on the first image that needs them.
+
+    Parameters
+    ----------
+    images, plans:
+        Equally long sequences; ``plans[i]`` is applied to ``images[i]``.
+    workers:
+        Number of worker threads. ``None`` uses ``os.cpu_count()``; ``1``
+        (or less) runs in the calling thread.
+    registry, luminance, fuse_filters:
+        As for :func:`apply_enhancement_plan`.
+
+    Returns
+    -------
+    list
+        Enhanced images in the order of ``images``.
+    """
+
+    if len(images) != len(plans):
+        raise ValueError(f"Got {len(images)} images but {len(plans)} plans.")
+    registry = registry or default_registry()
+
+    # Insertion-ordered: groups run in order of first appearance
+    groups: Dict[PlanSignature, List[int]] = {}
+    programs: Dict[PlanSignature, ExecutionProgram] = {}
+    for i, plan in enumerate(plans):
+        signature = plan_signature(plan)
+        if signature not in groups:
+            groups[signature] = []
+            programs[signature] = compile_plan(plan, registry, fuse_filters=fuse_filters, luminance=luminance)
+        groups[signature].append(i)
+
+    tasks = [(i, programs[signature]) for signature, indices in groups.items() for i in indices]
+    results: List[Optional[ImageLike]] = [None] * len(images)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        for i, program in tasks:
+            results[i] = program.run(images[i])
+        return results
+
+    def run(task: Tuple[int, ExecutionProgram]) -> None:
+        i, program = task
+        results[i] = program.run(images[i])
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        # map() submits in task order, so each group is worked on together
+        list(pool.map(run, tasks))
+    return results
@@ -8,7 +8,22 @@ from typing import Optional, Union
 import cv2
 import numpy as np
 
+from .buffer_arena import scratch_buffer
 from .enhancement import BaseImageEnhancer, EnhancementConfig, ImageLike
+from .enhancer_resources import quantize_strength, resource_cache
+
+
+def _gaussian_radius(sigma: float) -> int:
+    # Kernel size GaussianBlur derives for 8-bit images when ksize is (0, 0)
+    return (int(round(sigma * 3 * 2 + 1)) | 1) // 2
+
+
+def _unsharp_mask(image: np.ndarray, s: float, sigma: float, out: Optional[np.ndarray]) -> np.ndarray:
+    # Blurred copy goes to a reusable scratch buffer when writing into ``out``;
+    # keyed by ndim so luminance planes and BGR images keep separate buffers
+    blurred = None if out is None else scratch_buffer(("unsharp_blurred", image.ndim), image.shape, image.dtype)
+    blurred = cv2.GaussianBlur(image, (0, 0), sigmaX=sigma, dst=blurred)
+    return cv2.addWeighted(image, 1 + s, blurred, -s, 0, dst=out)
 
 
 class SharpenLightEnhancer(BaseImageEnhancer):
@@ -19,19 +34,17 @@ class SharpenLightEnhancer(BaseImageEnhancer):
         self.strength = strength
 
     def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
+        return self.apply(self._load_image())
+
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
+        s = max(0.1, min(1.0, float(self.strength if strength is None else strength)))
+        return _unsharp_mask(image, s, 1.0, out)
 
-        img = self._image
-        if img is None:
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
+    def halo(self, strength: Optional[float] = None) -> int:
+        return _gaussian_radius(1.0)
 
-        s = max(0.1, min(1.0, float(self.strength)))
-        blurred = cv2.GaussianBlur(img, (0, 0), sigmaX=1.0)
-        sharpened = cv2.addWeighted(img, 1 + s, blurred, -s, 0)
-        return sharpened
+    def luminance_space(self) -> str:
+        return "any"
 
 
 class SharpenMediumEnhancer(BaseImageEnhancer):
@@ -42,19 +55,21 @@ class SharpenMediumEnhancer(BaseImageEnhancer):
         self.strength = strength
 
     def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
+        return self.apply(self._load_image())
+
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
+        s = max(0.1, min(1.5, float(self.strength if strength is None else strength)))
+        return _unsharp_mask(image, s, 1.5, out)
 
-        img = self._image
-        if img is None:
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
+    def halo(self, strength: Optional[float] = None) -> int:
+        return _gaussian_radius(1.5)
 
-        s = max(0.1, min(1.5, float(self.strength)))
-        blurred = cv2.GaussianBlur(img, (0, 0), sigmaX=1.5)
-        sharpened = cv2.addWeighted(img, 1 + s, blurred, -s, 0)
-        return sharpened
+    def luminance_space(self) -> str:
+        return "any"
+
+
+def _laplacian_sharpen_kernel(center: float) -> np.ndarray:
+    return np.array([[0, -1, 0], [-1, center, -1], [0, -1, 0]], dtype=np.float32)
 
 
 class DeblurEnhancer(BaseImageEnhancer):
@@ -65,19 +80,20 @@ class DeblurEnhancer(BaseImageEnhancer):
         self.strength = strength
 
     def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
+        return self.apply(self._load_image())
+
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
+        return cv2.filter2D(image, -1, self.kernel(strength), dst=out)
 
-        img = self._image
-        if img is None:
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
+    def kernel(self, strength: Optional[float] = None) -> np.ndarray:
+        s = quantize_strength(max(0.1, min(1.0, float(self.strength if strength is None else strength))))
+        return resource_cache.shared(("deblur_kernel", s), lambda: _laplacian_sharpen_kernel(5 + s))
 
-        s = max(0.1, min(1.0, float(self.strength)))
-        kernel = np.array([[0, -1, 0], [-1, 5 + s, -1], [0, -1, 0]], dtype=np.float32)
-        deblurred = cv2.filter2D(img, -1, kernel)
-        return deblurred
+    def halo(self, strength: Optional[float] = None) -> int:
+        return 1
+
+    def luminance_space(self) -> str:
+        return "any"
 
 
 class DeblurAggressiveEnhancer(BaseImageEnhancer):
@@ -88,17 +104,17 @@ class DeblurAggressiveEnhancer(BaseImageEnhancer):
         self.strength = strength
 
     def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
+        return self.apply(self._load_image())
+
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
+        return cv2.filter2D(image, -1, self.kernel(strength), dst=out)
 
-        img = self._image
-        if img is None:
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
+    def kernel(self, strength: Optional[float] = None) -> np.ndarray:
+        s = quantize_strength(max(0.5, min(2.0, float(self.strength if strength is None else strength))))
+        return resource_cache.shared(("deblur_aggressive_kernel", s), lambda: _laplacian_sharpen_kernel(5 + 2 * s))
 
-        s = max(0.5, min(2.0, float(self.strength)))
-        kernel = np.array([[0, -1, 0], [-1, 5 + 2 * s, -1], [0, -1, 0]], dtype=np.float32)
-        deblurred = cv2.filter2D(img, -1, kernel)
-        return deblurred
+    def halo(self, strength: Optional[float] = None) -> int:
+        return 1
 
+    def luminance_space(self) -> str:
+        return "any"
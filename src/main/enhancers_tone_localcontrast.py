@@ -8,7 +8,10 @@ from typing import Optional, Union
 import cv2
 import numpy as np
 
+from .buffer_arena import scratch_buffer
 from .enhancement import BaseImageEnhancer, EnhancementConfig, ImageLike
+from .enhancer_resources import quantize_strength, resource_cache
+from .point_ops import apply_lut, table_from_curve
 
 
 class GammaAdjustEnhancer(BaseImageEnhancer):
@@ -23,49 +26,72 @@ class GammaAdjustEnhancer(BaseImageEnhancer):
         self.strength = strength
 
     def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
+        return self.apply(self._load_image())
 
-        img = self._image
-        if img is None:
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
+        return apply_lut(image, self.lut(strength), out)
 
+    def lut(self, strength: Optional[float] = None) -> np.ndarray:
         # Map strength in [-1, 1] to gamma in [0.5, 2.0]
-        s = max(-1.0, min(1.0, float(self.strength)))
-        if s >= 0:
-            gamma = 1.0 - 0.5 * s
-        else:
-            gamma = 1.0 - s  # s negative -> gamma > 1
+        s = quantize_strength(max(-1.0, min(1.0, float(self.strength if strength is None else strength))))
+        return resource_cache.shared(("gamma_lut", s), lambda: _gamma_table(s))
+
+    def halo(self, strength: Optional[float] = None) -> int:
+        return 0
+
+    def luminance_space(self) -> str:
+        return "any"
+
 
-        inv_gamma = 1.0 / gamma
-        table = np.array([(i / 255.0) ** inv_gamma * 255 for i in range(256)], dtype=np.uint8)
-        return cv2.LUT(img, table)
+def _gamma_table(s: float) -> np.ndarray:
+    if s >= 0:
+        gamma = 1.0 - 0.5 * s
+    else:
+        gamma = 1.0 - s  # s negative -> gamma > 1
+
+    inv_gamma = 1.0 / gamma
+    x = np.arange(256, dtype=np.float64) / 255.0
+    return table_from_curve(np.power(x, inv_gamma) * 255.0)
 
 
 class CLAHEEnhancer(BaseImageEnhancer):
-    """Local contrast enhancement using CLAHE in LAB color space."""
+    """Local contrast enhancement using CLAHE in LAB color space.
+
+    CLAHE's 8x8 tile grid is laid out over the whole image, so the result
+    is non-local and the enhancer keeps the default ``halo() -> None``.
+    Only the L channel is modified, so inside a luminance run the compiler
+    calls :meth:`apply_luminance` on the shared LAB plane directly.
+    """
 
     def __init__(self, config: Optional[EnhancementConfig] = None, strength: float = 1.0) -> None:
         super().__init__(config=config)
         self.strength = strength
 
     def enhance(self) -> ImageLike:
-        if self._image is None and self._image_path is None:
-            raise RuntimeError("No image bound. Call bind_image() first.")
-
-        img = self._image
-        if img is None:
-            img = cv2.imread(str(self._image_path), cv2.IMREAD_COLOR)
-            if img is None:
-                raise IOError(f"Failed to read image from {self._image_path!s}")
-
-        s = max(0.3, min(2.0, float(self.strength)))
-        lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=2.0 * s, tileGridSize=(8, 8))
-        cl = clahe.apply(l)
-        merged = cv2.merge((cl, a, b))
-        return cv2.cvtColor(merged, cv2.COLOR_LAB2BGR)
+        return self.apply(self._load_image())
 
+    def apply(self, image: ImageLike, strength: Optional[float] = None, out: Optional[np.ndarray] = None) -> ImageLike:
+        if out is None:
+            lab, l_in, l_out = None, None, None
+        else:
+            lab = scratch_buffer("clahe_lab", image.shape, image.dtype)
+            l_in = scratch_buffer("clahe_l_in", image.shape[:2], image.dtype)
+            l_out = scratch_buffer("clahe_l_out", image.shape[:2], image.dtype)
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB, dst=lab)
+        l_in = cv2.extractChannel(lab, 0, dst=l_in)
+        l_out = self.apply_luminance(l_in, strength, l_out)
+        lab = cv2.insertChannel(l_out, lab, 0)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=out)
+
+    def apply_luminance(
+        self, plane: np.ndarray, strength: Optional[float] = None, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        s = quantize_strength(max(0.3, min(2.0, float(self.strength if strength is None else strength))))
+        # cv2.CLAHE objects are stateful; one instance per thread and clip limit
+        clahe = resource_cache.per_thread(
+            ("clahe", s), lambda: cv2.createCLAHE(clipLimit=2.0 * s, tileGridSize=(8, 8))
+        )
+        return clahe.apply(plane, dst=out)
+
+    def luminance_space(self) -> str:
+        return "lab"
@@ -0,0 +1,362 @@
+"""Image decoding/encoding behind swappable codec backends.
+
+All image I/O in the project goes through this module instead of calling
+``cv2.imread``/``cv2.imwrite`` directly, so the backend and the encoding
+parameters are chosen in one place::
+
+    configure_codec(backend="auto", jpeg_quality=92)
+    image = read_image("a.jpg")                    # BGR uint8
+    gray = read_image("a.jpg", scale=4, grayscale=True)
+    image = decode_image(memoryview(payload))      # no temporary file
+    write_image("out/a.jpg", image)
+
+Backends
+--------
+- ``"opencv"`` (default): ``cv2.imdecode``/``cv2.imencode``; all formats.
+- ``"turbojpeg"``: `PyTurboJPEG <https://github.com/lilohuang/PyTurboJPEG>`_
+  (needs the libjpeg-turbo shared library).
+- ``"simplejpeg"``: `simplejpeg <https://gitlab.com/jfolz/simplejpeg>`_.
+- ``"auto"``: the first installed of turbojpeg, simplejpeg, opencv.
+
+The JPEG backends are optional; they are imported lazily and only handle
+JPEG data, delegating every other format to OpenCV. All backends return BGR
+(or single-channel grayscale) ``uint8`` arrays, and reduced decodes
+(``scale`` 2, 4 or 8) use libjpeg's DCT scaling with the
+``ceil(size / scale)`` output geometry of OpenCV's ``IMREAD_REDUCED_*``
+flags. Pixel values may differ by a few grey levels between backends
+(IDCT and chroma upsampling implementations differ).
+
+Files are read with ``numpy.fromfile`` and written with ``tofile``, which
+also works for paths that ``cv2.imread`` cannot open (e.g. non-ASCII paths
+on Windows).
+"""
+
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import cv2
+import numpy as np
+
+ImageData = Union[bytes, bytearray, memoryview, np.ndarray]
+
+SUPPORTED_SCALES = (1, 2, 4, 8)
+BACKENDS = ("opencv", "turbojpeg", "simplejpeg")
+# Preference order of backend="auto"
+_AUTO_ORDER = ("turbojpeg", "simplejpeg", "opencv")
+
+_JPEG_MAGIC = b"\xff\xd8\xff"
+_JPEG_EXTENSIONS = frozenset({".jpg", ".jpeg"})
+
+_REDUCED_FLAGS = {
+    (2, False): cv2.IMREAD_REDUCED_COLOR_2,
+    (4, False): cv2.IMREAD_REDUCED_COLOR_4,
+    (8, False): cv2.IMREAD_REDUCED_COLOR_8,
+    (2, True): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (4, True): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (8, True): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+@dataclass
+class CodecConfig:
+    """Process-wide codec settings (see :func:`configure_codec`)."""
+
+    backend: str = "opencv"
+    jpeg_quality: int = 95
+    png_compression: int = 3
+
+
+def _as_buffer(data: ImageData) -> np.ndarray:
+    """Zero-copy ``uint8`` view of encoded image data."""
+
+    if isinstance(data, np.ndarray):
+        return data.reshape(-1).view(np.uint8)
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def _is_jpeg(buf: np.ndarray) -> bool:
+    return buf.size >= 3 and bytes(buf[:3]) == _JPEG_MAGIC
+
+
+class ImageCodec(ABC):
+    """Interface of a codec backend."""
+
+    name = "base"
+
+    @abstractmethod
+    def decode(self, data: ImageData, *, scale: int = 1, grayscale: bool = False) -> Optional[np.ndarray]:
+        """Decode ``data``; returns ``None`` if it is not a readable image."""
+
+    @abstractmethod
+    def encode(self, image: np.ndarray, ext: str, config: CodecConfig) -> np.ndarray:
+        """Encode ``image`` in the format of extension ``ext`` (e.g. ``".jpg"``).
+
+        Returns the encoded bytes as a 1-D ``uint8`` array.
+        """
+
+
+class OpenCVCodec(ImageCodec):
+    """``cv2.imdecode``/``cv2.imencode``; supports every OpenCV format."""
+
+    name = "opencv"
+
+    def decode(self, data: ImageData, *, scale: int = 1, grayscale: bool = False) -> Optional[np.ndarray]:
+        if scale == 1:
+            flag = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+        else:
+            flag = _REDUCED_FLAGS[(scale, grayscale)]
+        return cv2.imdecode(_as_buffer(data), flag)
+
+    def encode(self, image: np.ndarray, ext: str, config: CodecConfig) -> np.ndarray:
+        ext = ext.lower()
+        if ext in _JPEG_EXTENSIONS:
+            params = [cv2.IMWRITE_JPEG_QUALITY, int(config.jpeg_quality)]
+        elif ext == ".png":
+            params = [cv2.IMWRITE_PNG_COMPRESSION, int(config.png_compression)]
+        else:
+            params = []
+        ok, buf = cv2.imencode(ext, image, params)
+        if not ok:
+            raise IOError(f"Failed to encode image as {ext!r}")
+        return buf.reshape(-1)
+
+
+class TurboJPEGCodec(OpenCVCodec):
+    """libjpeg-turbo through PyTurboJPEG for JPEG; OpenCV for other formats."""
+
+    name = "turbojpeg"
+
+    def __init__(self) -> None:
+        import turbojpeg
+
+        self._tj = turbojpeg
+        # TurboJPEG handles are not thread-safe; one per thread
+        self._local = threading.local()
+
+    def _handle(self) -> Any:
+        if not hasattr(self._local, "handle"):
+            self._local.handle = self._tj.TurboJPEG()
+        return self._local.handle
+
+    def decode(self, data: ImageData, *, scale: int = 1, grayscale: bool = False) -> Optional[np.ndarray]:
+        buf = _as_buffer(data)
+        if not _is_jpeg(buf):
+            return super().decode(buf, scale=scale, grayscale=grayscale)
+        pixel_format = self._tj.TJPF_GRAY if grayscale else self._tj.TJPF_BGR
+        try:
+            image = self._handle().decode(buf, pixel_format=pixel_format, scaling_factor=(1, scale))
+        except (OSError, ValueError):
+            return None
+        return image[:, :, 0] if grayscale and image.ndim == 3 else image
+
+    def encode(self, image: np.ndarray, ext: str, config: CodecConfig) -> np.ndarray:
+        if ext.lower() not in _JPEG_EXTENSIONS:
+            return super().encode(image, ext, config)
+        if image.ndim == 2:
+            payload = self._handle().encode(
+                image[:, :, None],
+                quality=int(config.jpeg_quality),
+                pixel_format=self._tj.TJPF_GRAY,
+                jpeg_subsample=self._tj.TJSAMP_GRAY,
+            )
+        else:
+            payload = self._handle().encode(image, quality=int(config.jpeg_quality), pixel_format=self._tj.TJPF_BGR)
+        return np.frombuffer(payload, dtype=np.uint8)
+
+
+class SimpleJPEGCodec(OpenCVCodec):
+    """simplejpeg (libjpeg-turbo) for JPEG; OpenCV for other formats."""
+
+    name = "simplejpeg"
+
+    def __init__(self) -> None:
+        import simplejpeg
+
+        self._sj = simplejpeg
+
+    def decode(self, data: ImageData, *, scale: int = 1, grayscale: bool = False) -> Optional[np.ndarray]:
+        buf = _as_buffer(data)
+        if not _is_jpeg(buf):
+            return super().decode(buf, scale=scale, grayscale=grayscale)
+        colorspace = "GRAY" if grayscale else "BGR"
+        try:
+            if scale == 1:
+                image = self._sj.decode_jpeg(buf, colorspace=colorspace)
+            else:
+                # simplejpeg picks the smallest DCT scaling >= the minimum size
+                height, width = self._sj.decode_jpeg_header(buf)[:2]
+                image = self._sj.decode_jpeg(
+                    buf, colorspace=colorspace, min_height=-(-height // scale), min_width=-(-width // scale)
+                )
+        except ValueError:
+            return None
+        return image[:, :, 0] if grayscale and image.ndim == 3 else image
+
+    def encode(self, image: np.ndarray, ext: str, config: CodecConfig) -> np.ndarray:
+        if ext.lower() not in _JPEG_EXTENSIONS:
+            return super().encode(image, ext, config)
+        if image.ndim == 2:
+            payload = self._sj.encode_jpeg(image[:, :, None], quality=int(config.jpeg_quality), colorspace="GRAY")
+        else:
+            payload = self._sj.encode_jpeg(
+                np.ascontiguousarray(image), quality=int(config.jpeg_quality), colorspace="BGR"
+            )
+        return np.frombuffer(payload, dtype=np.uint8)
+
+
+_BACKEND_CLASSES = {"opencv": OpenCVCodec, "turbojpeg": TurboJPEGCodec, "simplejpeg": SimpleJPEGCodec}
+
+codec_config = CodecConfig()
+_codecs: Dict[str, ImageCodec] = {}
+_codecs_lock = threading.Lock()
+
+
+def available_backends() -> List[str]:
+    """Names of the backends whose libraries are installed."""
+
+    names = []
+    for name in BACKENDS:
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_codec(backend: Optional[str] = None) -> ImageCodec:
+    """Codec instance for ``backend`` (default: :data:`codec_config`).
+
+    Raises
+    ------
+    ValueError
+        For an unknown backend name.
+    ImportError
+        If the backend's library is not installed.
+    """
+
+    name = backend or codec_config.backend
+    if name == "auto":
+        for candidate in _AUTO_ORDER:
+            try:
+                return get_codec(candidate)
+            except ImportError:
+                continue
+    if name not in _BACKEND_CLASSES:
+        raise ValueError(f"Unknown codec backend {name!r}; expected 'auto' or one of {BACKENDS}.")
+    with _codecs_lock:
+        if name not in _codecs:
+            _codecs[name] = _BACKEND_CLASSES[name]()
+        return _codecs[name]
+
+
+def configure_codec(
+    *,
+    backend: Optional[str] = None,
+    jpeg_quality: Optional[int] = None,
+    png_compression: Optional[int] = None,
+) -> CodecConfig:
+    """Update the process-wide codec settings and return them.
+
+    The backend is instantiated immediately, so a missing library fails
+    here rather than on the first image.
+    """
+
+    if backend is not None:
+        get_codec(backend)
+        codec_config.backend = backend
+    if jpeg_quality is not None:
+        if not 0 <= jpeg_quality <= 100:
+            raise ValueError("jpeg_quality must be in [0, 100]")
+        codec_config.jpeg_quality = int(jpeg_quality)
+    if png_compression is not None:
+        if not 0 <= png_compression <= 9:
+            raise ValueError("png_compression must be in [0, 9]")
+        codec_config.png_compression = int(png_compression)
+    return codec_config
+
+
+def decode_image(
+    data: ImageData, *, scale: int = 1, grayscale: bool = False, backend: Optional[str] = None
+) -> np.ndarray:
+    """Decode an in-memory encoded image (bytes, memoryview or ``uint8`` array).
+
+    ``scale`` > 1 decodes at ``1/scale`` resolution; ``grayscale`` returns
+    a single-channel image.
+
+    Raises
+    ------
+    IOError
+        If the data cannot be decoded.
+    """
+
+    image = _decode(data, scale, grayscale, backend)
+    if image is None:
+        raise IOError("Failed to decode image data")
+    return image
+
+
+def read_image(
+    path: Union[str, Path], *, scale: int = 1, grayscale: bool = False, backend: Optional[str] = None
+) -> np.ndarray:
+    """Read and decode the image file at ``path`` (see :func:`decode_image`).
+
+    Raises
+    ------
+    IOError
+        If the file is missing or cannot be decoded.
+    """
+
+    try:
+        data = np.fromfile(str(path), dtype=np.uint8)
+    except OSError as exc:
+        raise IOError(f"Failed to read image from {path!s}") from exc
+    image = _decode(data, scale, grayscale, backend)
+    if image is None:
+        raise IOError(f"Failed to read image from {path!s}")
+    return image
+
+
+def _decode(data: ImageData, scale: int, grayscale: bool, backend: Optional[str]) -> Optional[np.ndarray]:
+    if scale not in SUPPORTED_SCALES:
+        raise ValueError(f"Unsupported decode scale {scale!r}; expected one of {SUPPORTED_SCALES}.")
+    buf = _as_buffer(data)
+    if buf.size == 0:
+        return None
+    return get_codec(backend).decode(buf, scale=scale, grayscale=grayscale)
+
+
+def encode_image(
+    image: np.ndarray, ext: str, *, backend: Optional[str] = None, config: Optional[CodecConfig] = None
+) -> np.ndarray:
+    """Encode ``image`` for extension ``ext``; returns a 1-D ``uint8`` array.
+
+    ``config`` overrides the encoding parameters of :data:`codec_config`
+    (its ``backend`` field is ignored; use ``backend``).
+    """
+
+    return get_codec(backend).encode(image, ext, config or codec_config)
+
+
+def write_image(
+    path: Union[str, Path],
+    image: np.ndarray,
+    *,
+    backend: Optional[str] = None,
+    config: Optional[CodecConfig] = None,
+) -> None:
+    """Encode ``image`` in the format given by ``path``'s extension and write it.
+
+    Raises
+    ------
+    IOError
+        If the image cannot be encoded or written.
+    """
+
+    path = Path(path)
+    encode_image(image, path.suffix, backend=backend, config=config).tofile(str(path))
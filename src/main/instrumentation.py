@@ -0,0 +1,208 @@
+"""Opt-in per-stage timing instrumentation.
+
+Analysis and enhancement code wraps its stages in :func:`timed`. While no
+collector is enabled this is a no-op; after :func:`enable_instrumentation`,
+every stage records its wall time and thread CPU time into a
+:class:`TimingCollector`, which keeps per-stage call counters, totals and
+latency histograms and can export them as JSON or Prometheus text format::
+
+    collector = enable_instrumentation()
+    analyzer.bind_image(path="a.jpg")
+    analyzer.analyze()
+    collector.write_prometheus("metrics/car_paint.prom")
+
+Stage names in use
+------------------
+- ``analysis.decode`` / ``analysis.gray``: image decode and gray conversion
+- ``analysis.<metric>``: each component inside ``DistortionAnalyzer.analyze``
+- ``plan.build``: ``EnhancementPlanner.build_plan``
+- ``enhance.<op>``: each op inside ``apply_enhancement_plan``
+- ``pipeline.<stage>``: each stage call of a ``staged_pipeline.StagedPipeline``
+
+Stages may nest (decode usually runs inside the first metric that needs the
+image); an outer stage's time includes its inner stages. CPU time is that of
+the calling thread, so work OpenCV spreads over its own thread pool shows up
+in wall time but only partially in CPU time.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Sequence, Union
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRIC_PREFIX = "car_paint_stage"
+
+
+class StageStats:
+    """Counters and wall-time histogram of one stage."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.count = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_wall_seconds = 0.0
+        # Non-cumulative counts; the last slot is the +Inf overflow bucket
+        self.bucket_counts: List[int] = [0] * (len(self.buckets) + 1)
+
+    def add(self, wall_s: float, cpu_s: float) -> None:
+        self.count += 1
+        self.wall_seconds += wall_s
+        self.cpu_seconds += cpu_s
+        self.max_wall_seconds = max(self.max_wall_seconds, wall_s)
+        self.bucket_counts[bisect.bisect_left(self.buckets, wall_s)] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        cumulative = []
+        running = 0
+        for count in self.bucket_counts:
+            running += count
+            cumulative.append(running)
+        return {
+            "count": self.count,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "mean_wall_seconds": self.wall_seconds / self.count if self.count else 0.0,
+            "max_wall_seconds": self.max_wall_seconds,
+            "histogram": {
+                **{f"{b:g}": c for b, c in zip(self.buckets, cumulative)},
+                "+Inf": cumulative[-1],
+            },
+        }
+
+
+class TimingCollector:
+    """Thread-safe collector of per-stage wall and CPU times."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._stages: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, wall_s: float, cpu_s: float) -> None:
+        """Add one observation for ``stage``."""
+
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats(self.buckets)
+            stats.add(wall_s, cpu_s)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage ``name``."""
+
+        wall0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall0, time.thread_time() - cpu0)
+
+    def reset(self) -> None:
+        """Drop all recorded observations."""
+
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage statistics as plain dictionaries."""
+
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in sorted(self._stages.items())}
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+    def to_json(self) -> str:
+        return json.dumps({"stages": self.snapshot()}, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Render all stages in the Prometheus text exposition format."""
+
+        snap = self.snapshot()
+        wall = f"{METRIC_PREFIX}_wall_seconds"
+        cpu = f"{METRIC_PREFIX}_cpu_seconds_total"
+        lines = [
+            f"# HELP {wall} Wall time per pipeline stage.",
+            f"# TYPE {wall} histogram",
+        ]
+        for name, stats in snap.items():
+            label = f'stage="{_escape_label(name)}"'
+            for le, count in stats["histogram"].items():
+                lines.append(f'{wall}_bucket{{{label},le="{le}"}} {count}')
+            lines.append(f"{wall}_sum{{{label}}} {stats['wall_seconds']!r}")
+            lines.append(f"{wall}_count{{{label}}} {stats['count']}")
+        lines += [
+            f"# HELP {cpu} Thread CPU time per pipeline stage.",
+            f"# TYPE {cpu} counter",
+        ]
+        for name, stats in snap.items():
+            lines.append(f'{cpu}{{stage="{_escape_label(name)}"}} {stats["cpu_seconds"]!r}')
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Union[str, Path]) -> None:
+        _atomic_write(Path(path), self.to_json())
+
+    def write_prometheus(self, path: Union[str, Path]) -> None:
+        """Write Prometheus text format, e.g. for the node_exporter textfile collector."""
+
+        _atomic_write(Path(path), self.to_prometheus())
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Global opt-in switch
+# ---------------------------------------------------------------------------
+
+_active: Optional[TimingCollector] = None
+_NULL_CONTEXT = nullcontext()
+
+
+def enable_instrumentation(collector: Optional[TimingCollector] = None) -> TimingCollector:
+    """Start recording stage timings into ``collector`` (or a new one)."""
+
+    global _active
+    _active = collector or TimingCollector()
+    return _active
+
+
+def disable_instrumentation() -> None:
+    """Stop recording; :func:`timed` becomes a no-op again."""
+
+    global _active
+    _active = None
+
+
+def active_collector() -> Optional[TimingCollector]:
+    """The collector currently recording, if any."""
+
+    return _active
+
+
+def timed(stage: str) -> ContextManager[None]:
+    """Context manager timing ``stage`` if instrumentation is enabled."""
+
+    collector = _active
+    if collector is None:
+        return _NULL_CONTEXT
+    return collector.stage(stage)
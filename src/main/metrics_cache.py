@@ -0,0 +1,280 @@
+"""Persistent on-disk cache of distortion metrics.
+
+Entries are stored in a SQLite database and keyed by the file identity
+(absolute path, size, mtime and an optional content hash) together with an
+analyzer configuration stamp (metric code version, over-exposure threshold,
+analysis scale). An entry is only returned when both still match, so
+changed files and changed analyzer settings never yield stale metrics.
+
+The file identity should be captured *before* the file is decoded and
+passed to :meth:`MetricsCache.put` (see :meth:`MetricsCache.identify`), so
+that a file rewritten during analysis is not cached under its new
+identity with metrics of the old contents.
+
+Typical use::
+
+    cache = MetricsCache("metrics.sqlite")
+    analyzer = DistortionAnalyzer(cache=cache)
+    analyzer.bind_image(path="a.jpg")
+    analyzer.analyze()          # computed and stored
+    analyzer.analyze()          # served from the cache, no decode
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .distortion_analyser import DistortionMetrics
+
+PathLike = Union[str, Path]
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    path TEXT NOT NULL,
+    config TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    sharpness REAL NOT NULL,
+    noise_variance REAL NOT NULL,
+    illumination_uniformity REAL NOT NULL,
+    overexposure_ratio REAL NOT NULL,
+    scale INTEGER NOT NULL,
+    PRIMARY KEY (path, config)
+)
+"""
+
+FileIdentity = Tuple[str, int, int, str]
+
+
+def file_identity(path: PathLike, *, hash_content: bool = False) -> FileIdentity:
+    """Return ``(abs_path, size, mtime_ns, content_hash)`` for ``path``.
+
+    ``content_hash`` is a BLAKE2b digest of the file bytes when
+    ``hash_content`` is set and an empty string otherwise.
+    """
+
+    abs_path = os.path.abspath(os.fspath(path))
+    st = os.stat(abs_path)
+    digest = ""
+    if hash_content:
+        h = hashlib.blake2b(digest_size=16)
+        with open(abs_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+    return abs_path, st.st_size, st.st_mtime_ns, digest
+
+
+class MetricsCache:
+    """SQLite-backed cache of :class:`DistortionMetrics` per image file.
+
+    Parameters
+    ----------
+    db_path:
+        Location of the SQLite database; created if missing.
+    hash_content:
+        Also key entries by a hash of the file contents. Detects in-place
+        rewrites that preserve size and mtime, at the cost of reading every
+        file on lookup.
+
+    The cache is safe to share between threads of one process.
+    """
+
+    def __init__(self, db_path: PathLike, *, hash_content: bool = False) -> None:
+        self.db_path = Path(db_path)
+        self.hash_content = hash_content
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def identify(self, path: PathLike) -> Optional[FileIdentity]:
+        """Current identity of ``path`` as this cache keys it, or None if unreadable."""
+
+        try:
+            return file_identity(path, hash_content=self.hash_content)
+        except OSError:
+            return None
+
+    def get(
+        self, path: PathLike, config: str, *, identity: Optional[FileIdentity] = None
+    ) -> Optional[DistortionMetrics]:
+        """Return cached metrics for ``path`` under ``config``, if still valid.
+
+        ``identity`` (from :meth:`identify`) avoids recomputing it.
+        """
+
+        return self.get_many([path], config, identities=None if identity is None else [identity])[0]
+
+    def get_many(
+        self,
+        paths: Sequence[PathLike],
+        config: str,
+        *,
+        identities: Optional[Sequence[Optional[FileIdentity]]] = None,
+    ) -> List[Optional[DistortionMetrics]]:
+        """Bulk lookup; returns one entry (or None on a miss) per path.
+
+        ``identities`` optionally gives the already captured identity of
+        each path (None for unreadable files).
+        """
+
+        if identities is None:
+            identities = [self.identify(path) for path in paths]
+
+        keys = sorted({ident[0] for ident in identities if ident is not None})
+        rows: Dict[str, tuple] = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = keys[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    "SELECT path, size, mtime_ns, content_hash, sharpness, noise_variance, "
+                    "illumination_uniformity, overexposure_ratio, scale FROM metrics "
+                    f"WHERE config = ? AND path IN ({placeholders})",
+                    [config, *chunk],
+                )
+                for row in cursor:
+                    rows[row[0]] = row
+
+        results: List[Optional[DistortionMetrics]] = []
+        for ident in identities:
+            row = rows.get(ident[0]) if ident is not None else None
+            if row is None or tuple(row[1:4]) != ident[1:]:
+                results.append(None)
+                continue
+            results.append(
+                DistortionMetrics(
+                    sharpness=row[4],
+                    noise_variance=row[5],
+                    illumination_uniformity=row[6],
+                    overexposure_ratio=row[7],
+                    scale=row[8],
+                )
+            )
+        return results
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def put(
+        self, path: PathLike, config: str, metrics: DistortionMetrics, *, identity: Optional[FileIdentity] = None
+    ) -> None:
+        """Store metrics for ``path`` under ``config``.
+
+        Pass the ``identity`` captured before the file was decoded; without
+        it the file is identified now, which may already be a newer version.
+        """
+
+        self.put_many([(path, metrics)], config, identities=None if identity is None else [identity])
+
+    def put_many(
+        self,
+        items: Iterable[Tuple[PathLike, DistortionMetrics]],
+        config: str,
+        *,
+        identities: Optional[Sequence[Optional[FileIdentity]]] = None,
+    ) -> None:
+        """Store several entries in one transaction.
+
+        ``identities`` optionally gives the identity of each item's file as
+        captured before analysis; items with a None identity are skipped.
+        Metrics containing NaN are not stored (SQLite would turn NaN into
+        NULL); such images are analyzed again on the next lookup.
+        """
+
+        items = list(items)
+        if identities is None:
+            identities = [self.identify(path) for path, _ in items]
+        records = []
+        for (_, m), ident in zip(items, identities):
+            if ident is None or any(math.isnan(v) for v in m.as_vector()):
+                continue
+            path_key, size, mtime_ns, digest = ident
+            records.append(
+                (
+                    path_key,
+                    config,
+                    size,
+                    mtime_ns,
+                    digest,
+                    m.sharpness,
+                    m.noise_variance,
+                    m.illumination_uniformity,
+                    m.overexposure_ratio,
+                    m.scale,
+                )
+            )
+        if not records:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                records,
+            )
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate(self, paths: Optional[Iterable[PathLike]] = None, *, config: Optional[str] = None) -> int:
+        """Delete entries and return how many were removed.
+
+        ``paths`` restricts deletion to those files and ``config`` to one
+        configuration stamp; with neither, the whole cache is cleared.
+        """
+
+        where, params = ("config = ?", [config]) if config is not None else ("1", [])
+
+        with self._lock, self._conn:
+            if paths is None:
+                return self._conn.execute(f"DELETE FROM metrics WHERE {where}", params).rowcount
+            removed = 0
+            for path in paths:
+                removed += self._conn.execute(
+                    f"DELETE FROM metrics WHERE {where} AND path = ?",
+                    [*params, os.path.abspath(os.fspath(path))],
+                ).rowcount
+            return removed
+
+    def purge_stale(self, config: str) -> int:
+        """Delete entries written under any configuration other than ``config``.
+
+        Call after changing the over-exposure threshold, the analysis scale
+        or the metric code version to reclaim space.
+        """
+
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM metrics WHERE config != ?", [config]).rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0])
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        """Close the underlying database connection."""
+
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "MetricsCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
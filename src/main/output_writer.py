@@ -0,0 +1,259 @@
+"""Background writer for enhanced images with atomic file replacement.
+
+:class:`OutputWriter` encodes and writes output images on a small pool of
+threads (OpenCV encoders and file I/O release the GIL), so encoding one
+image overlaps with decoding and enhancing the next::
+
+    with OutputWriter(workers=2, jpeg_quality=92) as writer:
+        for source, output in jobs:
+            image = read_image(source)
+            enhanced = apply_enhancement_plan(image, plan)
+            # Pixels unchanged (empty plan): reuse the source file's bytes
+            futures.append(writer.submit(output, enhanced, source=source if enhanced is image else None))
+
+Every file is first written to a temporary name in the destination
+directory and then moved into place with ``os.replace``, so readers (and a
+resumed pipeline run) never see a half-written output.
+
+When the caller passes ``source``, the image is known to be pixel-identical
+to that file. If it has the same extension as the output, the writer skips
+the encode and hardlinks the source into place (``reuse_source="link"``,
+falling back to a copy across file systems) or copies it
+(``reuse_source="copy"``). The output is then byte-identical to the source
+instead of a re-encoded (and, for JPEG, re-quantised) copy. A hardlinked
+output shares its data with the source: edit one in place and the other
+changes too; use ``"copy"`` if outputs are post-processed in place.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from .image_codec import CodecConfig, codec_config, encode_image
+
+PathLike = Union[str, Path]
+
+REUSE_MODES = ("link", "copy", "off")
+
+
+@dataclass(frozen=True)
+class WriteResult:
+    """Outcome of one write; ``mode`` is ``"encoded"``, ``"linked"`` or ``"copied"``."""
+
+    path: Path
+    mode: str
+    nbytes: int
+    # Time spent encoding and writing, excluding time queued
+    elapsed_s: float = 0.0
+
+
+def _temp_path(path: Path) -> Path:
+    # Unique per process and thread; hidden so directory scans skip it
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def atomic_write_bytes(path: PathLike, data: Union[bytes, np.ndarray], *, fsync: bool = False) -> None:
+    """Write ``data`` to ``path`` through a temporary file and ``os.replace``.
+
+    With ``fsync=True`` the data is flushed to disk before the rename, so
+    the file survives a power loss once this returns.
+    """
+
+    path = Path(path)
+    tmp = _temp_path(path)
+    try:
+        with open(tmp, "wb") as f:
+            f.write(memoryview(data))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def atomic_link_or_copy(source: PathLike, path: PathLike, *, link: bool = True, fsync: bool = False) -> str:
+    """Place the contents of ``source`` at ``path`` atomically.
+
+    Hardlinks when ``link`` is true and the file system allows it, copies
+    otherwise. Returns ``"linked"`` or ``"copied"``.
+    """
+
+    source, path = Path(source), Path(path)
+    tmp = _temp_path(path)
+    try:
+        tmp.unlink(missing_ok=True)
+        mode = "copied"
+        if link:
+            try:
+                os.link(source, tmp)
+                mode = "linked"
+            except OSError:  # cross-device, unsupported file system, ...
+                pass
+        if mode == "copied":
+            shutil.copyfile(source, tmp)
+            if fsync:
+                with open(tmp, "rb+") as f:
+                    os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return mode
+
+
+class OutputWriter:
+    """Pool of threads encoding and atomically writing output images.
+
+    Parameters
+    ----------
+    workers:
+        Writer threads. ``0`` writes synchronously in the calling thread
+        (:meth:`submit` then returns a completed future).
+    max_pending:
+        Writes queued or running before :meth:`submit` blocks; bounds the
+        memory held by images waiting to be encoded. Defaults to twice the
+        number of workers.
+    jpeg_quality, png_compression:
+        Encoding parameters; ``None`` uses the current :data:`codec_config`.
+    backend:
+        Codec backend (see :mod:`.image_codec`); ``None`` uses the
+        configured one.
+    reuse_source:
+        How outputs whose pixels equal their source are written: ``"link"``
+        (hardlink, else copy), ``"copy"`` or ``"off"`` (always encode).
+    fsync:
+        Flush every file to disk before renaming it into place.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        max_pending: Optional[int] = None,
+        jpeg_quality: Optional[int] = None,
+        png_compression: Optional[int] = None,
+        backend: Optional[str] = None,
+        reuse_source: str = "link",
+        fsync: bool = False,
+    ) -> None:
+        if workers < 0:
+            raise ValueError("workers must be >= 0")
+        if reuse_source not in REUSE_MODES:
+            raise ValueError(f"Unknown reuse_source {reuse_source!r}; expected one of {REUSE_MODES}.")
+        self.config: CodecConfig = dataclasses.replace(codec_config)
+        if jpeg_quality is not None:
+            if not 0 <= jpeg_quality <= 100:
+                raise ValueError("jpeg_quality must be in [0, 100]")
+            self.config.jpeg_quality = int(jpeg_quality)
+        if png_compression is not None:
+            if not 0 <= png_compression <= 9:
+                raise ValueError("png_compression must be in [0, 9]")
+            self.config.png_compression = int(png_compression)
+        self.backend = backend
+        self.reuse_source = reuse_source
+        self.fsync = fsync
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="writer") if workers else None
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * max(workers, 1))
+
+    # ------------------------------------------------------------------
+    # Synchronous building blocks (also used by the staged pipeline)
+    # ------------------------------------------------------------------
+    def can_reuse(self, source: Optional[PathLike], path: PathLike) -> bool:
+        """Whether an unmodified image from ``source`` can skip encoding."""
+
+        return (
+            source is not None
+            and self.reuse_source != "off"
+            and Path(source).suffix.lower() == Path(path).suffix.lower()
+        )
+
+    def encode(self, image: np.ndarray, ext: str) -> np.ndarray:
+        """Encode ``image`` with the writer's parameters."""
+
+        return encode_image(image, ext, backend=self.backend, config=self.config)
+
+    def write_bytes(self, path: PathLike, data: np.ndarray) -> WriteResult:
+        """Atomically write already encoded ``data`` to ``path``."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(path, data, fsync=self.fsync)
+        return WriteResult(path, "encoded", int(data.nbytes))
+
+    def reuse(self, source: PathLike, path: PathLike) -> WriteResult:
+        """Atomically place the bytes of ``source`` at ``path``."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        mode = atomic_link_or_copy(source, path, link=self.reuse_source == "link", fsync=self.fsync)
+        return WriteResult(path, mode, path.stat().st_size)
+
+    def write(self, path: PathLike, image: np.ndarray, *, source: Optional[PathLike] = None) -> WriteResult:
+        """Write ``image`` to ``path`` in the calling thread.
+
+        ``source``, if given, is a file whose decoded pixels equal
+        ``image``; its bytes are reused when :meth:`can_reuse` allows it.
+
+        Raises
+        ------
+        IOError
+            If the image cannot be encoded or written.
+        """
+
+        start = time.perf_counter()
+        if self.can_reuse(source, path):
+            result = self.reuse(source, path)
+        else:
+            result = self.write_bytes(path, self.encode(image, Path(path).suffix))
+        return dataclasses.replace(result, elapsed_s=time.perf_counter() - start)
+
+    # ------------------------------------------------------------------
+    # Background writes
+    # ------------------------------------------------------------------
+    def submit(self, path: PathLike, image: np.ndarray, *, source: Optional[PathLike] = None) -> "Future[WriteResult]":
+        """Queue :meth:`write` on the pool; blocks while ``max_pending`` writes are pending.
+
+        ``image`` must not be modified until the returned future is done.
+        Errors are reported through the future.
+        """
+
+        if self._executor is None:
+            future: "Future[WriteResult]" = Future()
+            try:
+                future.set_result(self.write(path, image, source=source))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self.write, path, image, source=source)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the pool; with ``wait`` (default) pending writes finish first."""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,687 @@
+"""Parallel end-to-end enhancement pipeline over a directory tree.
+
+For every image below the input directory the pipeline decodes it, computes
+its distortion metrics, builds an enhancement plan, applies it and writes the
+enhanced image to the same relative path below the output directory. Images
+are processed by a pool of worker processes; only paths and small results
+cross process boundaries.
+
+Each finished image appends one JSON line to a manifest (by default
+``<output>/manifest.jsonl``) holding its metrics, plan and per-stage
+timings, and the line is flushed and fsync'ed before the next one. After a
+crash or kill, re-running the same command skips every image already
+recorded as ``"ok"`` whose output still exists, and retries the rest::
+
+    python -m src.main.pipeline data/car_paint_defect/test/images out/enhanced --workers 8
+    python -m src.main.pipeline data/ out/ --workers 8 --luminance
+    python -m src.main.pipeline data/ out/ --engine staged --stage-workers decode=2 enhance=6
+
+Outputs are written by an :class:`~.output_writer.OutputWriter`: atomically
+(temporary file and rename, so an output that exists is complete) and,
+when the plan leaves the pixels untouched (no ops or only
+``MARK_AS_LOW_QUALITY``), by hardlinking or copying the source file instead
+of re-encoding it (``--reuse-source``).
+
+Two engines are available:
+
+- ``process`` (default): each worker process runs all steps of one image.
+  With ``--decode-workers N`` (and ``--workers`` above 1), N separate
+  processes decode instead and hand each image to the workers through a
+  :class:`~.shared_frames.SharedFramePool`; only a small frame handle is
+  pickled per image. With ``--workers 1`` the steps run in the calling process and encoding
+  and writing move to background threads (``--writer-threads``).
+- ``staged``: a :class:`~.staged_pipeline.StagedPipeline` of threads with
+  one stage per step (``read``, ``decode``, ``analyze``, ``plan``,
+  ``enhance``, ``encode``, ``write``), each with its own worker count and
+  joined by bounded queues. A per-stage utilization table is logged at the
+  end, to size the workers of each stage from measurements.
+
+Manifest record fields: ``source`` and ``output`` (relative paths),
+``status`` (``"ok"`` or ``"error"``), ``metrics``, ``plan`` (sharpness
+level, quality penalty and ``[op, strength]`` pairs), ``write``
+(``"encoded"``, ``"linked"`` or ``"copied"``), ``timings_ms``
+(``decode``, ``analyze``, ``plan``, ``enhance``, ``encode``, ``total``;
+the staged engine adds ``read`` and ``write``) and
+``error`` for failures. When a source appears several times (e.g. an error
+followed by a successful retry), the last record wins.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .buffer_arena import ImageArena
+from .distortion_analyser import DistortionAnalyzer, _iter_image_paths
+from .enhancement_strategy import EnhancementPlan, EnhancementPlanner, SharpnessCriteria
+from .enhancers_executor import apply_enhancement_plan
+from .image_codec import decode_image, read_image
+from .output_writer import OutputWriter, WriteResult
+from .shared_frames import FrameHandle, SharedFramePool
+from .staged_pipeline import Stage, StagedPipeline, StageStats
+
+MANIFEST_NAME = "manifest.jsonl"
+
+STAGE_NAMES = ("read", "decode", "analyze", "plan", "enhance", "encode", "write")
+
+
+@dataclass
+class PipelineSummary:
+    """Counts of one :func:`run_pipeline` invocation."""
+
+    processed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    # Filled by the staged engine only
+    stage_stats: List[StageStats] = field(default_factory=list)
+
+    @property
+    def images_per_s(self) -> float:
+        return self.processed / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+def plan_to_dict(plan: EnhancementPlan) -> Dict[str, Any]:
+    """JSON-serializable form of ``plan`` as stored in the manifest."""
+
+    return {
+        "sharpness_level": plan.sharpness_level.value,
+        "quality_penalty": plan.quality_penalty,
+        "ops": [[op.type.name, op.strength] for op in plan.ops],
+    }
+
+
+def load_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Latest manifest record per source path.
+
+    A truncated last line (the process died while writing it) is ignored.
+    """
+
+    records: Dict[str, Dict[str, Any]] = {}
+    if not path.exists():
+        return records
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["source"]] = record
+    return records
+
+
+def completed_sources(manifest: Dict[str, Dict[str, Any]], output_dir: Path) -> Set[str]:
+    """Sources recorded as ``"ok"`` whose output file still exists."""
+
+    return {
+        source
+        for source, record in manifest.items()
+        if record.get("status") == "ok" and (output_dir / record["output"]).exists()
+    }
+
+
+@dataclass
+class _Job:
+    """One image travelling through the pipeline."""
+
+    source: Path
+    output: Path
+    relative: str
+    data: Any = None
+    image: Optional[np.ndarray] = None
+    metrics: Any = None
+    plan: Optional[EnhancementPlan] = None
+    # Set when the plan left the pixels untouched (see OutputWriter.can_reuse)
+    unchanged: bool = False
+    write_mode: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def _job_record(job: _Job, error: Optional[str]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"source": job.relative, "output": job.relative}
+    if error is None:
+        record.update(status="ok", metrics=asdict(job.metrics), plan=plan_to_dict(job.plan), write=job.write_mode)
+    else:
+        record.update(status="error", error=error)
+    timings = dict(job.timings, total=sum(job.timings.values()))
+    record["timings_ms"] = {k: round(v, 3) for k, v in timings.items()}
+    return record
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+# Per-process state, set up once by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(options: Dict[str, Any], frames: Optional[SharedFramePool] = None) -> None:
+    _worker["frames"] = frames
+    _worker["analyzer"] = DistortionAnalyzer(scale=options["scale"])
+    _worker["planner"] = EnhancementPlanner()
+    _worker["arena"] = ImageArena()
+    _worker["luminance"] = options["luminance"]
+    # Process-pool workers write in their own process; the pool is the parallelism
+    _worker["writer"] = OutputWriter(workers=0, **options["writer"])
+
+
+def _enhance_job(job: _Job, *, arena: Optional[ImageArena], image: Optional[np.ndarray] = None) -> None:
+    """Decode, analyze, plan and enhance ``job`` (``job.image`` is the result).
+
+    ``image``, if given, is the already decoded source and skips the decode.
+    """
+
+    last = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        job.timings[stage] = (now - last) * 1000.0
+        last = now
+
+    if image is None:
+        image = read_image(job.source)
+        lap("decode")
+
+    analyzer: DistortionAnalyzer = _worker["analyzer"]
+    analyzer.bind_image(image=image)
+    job.metrics = analyzer.analyze()
+    lap("analyze")
+
+    job.plan = _worker["planner"].build_plan(job.metrics)
+    lap("plan")
+
+    job.image = apply_enhancement_plan(image, job.plan, arena=arena, luminance=_worker["luminance"])
+    # Plans without pixel ops return the input itself: the source file is the output
+    job.unchanged = job.image is image
+    lap("enhance")
+
+
+def _process_image(source: Path, output: Path, relative: str) -> Dict[str, Any]:
+    """Run one image through the pipeline; never raises."""
+
+    job = _Job(source, output, relative)
+    try:
+        _enhance_job(job, arena=_worker["arena"])
+        _record_write(job, _worker["writer"].write(output, job.image, source=source if job.unchanged else None))
+        error = None
+    except Exception as exc:  # reported per image; the batch continues
+        error = f"{type(exc).__name__}: {exc}"
+    return _job_record(job, error)
+
+
+def _init_frame_decoder(frames: SharedFramePool) -> None:
+    _worker["frames"] = frames
+
+
+def _decode_to_frame(source: Path) -> Tuple[Optional[FrameHandle], Optional[np.ndarray], float, Optional[str]]:
+    """Decode worker of the frame handoff; never raises.
+
+    Returns the handle of the frame holding the decoded image, or the image
+    itself when it does not fit in a slot, plus the decode time in ms and
+    the error of a failed decode.
+    """
+
+    start = time.perf_counter()
+    try:
+        image = read_image(source)
+        frames: SharedFramePool = _worker["frames"]
+        handle = frames.put(image) if image.nbytes <= frames.slot_bytes else None
+        return handle, None if handle is not None else image, (time.perf_counter() - start) * 1000.0, None
+    except Exception as exc:  # reported per image; the batch continues
+        return None, None, (time.perf_counter() - start) * 1000.0, f"{type(exc).__name__}: {exc}"
+
+
+def _process_frame(
+    source: Path,
+    output: Path,
+    relative: str,
+    handle: Optional[FrameHandle],
+    image: Optional[np.ndarray],
+    decode_ms: float,
+) -> Dict[str, Any]:
+    """Enhance worker of the frame handoff: like :func:`_process_image`, from a decoded frame."""
+
+    frames: SharedFramePool = _worker["frames"]
+    job = _Job(source, output, relative, timings={"decode": decode_ms})
+    try:
+        if handle is not None:
+            image = frames.view(handle)
+        _enhance_job(job, arena=_worker["arena"], image=image)
+        _record_write(job, _worker["writer"].write(output, job.image, source=source if job.unchanged else None))
+        error = None
+    except Exception as exc:  # reported per image; the batch continues
+        error = f"{type(exc).__name__}: {exc}"
+    finally:
+        # Drop every view of the slot before handing it back
+        job.image = image = None
+        if handle is not None:
+            frames.release(handle)
+    return _job_record(job, error)
+
+
+def _submit_image(
+    source: Path, output: Path, relative: str, writer: OutputWriter
+) -> Tuple[_Job, Optional[Future], Optional[str]]:
+    """Enhance one image in the calling thread and queue its write on ``writer``."""
+
+    job = _Job(source, output, relative)
+    try:
+        # No arena when writing in the background: the result must outlive this call
+        _enhance_job(job, arena=_worker["arena"] if writer.workers == 0 else None)
+        return job, writer.submit(output, job.image, source=source if job.unchanged else None), None
+    except Exception as exc:  # reported per image; the batch continues
+        return job, None, f"{type(exc).__name__}: {exc}"
+
+
+def _complete_image(job: _Job, future: Optional[Future], error: Optional[str]) -> Dict[str, Any]:
+    if future is not None:
+        try:
+            _record_write(job, future.result())
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+    job.image = None
+    return _job_record(job, error)
+
+
+def _record_write(job: _Job, result: WriteResult) -> None:
+    job.timings["encode"] = result.elapsed_s * 1000.0
+    job.write_mode = result.mode
+
+
+# ---------------------------------------------------------------------------
+# Staged engine
+# ---------------------------------------------------------------------------
+
+
+def build_stages(
+    *,
+    scale: int = 1,
+    luminance: bool = False,
+    stage_workers: Optional[Dict[str, int]] = None,
+    writer: Optional[OutputWriter] = None,
+) -> List[Stage]:
+    """Stages of the staged engine with the requested worker counts.
+
+    ``stage_workers`` maps stage names (:data:`STAGE_NAMES`) to worker
+    threads; unlisted stages get one worker. ``writer`` supplies the
+    encoding parameters and the atomic writes of the ``encode`` and
+    ``write`` stages, which run its synchronous methods on their own
+    threads.
+    """
+
+    stage_workers = dict(stage_workers or {})
+    unknown = set(stage_workers) - set(STAGE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s) {sorted(unknown)}; expected names from {STAGE_NAMES}.")
+    # Analyzers hold the bound image; one per thread
+    local = threading.local()
+
+    def analyzer() -> DistortionAnalyzer:
+        if not hasattr(local, "analyzer"):
+            local.analyzer = DistortionAnalyzer(scale=scale)
+        return local.analyzer
+
+    planner = EnhancementPlanner()
+    writer = writer or OutputWriter(workers=0)
+
+    def read(job: _Job) -> None:
+        job.data = np.fromfile(job.source, dtype=np.uint8)
+
+    def decode(job: _Job) -> None:
+        try:
+            job.image = decode_image(job.data)
+        except IOError as exc:
+            raise IOError(f"Failed to read image from {job.source!s}") from exc
+        job.data = None
+
+    def analyze(job: _Job) -> None:
+        a = analyzer()
+        a.bind_image(image=job.image)
+        job.metrics = a.analyze()
+
+    def plan(job: _Job) -> None:
+        job.plan = planner.build_plan(job.metrics)
+
+    def enhance(job: _Job) -> None:
+        # No arena: the result outlives this call while it waits for encoding
+        image = job.image
+        job.image = apply_enhancement_plan(image, job.plan, luminance=luminance)
+        job.unchanged = job.image is image
+
+    def encode(job: _Job) -> None:
+        # data stays None when the write stage can reuse the source file
+        if not (job.unchanged and writer.can_reuse(job.source, job.output)):
+            job.data = writer.encode(job.image, job.output.suffix)
+        job.image = None
+
+    def write(job: _Job) -> None:
+        if job.data is None:
+            result = writer.reuse(job.source, job.output)
+        else:
+            result = writer.write_bytes(job.output, job.data)
+        job.write_mode = result.mode
+        job.data = None
+
+    def timed_step(name: str, fn: Callable[[_Job], None]) -> Callable[[_Job], _Job]:
+        def run(job: _Job) -> _Job:
+            start = time.perf_counter()
+            try:
+                fn(job)
+            finally:
+                job.timings[name] = (time.perf_counter() - start) * 1000.0
+            return job
+
+        return run
+
+    steps = [read, decode, analyze, plan, enhance, encode, write]
+    return [
+        Stage(name, timed_step(name, fn), workers=stage_workers.get(name, 1)) for name, fn in zip(STAGE_NAMES, steps)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+
+def run_pipeline(
+    input_dir: Path,
+    output_dir: Path,
+    *,
+    manifest_path: Optional[Path] = None,
+    workers: Optional[int] = None,
+    scale: int = 1,
+    luminance: bool = False,
+    max_in_flight: Optional[int] = None,
+    engine: str = "process",
+    stage_workers: Optional[Dict[str, int]] = None,
+    queue_size: int = 4,
+    jpeg_quality: Optional[int] = None,
+    png_compression: Optional[int] = None,
+    reuse_source: str = "link",
+    writer_threads: int = 1,
+    decode_workers: int = 0,
+    frame_megapixels: float = 12.0,
+    log: Optional[Callable[[str], None]] = print,
+) -> PipelineSummary:
+    """Process every image below ``input_dir`` into ``output_dir``.
+
+    Parameters
+    ----------
+    input_dir, output_dir:
+        Source tree (walked recursively) and destination root. The
+        destination and the manifest's directory may lie inside the source
+        tree; the walk does not enter them.
+    manifest_path:
+        JSONL manifest to append to and resume from. Defaults to
+        ``output_dir / "manifest.jsonl"``.
+    workers:
+        Number of worker processes. ``None`` uses ``os.cpu_count()``;
+        ``1`` (or less) runs in the calling process.
+    scale:
+        Analysis reduction factor (see ``DistortionAnalyzer``). Values
+        above 1 need sharpness criteria rows for that scale; without them
+        a :class:`ValueError` is raised before any image is processed.
+    luminance:
+        Run luminance-only op runs on one luma plane (see
+        ``apply_enhancement_plan``).
+    max_in_flight:
+        Images submitted but not yet recorded; bounds memory and the loss
+        on a crash. Defaults to four per worker.
+    engine:
+        ``"process"`` (a process pool, ``workers`` processes) or
+        ``"staged"`` (one thread pool per stage, see :func:`build_stages`).
+    stage_workers, queue_size:
+        Worker threads per stage and inter-stage queue capacity of the
+        staged engine.
+    jpeg_quality, png_compression:
+        Output encoding parameters (default: the codec configuration).
+    reuse_source:
+        Outputs of plans that leave the pixels untouched hardlink
+        (``"link"``) or copy (``"copy"``) the source file instead of
+        re-encoding it; ``"off"`` always encodes. See :mod:`.output_writer`.
+    writer_threads:
+        Background encode/write threads when running in the calling
+        process (``workers`` of 1); ``0`` writes synchronously.
+    decode_workers:
+        With the process engine and ``workers > 1``, decode in this many
+        separate processes and hand the decoded images to the ``workers``
+        enhance processes through a :class:`~.shared_frames.SharedFramePool`
+        instead of decoding in the enhance processes. ``0`` (default)
+        disables the handoff.
+    frame_megapixels:
+        Largest 3-channel image (in MP) a shared frame slot holds; larger
+        images are pickled to the enhance process instead.
+    log:
+        Receives one progress line per image and a summary; ``None`` is
+        silent.
+    """
+
+    input_dir = Path(input_dir)
+    output_dir = Path(output_dir)
+    manifest_path = Path(manifest_path) if manifest_path is not None else output_dir / MANIFEST_NAME
+    if not input_dir.is_dir():
+        raise ValueError(f"Input directory does not exist: {input_dir}")
+    if engine not in ("process", "staged"):
+        raise ValueError(f"Unknown engine {engine!r}; expected 'process' or 'staged'.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    writer_options = {"jpeg_quality": jpeg_quality, "png_compression": png_compression, "reuse_source": reuse_source}
+    # Validate the writer options before any worker starts
+    OutputWriter(workers=0, **writer_options)
+    # Without criteria for the scale every plan would fail; refuse up front
+    criteria = SharpnessCriteria()
+    if scale != 1 and not criteria.rules_for_scale(scale):
+        raise ValueError(
+            f"No sharpness criteria for analysis scale {scale} in {criteria.csv_path}; "
+            "add rows with that Scale (see calibrate_scale_rules()) or run with scale 1."
+        )
+    options = {"scale": scale, "luminance": luminance, "writer": writer_options}
+
+    done = completed_sources(load_manifest(manifest_path), output_dir)
+    summary = PipelineSummary()
+    start = time.perf_counter()
+
+    def todo() -> Iterator[tuple]:
+        # An output tree nested in the input must not be read back as input
+        for source in _iter_image_paths(input_dir, recursive=True, exclude=(output_dir, manifest_path.parent)):
+            relative = source.relative_to(input_dir).as_posix()
+            if relative in done:
+                summary.skipped += 1
+                continue
+            yield source, output_dir / relative, relative
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with manifest_path.open("a", encoding="utf-8") as manifest:
+
+        def record(result: Dict[str, Any]) -> None:
+            manifest.write(json.dumps(result) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+            if result["status"] == "ok":
+                summary.processed += 1
+            else:
+                summary.failed += 1
+            if log is not None:
+                detail = f"{result['timings_ms']['total']:.0f} ms" if result["status"] == "ok" else result["error"]
+                log(f"[{result['status']}] {result['source']} ({detail})")
+
+        if engine == "staged":
+            staged = StagedPipeline(
+                build_stages(
+                    scale=scale,
+                    luminance=luminance,
+                    stage_workers=stage_workers,
+                    writer=OutputWriter(workers=0, **writer_options),
+                ),
+                queue_size=queue_size,
+            )
+            jobs = (_Job(source, output, relative) for source, output, relative in todo())
+            for outcome in staged.run(jobs):
+                if outcome.stage == "source":
+                    # Walking the input tree failed, as it would in the process engine
+                    raise RuntimeError(outcome.error)
+                record(_job_record(outcome.value, outcome.error))
+            summary.stage_stats = staged.stats()
+            if log is not None:
+                log(staged.report())
+        elif workers <= 1:
+            _init_worker(options)
+            # Encoding image N overlaps with enhancing image N + 1; records keep input order
+            with OutputWriter(workers=writer_threads, **writer_options) as writer:
+                queued: Deque[Tuple[_Job, Optional[Future], Optional[str]]] = deque()
+                for args in todo():
+                    queued.append(_submit_image(*args, writer))
+                    while queued and (queued[0][1] is None or queued[0][1].done()):
+                        record(_complete_image(*queued.popleft()))
+                while queued:
+                    record(_complete_image(*queued.popleft()))
+        else:
+            if decode_workers > 0:
+                _run_frame_handoff(todo(), record, workers, decode_workers, frame_megapixels, options)
+            else:
+                _run_process_pool(todo(), record, workers, max_in_flight, options)
+
+    summary.elapsed_s = time.perf_counter() - start
+    if log is not None:
+        log(
+            f"{summary.processed} processed, {summary.skipped} skipped, {summary.failed} failed "
+            f"in {summary.elapsed_s:.1f} s ({summary.images_per_s:.2f} images/s)"
+        )
+    return summary
+
+
+def _run_process_pool(
+    jobs: Iterator[tuple],
+    record: Callable[[Dict[str, Any]], None],
+    workers: int,
+    max_in_flight: Optional[int],
+    options: Dict[str, Any],
+) -> None:
+    limit = max_in_flight or 4 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(options,)) as pool:
+        pending: Set[Future] = set()
+        for args in jobs:
+            if len(pending) >= limit:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(future.result())
+            pending.add(pool.submit(_process_image, *args))
+        for future in wait(pending).done:
+            record(future.result())
+
+
+def _run_frame_handoff(
+    jobs: Iterator[tuple],
+    record: Callable[[Dict[str, Any]], None],
+    workers: int,
+    decode_workers: int,
+    frame_megapixels: float,
+    options: Dict[str, Any],
+) -> None:
+    """Decode processes feed enhance processes through shared-memory frames.
+
+    Only a :class:`~.shared_frames.FrameHandle` travels from the decode to
+    the enhance process. Every image in flight holds one slot, and there is
+    one slot per in-flight image, so decode workers never block on a full
+    pool.
+    """
+
+    limit = decode_workers + 2 * workers
+    slot_bytes = int(frame_megapixels * 1e6) * 3
+    with SharedFramePool(slot_bytes, limit) as frames, ProcessPoolExecutor(
+        max_workers=decode_workers, initializer=_init_frame_decoder, initargs=(frames,)
+    ) as decoders, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(options, frames)
+    ) as enhancers:
+        decoding: Dict[Future, tuple] = {}
+        enhancing: Set[Future] = set()
+
+        def pump() -> None:
+            finished, _ = wait(set(decoding) | enhancing, return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in enhancing:
+                    enhancing.discard(future)
+                    record(future.result())
+                    continue
+                source, output, relative = decoding.pop(future)
+                handle, image, decode_ms, error = future.result()
+                if error is not None:
+                    record(_job_record(_Job(source, output, relative, timings={"decode": decode_ms}), error))
+                    continue
+                enhancing.add(enhancers.submit(_process_frame, source, output, relative, handle, image, decode_ms))
+
+        for args in jobs:
+            while len(decoding) + len(enhancing) >= limit:
+                pump()
+            decoding[decoders.submit(_decode_to_frame, args[0])] = args
+        while decoding or enhancing:
+            pump()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="Directory tree of source images.")
+    parser.add_argument("output", help="Directory to write enhanced images to.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("--manifest", default=None, help=f"Manifest path (default: <output>/{MANIFEST_NAME}).")
+    parser.add_argument("--scale", type=int, default=1, choices=[1, 2, 4, 8],
+                        help="Analysis reduction factor (>1 needs per-scale sharpness criteria).")
+    parser.add_argument("--luminance", action="store_true", help="Run luminance-only ops on one luma plane.")
+    parser.add_argument("--engine", choices=["process", "staged"], default="process")
+    parser.add_argument("--stage-workers", nargs="*", default=[], metavar="STAGE=N",
+                        help=f"Worker threads per stage of the staged engine ({', '.join(STAGE_NAMES)}).")
+    parser.add_argument("--queue-size", type=int, default=4, help="Inter-stage queue capacity (staged engine).")
+    parser.add_argument("--jpeg-quality", type=int, default=None, help="JPEG output quality (0-100).")
+    parser.add_argument("--png-compression", type=int, default=None, help="PNG output compression level (0-9).")
+    parser.add_argument("--reuse-source", choices=["link", "copy", "off"], default="link",
+                        help="Write unmodified images by hardlinking/copying the source (default: link).")
+    parser.add_argument("--decode-workers", type=int, default=0,
+                        help="Separate decode processes handing frames to the workers via shared memory (0: off).")
+    parser.add_argument("--frame-mp", type=float, default=12.0,
+                        help="Largest image (MP) a shared frame slot holds with --decode-workers.")
+    parser.add_argument("--writer-threads", type=int, default=1,
+                        help="Background write threads with --workers 1 (0: synchronous).")
+    args = parser.parse_args(argv)
+
+    stage_workers: Dict[str, int] = {}
+    for spec in args.stage_workers:
+        name, sep, count = spec.partition("=")
+        if not sep or not count.isdigit():
+            parser.error(f"--stage-workers expects STAGE=N, got {spec!r}")
+        stage_workers[name] = int(count)
+
+    summary = run_pipeline(
+        Path(args.input),
+        Path(args.output),
+        manifest_path=Path(args.manifest) if args.manifest else None,
+        workers=args.workers,
+        scale=args.scale,
+        luminance=args.luminance,
+        engine=args.engine,
+        stage_workers=stage_workers,
+        queue_size=args.queue_size,
+        jpeg_quality=args.jpeg_quality,
+        png_compression=args.png_compression,
+        reuse_source=args.reuse_source,
+        writer_threads=args.writer_threads,
+        decode_workers=args.decode_workers,
+        frame_megapixels=args.frame_mp,
+    )
+    return 1 if summary.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,42 @@
+"""Composable 8-bit point operations.
+
+A point operation maps every pixel value independently through a 256-entry
+``uint8`` lookup table. Applying tables ``a`` then ``b`` is the same as
+applying the single table ``b[a]``, so any run of consecutive point
+operations in an enhancement plan can be collapsed into one ``cv2.LUT``
+pass. Because every intermediate value is ``uint8`` in both cases, the
+composed result is bit-identical to applying the tables one by one.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import cv2
+import numpy as np
+
+IDENTITY_LUT = np.arange(256, dtype=np.uint8)
+IDENTITY_LUT.setflags(write=False)
+
+
+def table_from_curve(values: np.ndarray) -> np.ndarray:
+    """Round a float curve sampled at 0..255 into a ``uint8`` table."""
+
+    return np.clip(np.rint(values), 0, 255).astype(np.uint8)
+
+
+def compose_luts(luts: Iterable[np.ndarray]) -> np.ndarray:
+    """Compose tables in application order into a single table."""
+
+    result = IDENTITY_LUT
+    for lut in luts:
+        if lut.shape != (256,) or lut.dtype != np.uint8:
+            raise ValueError("Point-operation tables must be uint8 arrays of shape (256,).")
+        result = lut[result]
+    return result
+
+
+def apply_lut(image: np.ndarray, lut: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Apply ``lut`` to every channel of ``image`` in one pass."""
+
+    return cv2.LUT(image, lut, dst=out)
@@ -0,0 +1,245 @@
+"""Zero-copy image handoff between pipeline processes via shared memory.
+
+Passing full-resolution ``ndarray`` objects between worker processes
+pickles them on every hop (tens of MB per image). A
+:class:`SharedFramePool` instead owns one ``multiprocessing.shared_memory``
+segment cut into fixed-size slots. Producers write decoded or enhanced
+images straight into a slot and send the small, picklable
+:class:`FrameHandle` to the next stage, which maps the same memory as an
+``ndarray`` view without copying::
+
+    pool = SharedFramePool(slot_bytes=3 * 4096 * 3072, slots=8)
+    handle, frame = pool.allocate(image.shape, image.dtype)
+    frame[...] = image                      # or decode/enhance into it
+    queue.put(handle)                       # a few dozen bytes
+    ...
+    view = pool.view(handle)                # in the consumer process
+    pool.release(handle)                    # slot is recycled at refcount 0
+
+Each slot carries a reference count: :meth:`SharedFramePool.allocate`
+returns a handle holding one reference, :meth:`~SharedFramePool.retain`
+adds one (e.g. when a frame fans out to two stages) and
+:meth:`~SharedFramePool.release` drops one. When the count reaches zero the
+slot's generation is bumped, so views requested through stale handles
+raise instead of silently reading a recycled frame. ``allocate`` blocks
+while all slots are in use, which bounds the pipeline's memory and gives
+natural backpressure.
+
+Analysis results (:class:`~.distortion_analyser.DistortionMetrics`, a few
+floats) and plans are small; they travel alongside the handles as ordinary
+pickled objects.
+
+The pool uses ``multiprocessing`` locks, which can only be shared through
+process inheritance: pass it as an argument of ``Process`` or through the
+``initializer``/``initargs`` of a process pool, not through a queue.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Slots start on cache-line boundaries
+_ALIGN = 64
+
+
+def _align(n: int) -> int:
+    return -(-n // _ALIGN) * _ALIGN
+
+
+@dataclass(frozen=True)
+class FrameHandle:
+    """Picklable reference to one image stored in a :class:`SharedFramePool`."""
+
+    slot: int
+    generation: int
+    shape: Tuple[int, ...]
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64)) * np.dtype(self.dtype).itemsize
+
+
+class SharedFramePool:
+    """Fixed pool of reference-counted shared-memory image slots.
+
+    Parameters
+    ----------
+    slot_bytes:
+        Capacity of each slot; the largest image the pool can hold.
+    slots:
+        Number of slots, i.e. the maximum number of frames alive at once.
+    context:
+        ``multiprocessing`` context used to create the locks. Defaults to
+        the global context.
+    """
+
+    def __init__(self, slot_bytes: int, slots: int, *, context: Optional[Any] = None) -> None:
+        if slot_bytes < 1:
+            raise ValueError("slot_bytes must be >= 1")
+        if slots < 1:
+            raise ValueError("slots must be >= 1")
+        ctx = context or multiprocessing
+        self.slot_bytes = int(slot_bytes)
+        self.slots = int(slots)
+        self._stride = _align(self.slot_bytes)
+        self._header_bytes = _align(slots * 16)
+        self._shm = shared_memory.SharedMemory(create=True, size=self._header_bytes + slots * self._stride)
+        self._owner = True
+        self._lock = ctx.Lock()
+        # Counts free slots so that allocate() can block until one is recycled
+        self._free = ctx.Semaphore(slots)
+        self._map()
+        self._refcounts[:] = 0
+        self._generations[:] = 0
+
+    def _map(self) -> None:
+        buf = self._shm.buf
+        self._refcounts = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=0)
+        self._generations = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=self.slots * 8)
+
+    # ------------------------------------------------------------------
+    # Pickling: workers re-attach to the same segment by name
+    # ------------------------------------------------------------------
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            "name": self._shm.name,
+            "slot_bytes": self.slot_bytes,
+            "slots": self.slots,
+            "lock": self._lock,
+            "free": self._free,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.slot_bytes = state["slot_bytes"]
+        self.slots = state["slots"]
+        self._stride = _align(self.slot_bytes)
+        self._header_bytes = _align(self.slots * 16)
+        self._shm = shared_memory.SharedMemory(name=state["name"])
+        self._owner = False
+        self._lock = state["lock"]
+        self._free = state["free"]
+        self._map()
+
+    # ------------------------------------------------------------------
+    # Frames
+    # ------------------------------------------------------------------
+    def allocate(
+        self, shape: Tuple[int, ...], dtype: Any = np.uint8, *, timeout: Optional[float] = None
+    ) -> Tuple[FrameHandle, np.ndarray]:
+        """Reserve a slot for an image of ``shape``/``dtype``.
+
+        Returns the handle (holding one reference) and a writable view of
+        the slot. Blocks while no slot is free; raises ``TimeoutError`` if
+        none frees up within ``timeout`` seconds.
+
+        Raises
+        ------
+        ValueError
+            If the image does not fit in a slot.
+        """
+
+        shape = tuple(int(n) for n in shape)
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        if nbytes > self.slot_bytes:
+            raise ValueError(f"Image of {nbytes} bytes does not fit in a {self.slot_bytes}-byte slot.")
+        if not self._free.acquire(timeout=timeout):
+            raise TimeoutError("No free frame slot became available.")
+        with self._lock:
+            slot = int(np.flatnonzero(self._refcounts == 0)[0])
+            self._refcounts[slot] = 1
+            generation = int(self._generations[slot])
+        handle = FrameHandle(slot, generation, shape, dtype.str)
+        return handle, self._view(handle)
+
+    def put(self, image: np.ndarray, *, timeout: Optional[float] = None) -> FrameHandle:
+        """Copy ``image`` into a new slot and return its handle."""
+
+        handle, frame = self.allocate(image.shape, image.dtype, timeout=timeout)
+        np.copyto(frame, image)
+        return handle
+
+    def view(self, handle: FrameHandle) -> np.ndarray:
+        """Zero-copy ``ndarray`` view of the frame behind ``handle``.
+
+        The view is only valid while the caller holds a reference.
+
+        Raises
+        ------
+        ValueError
+            If the handle's slot has been recycled since it was issued.
+        """
+
+        with self._lock:
+            self._check(handle)
+        return self._view(handle)
+
+    def retain(self, handle: FrameHandle) -> FrameHandle:
+        """Add a reference to the frame, e.g. before handing it to a second consumer."""
+
+        with self._lock:
+            self._check(handle)
+            self._refcounts[handle.slot] += 1
+        return handle
+
+    def release(self, handle: FrameHandle) -> None:
+        """Drop a reference; the slot is recycled when none are left."""
+
+        with self._lock:
+            self._check(handle)
+            self._refcounts[handle.slot] -= 1
+            if self._refcounts[handle.slot] > 0:
+                return
+            self._generations[handle.slot] += 1
+        self._free.release()
+
+    def refcount(self, handle: FrameHandle) -> int:
+        """Current reference count of the handle's frame (0 if recycled)."""
+
+        with self._lock:
+            if self._generations[handle.slot] != handle.generation:
+                return 0
+            return int(self._refcounts[handle.slot])
+
+    @property
+    def in_use(self) -> int:
+        """Number of slots currently holding a frame."""
+
+        with self._lock:
+            return int(np.count_nonzero(self._refcounts))
+
+    def _check(self, handle: FrameHandle) -> None:
+        if not 0 <= handle.slot < self.slots:
+            raise ValueError(f"Frame slot {handle.slot} is out of range.")
+        if self._generations[handle.slot] != handle.generation or self._refcounts[handle.slot] <= 0:
+            raise ValueError(f"Stale frame handle for slot {handle.slot}; the frame was already released.")
+
+    def _view(self, handle: FrameHandle) -> np.ndarray:
+        offset = self._header_bytes + handle.slot * self._stride
+        return np.ndarray(handle.shape, dtype=np.dtype(handle.dtype), buffer=self._shm.buf, offset=offset)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def close(self) -> None:
+        """Unmap the segment in this process; the creator also unlinks it.
+
+        All views obtained from this pool must be dropped first.
+        """
+
+        self._refcounts = self._generations = None  # type: ignore[assignment]
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedFramePool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
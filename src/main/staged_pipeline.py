@@ -0,0 +1,252 @@
+"""Producer/consumer pipeline of independent stages joined by bounded queues.
+
+Each :class:`Stage` runs its function on its own pool of worker threads
+(OpenCV and file I/O release the GIL) and hands results to the next stage
+through a bounded queue::
+
+    engine = StagedPipeline([
+        Stage("read", read_bytes, workers=1),
+        Stage("decode", decode, workers=2),
+        Stage("enhance", enhance, workers=4),
+        Stage("write", write, workers=1),
+    ], queue_size=4)
+    for outcome in engine.run(paths):
+        ...
+    print(engine.report())
+
+A slow stage only blocks the stages feeding it once its input queue is
+full, and fast stages downstream simply wait, so every stage works at the
+pace of the slowest one while at most ``queue_size`` items wait between two
+stages. Memory therefore stays bounded however fast the source (e.g. the
+disk) produces items.
+
+Failures do not stop the pipeline: the item is passed through the remaining
+stages untouched and surfaces as a :class:`StageOutcome` with ``error``
+set. Each stage call is wrapped in ``instrumentation.timed("pipeline.<stage>")``.
+
+Per-stage :class:`StageStats` report busy time and time spent waiting for
+input (starved) or for room downstream (blocked). A utilization close to 1
+marks the bottleneck stage, which needs more workers; stages with low
+utilization and high input wait can give workers away.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from queue import Empty, Full, Queue
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence
+
+from .instrumentation import timed
+
+# How often blocked workers re-check for cancellation, in seconds
+_POLL_S = 0.1
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline stage: ``fn`` maps an item to the next stage's item."""
+
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass(frozen=True)
+class StageOutcome:
+    """An item leaving the pipeline; ``error``/``stage`` are set on failure."""
+
+    value: Any
+    error: Optional[str] = None
+    stage: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class StageStats:
+    """Counters of one stage over a :meth:`StagedPipeline.run`.
+
+    ``elapsed_s`` is the wall time of the whole run, set when it ends.
+    """
+
+    name: str
+    workers: int
+    items: int = 0
+    failed: int = 0
+    busy_s: float = 0.0
+    wait_input_s: float = 0.0
+    wait_output_s: float = 0.0
+    elapsed_s: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the stage's worker time over the run spent in ``fn``."""
+
+        capacity = self.elapsed_s * self.workers
+        return self.busy_s / capacity if capacity > 0 else 0.0
+
+
+class _Stop(Exception):
+    pass
+
+
+_DONE = object()
+
+
+class StagedPipeline:
+    """Runs items through ``stages`` with bounded queues between them.
+
+    Parameters
+    ----------
+    stages:
+        Stages in order; the first receives the items passed to
+        :meth:`run`.
+    queue_size:
+        Capacity of each inter-stage queue (and of the output queue).
+    """
+
+    def __init__(self, stages: Sequence[Stage], *, queue_size: int = 4) -> None:
+        if not stages:
+            raise ValueError("At least one stage is required.")
+        if queue_size < 1:
+            raise ValueError("queue_size must be >= 1")
+        for stage in stages:
+            if stage.workers < 1:
+                raise ValueError(f"Stage {stage.name!r} needs at least one worker.")
+        self.stages = list(stages)
+        self.queue_size = queue_size
+        self._stats: List[StageStats] = [StageStats(s.name, s.workers) for s in self.stages]
+
+    def stats(self) -> List[StageStats]:
+        """Per-stage counters of the most recent (or current) run."""
+
+        return list(self._stats)
+
+    def report(self) -> str:
+        """Human-readable utilization table of the most recent run."""
+
+        header = ("stage", "workers", "items", "util", "busy s", "starved s", "blocked s")
+        lines = ["{:<10} {:>7} {:>7} {:>6} {:>8} {:>9} {:>9}".format(*header)]
+        for s in self._stats:
+            lines.append(
+                f"{s.name:<10} {s.workers:>7} {s.items:>7} {s.utilization:>6.0%} "
+                f"{s.busy_s:>8.2f} {s.wait_input_s:>9.2f} {s.wait_output_s:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    def run(self, items: Iterable[Any]) -> Iterator[StageOutcome]:
+        """Feed ``items`` through all stages, yielding outcomes as they finish.
+
+        Outcomes arrive in completion order. Closing the iterator early
+        cancels the remaining work.
+        """
+
+        self._stats = [StageStats(s.name, s.workers) for s in self.stages]
+        stop = threading.Event()
+        queues: List[Queue] = [Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        lock = threading.Lock()
+        remaining = [s.workers for s in self.stages]
+        start = time.perf_counter()
+
+        def put(q: Queue, item: Any) -> float:
+            t0 = time.perf_counter()
+            while True:
+                try:
+                    q.put(item, timeout=_POLL_S)
+                    return time.perf_counter() - t0
+                except Full:
+                    if stop.is_set():
+                        raise _Stop
+
+        def get(q: Queue) -> Any:
+            while True:
+                try:
+                    return q.get(timeout=_POLL_S)
+                except Empty:
+                    if stop.is_set():
+                        raise _Stop
+
+        def feed() -> None:
+            try:
+                for item in items:
+                    put(queues[0], StageOutcome(item))
+                for _ in range(self.stages[0].workers):
+                    put(queues[0], _DONE)
+            except _Stop:
+                pass
+            except BaseException as exc:  # surface iterator errors to the consumer
+                try:
+                    put(queues[-1], StageOutcome(None, f"{type(exc).__name__}: {exc}", "source"))
+                    for _ in range(self.stages[0].workers):
+                        put(queues[0], _DONE)
+                except _Stop:
+                    pass
+
+        def work(index: int) -> None:
+            stage, stats = self.stages[index], self._stats[index]
+            inbox, outbox = queues[index], queues[index + 1]
+            busy = wait_in = wait_out = 0.0
+            count = failed = 0
+            try:
+                while True:
+                    t0 = time.perf_counter()
+                    envelope = get(inbox)
+                    wait_in += time.perf_counter() - t0
+                    if envelope is _DONE:
+                        break
+                    if envelope.ok:
+                        t0 = time.perf_counter()
+                        try:
+                            with timed(f"pipeline.{stage.name}"):
+                                envelope = StageOutcome(stage.fn(envelope.value))
+                        except Exception as exc:  # reported per item; the pipeline continues
+                            envelope = StageOutcome(envelope.value, f"{type(exc).__name__}: {exc}", stage.name)
+                            failed += 1
+                        busy += time.perf_counter() - t0
+                        count += 1
+                    wait_out += put(outbox, envelope)
+            except _Stop:
+                return
+            finally:
+                with lock:
+                    stats.items += count
+                    stats.failed += failed
+                    stats.busy_s += busy
+                    stats.wait_input_s += wait_in
+                    stats.wait_output_s += wait_out
+                    remaining[index] -= 1
+                    last = remaining[index] == 0
+            if last:
+                # The last worker of a stage tells the next stage to finish
+                successors = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+                try:
+                    for _ in range(successors):
+                        put(outbox, _DONE)
+                except _Stop:
+                    pass
+
+        threads = [threading.Thread(target=feed, name="pipeline-source", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            threads.extend(
+                threading.Thread(target=work, args=(index,), name=f"pipeline-{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                outcome = queues[-1].get()
+                if outcome is _DONE:
+                    break
+                yield outcome
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            for stats in self._stats:
+                stats.elapsed_s = elapsed
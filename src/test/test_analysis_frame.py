@@ -0,0 +1,73 @@
+"""Unit tests for the shared per-image AnalysisFrame."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.main.distortion_analyser import DistortionAnalyzer
+from src.main.distortion_component import analysis_frame
+
+
+def _make_image(h: int = 64, w: int = 80, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+
+
+def test_path_bound_image_is_decoded_once(tmp_path: Path, monkeypatch) -> None:
+    img_path = tmp_path / "sample.png"
+    cv2.imwrite(str(img_path), _make_image())
+
+    calls = []
+    real_read_image = analysis_frame.read_image
+
+    def counting_read_image(*args, **kwargs):
+        calls.append(args[0])
+        return real_read_image(*args, **kwargs)
+
+    monkeypatch.setattr(analysis_frame, "read_image", counting_read_image)
+
+    analyzer = DistortionAnalyzer()
+    analyzer.bind_image(path=img_path)
+    analyzer.analyze()
+
+    assert len(calls) == 1
+
+
+def test_frame_metrics_match_direct_computation() -> None:
+    img = _make_image(seed=1)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    analyzer = DistortionAnalyzer(overexposure_threshold=200)
+    analyzer.bind_image(image=img)
+    metrics = analyzer.analyze()
+
+    assert np.isclose(metrics.sharpness, cv2.Laplacian(gray, ddepth=cv2.CV_64F).var())
+    assert np.isclose(metrics.noise_variance, gray.var())
+    assert np.isclose(metrics.illumination_uniformity, gray.std() / gray.mean())
+    assert np.isclose(metrics.overexposure_ratio, np.count_nonzero(gray >= 200) / gray.size)
+
+
+def test_reduced_scale_decodes_luminance_only(tmp_path: Path) -> None:
+    img = _make_image(h=120, w=90, seed=2)
+    img_path = tmp_path / "sample.jpg"
+    cv2.imwrite(str(img_path), img)
+
+    from_path = analysis_frame.AnalysisFrame(path=img_path, scale=4)
+    from_array = analysis_frame.AnalysisFrame(img, scale=4)
+
+    assert from_path.image.ndim == 2
+    assert from_path.gray.shape == (30, 23)
+    assert from_array.gray.shape == (30, 23)
+
+
+def test_analyzer_records_scale() -> None:
+    analyzer = DistortionAnalyzer(scale=2)
+    analyzer.bind_image(image=_make_image(seed=3))
+
+    metrics = analyzer.analyze()
+
+    assert metrics.scale == 2
+    assert analyzer.frame.gray.shape == (32, 40)
@@ -0,0 +1,66 @@
+"""Unit tests for the asyncio analysis / enhancement entry points."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import numpy as np
+
+from src.main.async_api import AsyncImageProcessor, analyze_async
+from src.main.distortion_analyser import DistortionAnalyzer
+from src.main.enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan, SharpnessLevel
+from src.main.enhancers_executor import apply_enhancement_plan
+
+
+def _make_image(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(40, 50, 3), dtype=np.uint8)
+
+
+def test_async_results_match_sync_api() -> None:
+    img = _make_image()
+    plan = EnhancementPlan(
+        sharpness_level=SharpnessLevel.SLIGHT_BLUR,
+        ops=[EnhancementOp(EnhancementOpType.SHARPEN_LIGHT, strength=0.5)],
+        quality_penalty=0.95,
+    )
+    analyzer = DistortionAnalyzer()
+    analyzer.bind_image(image=img)
+
+    async def run():
+        async with AsyncImageProcessor(max_workers=2) as processor:
+            enhanced = await processor.enhance_async(img, plan)
+        metrics = await analyze_async(img)
+        return metrics, enhanced
+
+    metrics, enhanced = asyncio.run(run())
+
+    assert metrics == analyzer.analyze()
+    np.testing.assert_array_equal(enhanced, apply_enhancement_plan(img, plan))
+
+
+def test_concurrency_cap_and_cancellation() -> None:
+    processor = AsyncImageProcessor(max_workers=4, max_concurrency=2)
+    gate = threading.Event()
+    running = []
+
+    def blocking(i: int) -> int:
+        running.append(i)
+        gate.wait(5)
+        return i
+
+    async def run():
+        tasks = [asyncio.create_task(processor._submit(blocking, i)) for i in range(4)]
+        await asyncio.sleep(0.05)
+        assert len(running) == 2  # capped despite 4 worker threads
+
+        tasks[0].cancel()
+        await asyncio.sleep(0.05)
+        assert len(running) == 2  # cancelled work still holds its slot while running
+
+        gate.set()
+        return await asyncio.gather(*tasks[1:])
+
+    assert asyncio.run(run()) == [1, 2, 3]
+    processor.close()
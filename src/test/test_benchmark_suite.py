@@ -0,0 +1,34 @@
+"""Smoke tests for the benchmark suite (tiny images, single repeat)."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.bench import benchmark_suite as bench
+
+
+def test_run_save_and_compare(tmp_path: Path) -> None:
+    cases = [c for c in bench.default_cases() if c.case_id in {"analyzer/distortion_analyzer", "enhancer/gamma"}]
+    results = bench.run_benchmarks(cases, [0.01], repeats=2, warmup=0, log=None)
+
+    assert [r.key for r in results] == ["analyzer/distortion_analyzer@0.01MP", "enhancer/gamma@0.01MP"]
+    assert all(r.p50_ms > 0 and r.megapixels_per_s > 0 for r in results)
+
+    out = tmp_path / "baseline.json"
+    bench.save_results(results, out)
+    baseline = bench.load_results(out)
+    slower = {k: dict(v, p50_ms=v["p50_ms"] * 2) for k, v in baseline.items()}
+
+    changes = [c.change for c in bench.compare_results(baseline, slower)]
+    assert changes == [1.0, 1.0]
+    added = dict(slower, **{"enhancer/new@0.01MP": baseline["enhancer/gamma@0.01MP"]})
+    del added["analyzer/distortion_analyzer@0.01MP"]
+    assert bench.unmatched_cases(baseline, added) == (["enhancer/new@0.01MP"], ["analyzer/distortion_analyzer@0.01MP"])
+    assert bench.main(["compare", str(out), str(out)]) == 0
+
+
+def test_denoise_quality_report() -> None:
+    results = bench.denoise_quality_report([0.01], [0.0, 1.0], repeats=1, log=None)
+
+    assert [(r.quality, r.search_window, r.chroma_factor) for r in results] == [(0.0, 7, 4), (1.0, 21, 2)]
+    assert all(r.exact_ms > 0 and r.fast_ms > 0 and r.psnr_db > 25.0 for r in results)
@@ -0,0 +1,68 @@
+"""Unit tests for arena-backed, allocation-free plan execution."""
+
+from __future__ import annotations
+
+import tracemalloc
+
+import numpy as np
+
+from src.main.buffer_arena import ImageArena, scratch_buffer
+from src.main.enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan, SharpnessLevel
+from src.main.enhancers_executor import apply_enhancement_plan
+
+
+def _plan() -> EnhancementPlan:
+    ops = [
+        EnhancementOp(EnhancementOpType.SHARPEN_LIGHT, 0.5),
+        EnhancementOp(EnhancementOpType.DEBLUR, 0.6),
+        EnhancementOp(EnhancementOpType.SHARPEN_MEDIUM, 0.7),
+        EnhancementOp(EnhancementOpType.CLAHE, 1.0),
+        EnhancementOp(EnhancementOpType.GAMMA_INCREASE, 0.2),
+        EnhancementOp(EnhancementOpType.MARK_AS_LOW_QUALITY),
+    ]
+    return EnhancementPlan(sharpness_level=SharpnessLevel.MODERATE_BLUR, ops=ops, quality_penalty=0.0)
+
+
+def test_arena_output_matches_and_leaves_input_untouched() -> None:
+    rng = np.random.default_rng(3)
+    img = rng.integers(0, 256, size=(64, 80, 3), dtype=np.uint8)
+    original = img.copy()
+    plan = _plan()
+    arena = ImageArena()
+
+    for debug in (False, True):
+        expected = apply_enhancement_plan(img, plan, debug=debug)
+        result = apply_enhancement_plan(img, plan, debug=debug, arena=arena)
+        assert np.array_equal(result, expected)
+        assert not np.may_share_memory(result, img)
+    assert np.array_equal(img, original)
+    assert arena.nbytes == 2 * img.nbytes
+
+
+def test_arena_steady_state_allocates_nothing() -> None:
+    rng = np.random.default_rng(4)
+    img = rng.integers(0, 256, size=(256, 256, 3), dtype=np.uint8)
+    plan = _plan()
+    arena = ImageArena()
+    apply_enhancement_plan(img, plan, arena=arena)
+
+    tracemalloc.start()
+    try:
+        apply_enhancement_plan(img, plan, arena=arena)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < img.nbytes // 4
+
+
+def test_buffers_are_reused_until_shape_changes() -> None:
+    arena = ImageArena()
+    src = np.zeros((4, 5, 3), dtype=np.uint8)
+    first = arena.output_for(src)
+    second = arena.output_for(first)
+    assert first is not second and arena.output_for(second) is first
+    assert arena.output_for(np.zeros((6, 5, 3), dtype=np.uint8)).shape == (6, 5, 3)
+
+    buf = scratch_buffer("test", (3, 3))
+    assert scratch_buffer("test", (3, 3)) is buf
+    assert scratch_buffer("test", (4, 3)) is not buf
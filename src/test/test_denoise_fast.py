@@ -0,0 +1,49 @@
+"""Unit tests for the approximate fast mode of DenoiseStrongEnhancer."""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+from src.main.enhancement import EnhancementConfig
+from src.main.enhancers_denoise import DenoiseStrongEnhancer, fast_nlm_parameters
+
+
+def _noisy_image() -> np.ndarray:
+    rng = np.random.default_rng(6)
+    yy, xx = np.mgrid[0:72, 0:96]
+    base = np.dstack([60 + xx, 80 + yy, 120 + (xx + yy) // 2]).astype(np.float32)
+    return np.clip(base + rng.normal(0, 8, base.shape), 0, 255).astype(np.uint8)
+
+
+def _fast(quality: float) -> DenoiseStrongEnhancer:
+    config = EnhancementConfig(metadata={"denoise_strong_mode": "fast", "denoise_strong_quality": quality})
+    return DenoiseStrongEnhancer(config=config)
+
+
+def test_fast_mode_approximates_exact_mode() -> None:
+    img = _noisy_image()
+    exact = DenoiseStrongEnhancer().apply(img, 0.8)
+    assert DenoiseStrongEnhancer().halo() == 13
+
+    fast = _fast(0.5)
+    result = fast.apply(img, 0.8)
+    assert result.shape == img.shape
+    assert cv2.PSNR(result, exact) > 35.0
+    assert cv2.PSNR(result, exact) > cv2.PSNR(img, exact)
+    assert fast.halo() is None
+
+    out = np.empty_like(img)
+    assert fast.apply(img, 0.8, out) is out
+    assert np.array_equal(out, result)
+
+
+def test_quality_knob_and_mode_validation() -> None:
+    assert fast_nlm_parameters(0.0) == (7, 4)
+    assert fast_nlm_parameters(1.0) == (21, 2)
+    assert _fast(3.0).quality == 1.0
+
+    enhancer = DenoiseStrongEnhancer(config=EnhancementConfig(metadata={"denoise_strong_mode": "turbo"}))
+    with pytest.raises(ValueError):
+        enhancer.apply(_noisy_image())
@@ -0,0 +1,71 @@
+"""Unit tests for DistortionAnalyzer.analyze_batch."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from src.main.distortion_analyser import DistortionAnalyzer
+
+
+def _make_image(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_analyze_batch_matches_single_analysis_and_reports_errors(tmp_path: Path, workers: int) -> None:
+    good_path = tmp_path / "good.png"
+    cv2.imwrite(str(good_path), _make_image(0))
+    corrupt_path = tmp_path / "corrupt.jpg"
+    corrupt_path.write_bytes(b"not an image")
+    array = _make_image(1)
+
+    analyzer = DistortionAnalyzer()
+    result = analyzer.analyze_batch([good_path, corrupt_path, array], workers=workers)
+
+    assert result.metrics.shape == (3, len(analyzer.metrics_names()))
+    assert list(result.errors) == [1]
+    assert np.isnan(result.metrics[1]).all()
+    assert result.ok.tolist() == [True, False, True]
+
+    for row, item in ((0, {"path": good_path}), (2, {"image": array})):
+        analyzer.bind_image(**item)
+        np.testing.assert_allclose(result.metrics[row], analyzer.analyze().as_vector())
+
+
+def test_iter_analyze_streams_directory(tmp_path: Path) -> None:
+    expected = {}
+    analyzer = DistortionAnalyzer()
+    for i in range(5):
+        path = tmp_path / f"img_{i}.png"
+        cv2.imwrite(str(path), _make_image(i))
+        analyzer.bind_image(path=path)
+        expected[path] = analyzer.analyze().as_vector()
+    nested = tmp_path / "nested"
+    nested.mkdir()
+    cv2.imwrite(str(nested / "deep.png"), _make_image(9))
+    (tmp_path / "notes.txt").write_text("not an image", encoding="utf-8")
+
+    results = dict(analyzer.iter_analyze(tmp_path, prefetch=2))
+
+    assert set(results) == set(expected)
+    for path, metrics in results.items():
+        np.testing.assert_allclose(metrics.as_vector(), expected[path])
+
+    assert len(dict(analyzer.iter_analyze(tmp_path, prefetch=2, recursive=True))) == 6
+
+
+def test_iter_analyze_error_handling(tmp_path: Path) -> None:
+    cv2.imwrite(str(tmp_path / "good.png"), _make_image(0))
+    (tmp_path / "corrupt.jpg").write_bytes(b"not an image")
+    analyzer = DistortionAnalyzer()
+
+    with pytest.raises(IOError):
+        list(analyzer.iter_analyze(tmp_path))
+
+    results = list(analyzer.iter_analyze(tmp_path, skip_errors=True))
+    assert [path.name for path, _ in results] == ["good.png"]
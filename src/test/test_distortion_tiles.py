@@ -0,0 +1,40 @@
+"""Unit tests for DistortionAnalyzer.analyze_tiles."""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+from src.main.distortion_analyser import DistortionAnalyzer
+
+
+def test_tile_maps_match_per_tile_computation() -> None:
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, size=(61, 83, 3), dtype=np.uint8)
+    img[:20, :30] = 255  # saturated, flat corner
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    lap = cv2.Laplacian(gray, ddepth=cv2.CV_64F)
+
+    analyzer = DistortionAnalyzer(overexposure_threshold=250)
+    analyzer.bind_image(image=img)
+    maps = analyzer.analyze_tiles(grid=(4, 3))
+
+    assert maps.as_stack().shape == (4, 3, 4)
+    rows, cols = maps.row_edges, maps.col_edges
+    for i in range(3):
+        for j in range(4):
+            tile = gray[rows[i]:rows[i + 1], cols[j]:cols[j + 1]]
+            lap_tile = lap[rows[i]:rows[i + 1], cols[j]:cols[j + 1]]
+            assert np.isclose(maps.sharpness[i, j], lap_tile.var())
+            assert np.isclose(maps.noise_variance[i, j], tile.var(), atol=1e-6)
+            assert np.isclose(maps.illumination_uniformity[i, j], tile.std() / tile.mean(), atol=1e-6)
+            assert np.isclose(maps.overexposure_ratio[i, j], np.count_nonzero(tile >= 250) / tile.size)
+
+
+def test_tile_grid_larger_than_image_is_rejected() -> None:
+    analyzer = DistortionAnalyzer()
+    analyzer.bind_image(image=np.zeros((4, 4), dtype=np.uint8))
+
+    with pytest.raises(ValueError):
+        analyzer.analyze_tiles(grid=(8, 2))
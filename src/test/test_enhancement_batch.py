@@ -0,0 +1,62 @@
+"""Unit tests for plan-signature grouped batch enhancement."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.main.enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan, SharpnessLevel
+from src.main.enhancers_executor import apply_enhancement_batch, apply_enhancement_plan, plan_signature
+
+
+def _image(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+
+
+def _plan(level: SharpnessLevel, *ops: EnhancementOp) -> EnhancementPlan:
+    return EnhancementPlan(sharpness_level=level, ops=list(ops), quality_penalty=0.0)
+
+
+def test_plan_signature_ignores_level_and_penalty() -> None:
+    ops = (EnhancementOp(EnhancementOpType.DEBLUR, 0.6), EnhancementOp(EnhancementOpType.GAMMA_INCREASE, 0.2))
+    first = _plan(SharpnessLevel.CLEAR, *ops)
+    second = EnhancementPlan(SharpnessLevel.HEAVY_BLUR, list(ops), quality_penalty=0.4)
+    other = _plan(SharpnessLevel.CLEAR, EnhancementOp(EnhancementOpType.DEBLUR, 0.7), ops[1])
+
+    assert plan_signature(first) == plan_signature(second)
+    assert plan_signature(first) != plan_signature(other)
+    assert len({plan_signature(first), plan_signature(second), plan_signature(other)}) == 2
+
+
+def test_plan_signature_normalizes_default_strength() -> None:
+    implicit = _plan(SharpnessLevel.CLEAR, EnhancementOp(EnhancementOpType.CLAHE))
+    explicit = _plan(SharpnessLevel.CLEAR, EnhancementOp(EnhancementOpType.CLAHE, 1.0))
+    assert plan_signature(implicit) == plan_signature(explicit)
+
+    image = _image(0)
+    assert np.array_equal(apply_enhancement_plan(image, implicit), apply_enhancement_plan(image, explicit))
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_batch_matches_per_image_execution_in_order(workers: int) -> None:
+    sharpen = _plan(SharpnessLevel.SLIGHT_BLUR, EnhancementOp(EnhancementOpType.SHARPEN_LIGHT, 0.5))
+    mixed = _plan(
+        SharpnessLevel.MODERATE_BLUR,
+        EnhancementOp(EnhancementOpType.DEBLUR, 0.6),
+        EnhancementOp(EnhancementOpType.CLAHE, 1.0),
+    )
+    empty = _plan(SharpnessLevel.CLEAR)
+    images = [_image(i) for i in range(7)]
+    plans = [sharpen, mixed, sharpen, empty, mixed, sharpen, empty]
+
+    results = apply_enhancement_batch(images, plans, workers=workers)
+
+    assert len(results) == len(images)
+    for image, plan, result in zip(images, plans, results):
+        assert np.array_equal(result, apply_enhancement_plan(image, plan))
+
+
+def test_batch_rejects_mismatched_lengths() -> None:
+    with pytest.raises(ValueError):
+        apply_enhancement_batch([_image(0)], [])
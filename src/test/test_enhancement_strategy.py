@@ -2,16 +2,21 @@
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
 
+import cv2
 import numpy as np
+import pytest
 
-from src.main.distortion_analyser import DistortionMetrics
+from src.main.distortion_analyser import DistortionAnalyzer, DistortionMetrics
 from src.main.enhancement_strategy import (
+    SHARPNESS_CRITERIA_CSV,
     EnhancementOpType,
     EnhancementPlanner,
     SharpnessCriteria,
     SharpnessLevel,
+    calibrate_scale_rules,
 )
 
 
@@ -44,6 +49,133 @@ def test_sharpness_classification_uses_csv(tmp_path: Path) -> None:
     assert criteria.classify(3.0) is SharpnessLevel.HEAVY_BLUR
 
 
+def test_sharpness_classification_per_scale(tmp_path: Path) -> None:
+    csv_path = tmp_path / "sharpness_criteria.csv"
+    csv_path.write_text(
+        "Sharpness_Level,Lower_Bound,Upper_Bound,Scale\n"
+        "Clear,25,9999,\n"
+        "Heavy_Blur,0,25,\n"
+        "Clear,100,9999,2\n"
+        "Heavy_Blur,0,100,2\n",
+        encoding="utf-8",
+    )
+
+    criteria = SharpnessCriteria(csv_path=csv_path)
+
+    assert len(criteria.rules) == 2
+    # Dedicated rows for scale 2
+    assert criteria.classify(50.0, scale=2) is SharpnessLevel.HEAVY_BLUR
+    assert criteria.classify(150.0, scale=2) is SharpnessLevel.CLEAR
+    # No rows for scale 4: there is no safe conversion from scale 1
+    with pytest.raises(ValueError, match="scale 4"):
+        criteria.classify(480.0, scale=4)
+    with pytest.raises(ValueError, match="scale 4"):
+        criteria.classify_many(np.array([480.0]), scale=4)
+
+
+def _scan(rules, score: float) -> SharpnessLevel:
+    # Reference: the narrowest-interval-first linear scan
+    for rule in rules:
+        if rule.lower_bound <= score <= rule.upper_bound:
+            return rule.level
+    return SharpnessLevel.HEAVY_BLUR
+
+
+def test_compiled_index_matches_linear_scan(tmp_path: Path) -> None:
+    rng = np.random.default_rng(3)
+    levels = list(SharpnessLevel)
+    rows = []
+    for _ in range(40):
+        lo, hi = sorted(rng.integers(0, 60, size=2) / 2.0)
+        rows.append(f"{levels[rng.integers(len(levels))].value},{lo},{hi}")
+    csv_path = tmp_path / "sharpness_criteria.csv"
+    csv_path.write_text("Sharpness_Level,Lower_Bound,Upper_Bound\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    criteria = SharpnessCriteria(csv_path=csv_path)
+
+    # Every bound, points just beside it, random scores and out-of-range values
+    bounds = np.unique([[r.lower_bound, r.upper_bound] for r in criteria.rules])
+    scores = np.concatenate(
+        [bounds, np.nextafter(bounds, -np.inf), np.nextafter(bounds, np.inf), rng.uniform(-5, 35, 500), [np.nan, np.inf]]
+    )
+    expected = [_scan(criteria.rules, float(s)) for s in scores]
+    assert [criteria.classify(float(s)) for s in scores] == expected
+    assert list(criteria.classify_many(scores)) == expected
+
+    grid = scores[:200].reshape(10, 20)
+    assert criteria.classify_many(grid).shape == (10, 20)
+    # Scalars and 0-d arrays keep their shape
+    assert criteria.classify_many(np.float64(20.0)).shape == ()
+    assert criteria.classify_many(np.array(20.0))[()] is criteria.classify(20.0)
+    assert criteria.classify_many(float("nan"))[()] is SharpnessLevel.HEAVY_BLUR
+
+
+def test_criteria_reload_when_csv_changes(tmp_path: Path) -> None:
+    csv_path = tmp_path / "sharpness_criteria.csv"
+    csv_path.write_text("Sharpness_Level,Lower_Bound,Upper_Bound\nClear,25,9999\nHeavy_Blur,0,25\n", encoding="utf-8")
+    criteria = SharpnessCriteria(csv_path=csv_path, reload_interval=0.0)
+    assert criteria.classify(20.0) is SharpnessLevel.HEAVY_BLUR
+    assert criteria.reload() is False
+
+    csv_path.write_text("Sharpness_Level,Lower_Bound,Upper_Bound\nClear,15,9999\nHeavy_Blur,0,15\n", encoding="utf-8")
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert criteria.classify(20.0) is SharpnessLevel.CLEAR
+
+    # A vanished file keeps the last rules; a missing file is only an error on first load
+    csv_path.unlink()
+    assert criteria.classify(20.0) is SharpnessLevel.CLEAR
+    with pytest.raises(FileNotFoundError):
+        SharpnessCriteria(csv_path=tmp_path / "missing.csv").classify(20.0)
+
+
+def _sharpness(image: np.ndarray, scale: int) -> float:
+    analyzer = DistortionAnalyzer(scale=scale)
+    analyzer.bind_image(image)
+    return analyzer.analyze().sharpness
+
+
+def _texture(seed: int, sigma: float) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    image = cv2.GaussianBlur(rng.integers(0, 256, size=(192, 256, 3), dtype=np.uint8), (0, 0), 1.5)
+    return cv2.GaussianBlur(image, (0, 0), sigma) if sigma else image
+
+
+@pytest.mark.parametrize("scale", [2, 4])
+def test_reduced_scale_matches_full_resolution_level(tmp_path: Path, scale: int) -> None:
+    full_rules = SharpnessCriteria(csv_path=SHARPNESS_CRITERIA_CSV).rules
+    # Calibrate on one set of images, from sharp to heavily blurred
+    sigmas = [0.0, 0.4, 0.8, 1.2, 1.6, 2.0, 2.5, 3.0, 4.0, 6.0]
+    calibration = [_texture(seed, sigma) for seed in (1, 2) for sigma in sigmas]
+    rules = calibrate_scale_rules(
+        [_sharpness(img, 1) for img in calibration], [_sharpness(img, scale) for img in calibration], scale, full_rules
+    )
+    assert all(rule.scale == scale for rule in rules)
+
+    csv_path = tmp_path / "sharpness_criteria.csv"
+    csv_path.write_text(
+        "Sharpness_Level,Lower_Bound,Upper_Bound,Scale\n"
+        + "".join(f"{r.level.value},{r.lower_bound},{r.upper_bound},\n" for r in full_rules)
+        + "".join(f"{r.level.value},{r.lower_bound!r},{r.upper_bound!r},{r.scale}\n" for r in rules),
+        encoding="utf-8",
+    )
+    criteria = SharpnessCriteria(csv_path=csv_path)
+
+    # Unseen images: sharp, slightly blurred and heavily blurred
+    expected = [SharpnessLevel.CLEAR, SharpnessLevel.SLIGHT_BLUR, SharpnessLevel.HEAVY_BLUR]
+    for sigma, level in zip([0.0, 0.7, 4.5], expected):
+        image = _texture(7, sigma)
+        assert criteria.classify(_sharpness(image, 1)) is level
+        assert criteria.classify(_sharpness(image, scale), scale=scale) is level
+
+
+def test_calibrate_scale_rules_rejects_bad_input() -> None:
+    rules = SharpnessCriteria(csv_path=SHARPNESS_CRITERIA_CSV).rules
+    with pytest.raises(ValueError):
+        calibrate_scale_rules([10.0, 20.0], [40.0, 80.0], 1, rules)
+    with pytest.raises(ValueError):
+        calibrate_scale_rules([10.0], [40.0], 2, rules)
+
+
 def test_build_plan_for_clear_level() -> None:
     planner = EnhancementPlanner()
 
@@ -0,0 +1,84 @@
+"""Unit tests for the enhancer registry and the per-strength resource cache."""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+
+from src.main.enhancement import BaseImageEnhancer
+from src.main.enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan, SharpnessLevel
+from src.main.enhancer_resources import ResourceCache, quantize_strength, resource_cache
+from src.main.enhancers_executor import EnhancerRegistry, apply_enhancement_plan, default_registry
+from src.main.enhancers_sharpen_deblur import DeblurEnhancer
+from src.main.enhancers_tone_localcontrast import CLAHEEnhancer, GammaAdjustEnhancer
+
+
+def _image() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(40, 48, 3), dtype=np.uint8)
+
+
+def test_registry_matches_direct_enhancers() -> None:
+    img = _image()
+
+    deblur = DeblurEnhancer(strength=0.6)
+    deblur.bind_image(image=img)
+    darken = GammaAdjustEnhancer(strength=-0.3)
+    darken.bind_image(image=img)
+
+    registry = default_registry()
+    assert np.array_equal(registry.apply(EnhancementOp(EnhancementOpType.DEBLUR, 0.6), img), deblur.enhance())
+    # GAMMA_DECREASE negates the op strength
+    assert np.array_equal(registry.apply(EnhancementOp(EnhancementOpType.GAMMA_DECREASE, 0.3), img), darken.enhance())
+    # Ops that do not touch pixels pass the image through
+    assert registry.apply(EnhancementOp(EnhancementOpType.MARK_AS_LOW_QUALITY), img) is img
+
+
+def test_custom_enhancer_plugs_in() -> None:
+    class InvertEnhancer(BaseImageEnhancer):
+        def enhance(self):
+            return self.apply(self._load_image())
+
+        def apply(self, image, strength=None):
+            return 255 - image
+
+    registry = EnhancerRegistry()
+    registry.register(EnhancementOpType.MARK_AS_LOW_QUALITY, InvertEnhancer())
+    plan = EnhancementPlan(
+        sharpness_level=SharpnessLevel.CLEAR,
+        ops=[EnhancementOp(EnhancementOpType.MARK_AS_LOW_QUALITY), EnhancementOp(EnhancementOpType.DEBLUR, 0.6)],
+        quality_penalty=0.0,
+    )
+    img = _image()
+    # DEBLUR is not registered here, so only the custom op runs
+    assert np.array_equal(apply_enhancement_plan(img, plan, registry=registry), 255 - img)
+
+
+def test_resource_cache_reuses_by_quantized_strength() -> None:
+    cache = ResourceCache()
+    calls = []
+    first = cache.shared(("k", quantize_strength(0.3)), lambda: calls.append(1) or np.zeros(3))
+    second = cache.shared(("k", quantize_strength(0.30000001)), lambda: calls.append(1) or np.zeros(3))
+    assert first is second and len(calls) == 1
+    assert not first.flags.writeable
+
+
+def test_clahe_objects_are_per_thread() -> None:
+    img = _image()
+    enhancer = CLAHEEnhancer()
+    enhancer.apply(img, 1.0)
+    main_clahe = resource_cache.per_thread(("clahe", 1.0), lambda: None)
+    assert main_clahe is not None
+
+    seen = []
+
+    def worker() -> None:
+        enhancer.apply(img, 1.0)
+        seen.append(resource_cache.per_thread(("clahe", 1.0), lambda: None))
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen[0] is not None and seen[0] is not main_clahe
+    assert resource_cache.per_thread(("clahe", 1.0), lambda: None) is main_clahe
@@ -0,0 +1,77 @@
+"""Unit tests for the image codec layer."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from src.main import image_codec
+from src.main.image_codec import configure_codec, decode_image, encode_image, read_image, write_image
+
+
+def _image() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return cv2.GaussianBlur(rng.integers(0, 256, size=(64, 96, 3), dtype=np.uint8), (0, 0), 2)
+
+
+def test_opencv_round_trip_from_bytes_and_memoryview(tmp_path: Path) -> None:
+    img = _image()
+    png = encode_image(img, ".png")
+    assert np.array_equal(decode_image(png.tobytes()), img)
+    assert np.array_equal(decode_image(memoryview(png)), img)
+
+    path = tmp_path / "a.png"
+    write_image(path, img)
+    assert np.array_equal(read_image(path), img)
+    assert np.array_equal(read_image(path, grayscale=True), cv2.imread(str(path), cv2.IMREAD_GRAYSCALE))
+
+
+def test_reduced_decode_matches_opencv_flags(tmp_path: Path) -> None:
+    path = tmp_path / "a.jpg"
+    cv2.imwrite(str(path), _image())
+    reduced = read_image(path, scale=4, grayscale=True)
+    assert reduced.shape == (16, 24)
+    assert np.array_equal(reduced, cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_4))
+
+
+def test_jpeg_quality_is_configured_centrally() -> None:
+    img = _image()
+    try:
+        configure_codec(jpeg_quality=30)
+        small = encode_image(img, ".jpg").size
+        configure_codec(jpeg_quality=98)
+        large = encode_image(img, ".jpg").size
+    finally:
+        configure_codec(jpeg_quality=image_codec.CodecConfig().jpeg_quality)
+    assert small < large
+
+
+def test_errors(tmp_path: Path) -> None:
+    with pytest.raises(IOError):
+        read_image(tmp_path / "missing.jpg")
+    (tmp_path / "corrupt.jpg").write_bytes(b"not an image")
+    with pytest.raises(IOError, match="Failed to read image"):
+        read_image(tmp_path / "corrupt.jpg")
+    with pytest.raises(IOError):
+        decode_image(b"")
+    with pytest.raises(ValueError):
+        decode_image(b"x", scale=3)
+    with pytest.raises(ValueError):
+        configure_codec(backend="nope")
+    assert "opencv" in image_codec.available_backends()
+    assert image_codec.get_codec("auto").name in image_codec.available_backends()
+
+
+def test_backend_must_implement_decode_and_encode() -> None:
+    class DecodeOnly(image_codec.ImageCodec):
+        name = "decode_only"
+
+        def decode(self, data, *, scale=1, grayscale=False):
+            return None
+
+    # An incomplete backend fails when created, not on its first encode
+    with pytest.raises(TypeError, match="encode"):
+        DecodeOnly()
@@ -0,0 +1,63 @@
+"""Unit tests for the opt-in stage timing instrumentation."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from src.main import instrumentation
+from src.main.distortion_analyser import DistortionAnalyzer
+from src.main.enhancement_strategy import EnhancementPlanner
+from src.main.enhancers_executor import apply_enhancement_plan, default_registry
+from src.main.plan_compiler import compile_plan
+
+
+def test_stages_are_recorded_and_exported(tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    img_path = tmp_path / "a.png"
+    cv2.imwrite(str(img_path), rng.integers(0, 256, size=(32, 40, 3), dtype=np.uint8))
+
+    collector = instrumentation.enable_instrumentation()
+    try:
+        analyzer = DistortionAnalyzer()
+        analyzer.bind_image(path=img_path)
+        metrics = analyzer.analyze()
+        plan = EnhancementPlanner().build_plan(metrics)
+        apply_enhancement_plan(analyzer.frame.image, plan)
+    finally:
+        instrumentation.disable_instrumentation()
+
+    snap = collector.snapshot()
+    expected = {
+        "analysis.decode",
+        "analysis.gray",
+        "analysis.sharpness",
+        "analysis.noise_variance",
+        "analysis.illumination_uniformity",
+        "analysis.overexposure_ratio",
+        "plan.build",
+    } | set(compile_plan(plan, default_registry()).stages)
+    assert expected <= set(snap)
+    assert all(stats["count"] == 1 and stats["histogram"]["+Inf"] == 1 for stats in snap.values())
+
+    collector.write_json(tmp_path / "timings.json")
+    collector.write_prometheus(tmp_path / "timings.prom")
+    assert set(json.loads((tmp_path / "timings.json").read_text())["stages"]) == set(snap)
+    prom = (tmp_path / "timings.prom").read_text()
+    assert 'car_paint_stage_wall_seconds_count{stage="analysis.decode"} 1' in prom
+    assert 'car_paint_stage_wall_seconds_bucket{stage="plan.build",le="+Inf"} 1' in prom
+
+
+def test_disabled_instrumentation_records_nothing() -> None:
+    collector = instrumentation.TimingCollector()
+    assert instrumentation.active_collector() is None
+
+    with instrumentation.timed("ignored"):
+        pass
+    with collector.stage("explicit"):
+        pass
+
+    assert list(collector.snapshot()) == ["explicit"]
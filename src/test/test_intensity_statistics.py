@@ -0,0 +1,44 @@
+"""Unit tests for the fused single-pass intensity statistics."""
+
+from __future__ import annotations
+
+import numpy as np
+
+from src.main.distortion_component import intensity_statistics
+from src.main.distortion_component.intensity_statistics import IntensityStatistics
+
+
+def _make_gray(h: int = 97, w: int = 131, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(h, w), dtype=np.uint8)
+
+
+def test_histogram_statistics_match_numpy() -> None:
+    gray = _make_gray()
+    stats = IntensityStatistics.from_gray(gray)
+
+    assert stats.count == gray.size
+    assert np.isclose(stats.mean, gray.mean())
+    assert np.isclose(stats.variance, gray.var())
+    assert np.isclose(stats.std, gray.std())
+    for threshold in (0, 1, 128, 249.5, 250, 255, 256, 300):
+        assert stats.count_at_least(threshold) == np.count_nonzero(gray >= threshold)
+
+
+def test_histogram_is_exact_across_row_chunks(monkeypatch) -> None:
+    gray = _make_gray(seed=1)
+    monkeypatch.setattr(intensity_statistics, "_EXACT_FLOAT32_COUNT", 500)
+
+    hist = intensity_statistics.intensity_histogram(gray)
+
+    np.testing.assert_array_equal(hist, np.bincount(gray.ravel(), minlength=256))
+
+
+def test_float_plane_falls_back_to_direct_statistics() -> None:
+    gray = _make_gray(seed=2).astype(np.float32) / 255.0
+    stats = IntensityStatistics.from_gray(gray)
+
+    assert stats.histogram is None
+    assert np.isclose(stats.mean, gray.mean(), rtol=1e-5)
+    assert np.isclose(stats.variance, gray.var(), rtol=1e-4)
+    assert stats.count_at_least(0.5) == np.count_nonzero(gray >= 0.5)
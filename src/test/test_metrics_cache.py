@@ -0,0 +1,123 @@
+"""Unit tests for the persistent MetricsCache."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from src.main import metrics_cache
+from src.main.distortion_analyser import DistortionAnalyzer, DistortionMetrics
+from src.main.distortion_component import analysis_frame
+from src.main.metrics_cache import MetricsCache
+
+
+def _write_image(path: Path, seed: int) -> Path:
+    rng = np.random.default_rng(seed)
+    cv2.imwrite(str(path), rng.integers(0, 256, size=(32, 40, 3), dtype=np.uint8))
+    return path
+
+
+@pytest.fixture
+def imread_calls(monkeypatch):
+    calls = []
+    real_read_image = analysis_frame.read_image
+
+    def counting_read_image(*args, **kwargs):
+        calls.append(args[0])
+        return real_read_image(*args, **kwargs)
+
+    monkeypatch.setattr(analysis_frame, "read_image", counting_read_image)
+    return calls
+
+
+def test_cache_hit_skips_decode_and_detects_changes(tmp_path: Path, imread_calls) -> None:
+    img_path = _write_image(tmp_path / "a.png", seed=0)
+    with MetricsCache(tmp_path / "cache.sqlite") as cache:
+        analyzer = DistortionAnalyzer(cache=cache)
+        analyzer.bind_image(path=img_path)
+        first = analyzer.analyze()
+        analyzer.bind_image(path=img_path)
+        second = analyzer.analyze()
+
+        assert len(imread_calls) == 1
+        assert second == first
+
+        # Rewritten file: size/mtime change invalidates the entry
+        _write_image(img_path, seed=1)
+        st = img_path.stat()
+        os.utime(img_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        analyzer.bind_image(path=img_path)
+        analyzer.analyze()
+        assert len(imread_calls) == 2
+
+
+def test_config_change_misses_and_purge_stale(tmp_path: Path, imread_calls) -> None:
+    img_path = _write_image(tmp_path / "a.png", seed=0)
+    with MetricsCache(tmp_path / "cache.sqlite") as cache:
+        for threshold in (250, 200):
+            analyzer = DistortionAnalyzer(overexposure_threshold=threshold, cache=cache)
+            analyzer.bind_image(path=img_path)
+            analyzer.analyze()
+
+        assert len(imread_calls) == 2
+        assert len(cache) == 2
+        assert cache.purge_stale(analyzer.cache_config()) == 1
+        assert cache.get(img_path, analyzer.cache_config()) is not None
+
+
+def test_batch_and_streaming_use_cache(tmp_path: Path, imread_calls) -> None:
+    paths = [_write_image(tmp_path / f"img_{i}.png", seed=i) for i in range(3)]
+    with MetricsCache(tmp_path / "cache.sqlite") as cache:
+        analyzer = DistortionAnalyzer(cache=cache)
+        first = analyzer.analyze_batch(paths, workers=1)
+        assert len(imread_calls) == 3
+
+        second = analyzer.analyze_batch(paths, workers=1)
+        streamed = dict(analyzer.iter_analyze(tmp_path))
+
+        assert len(imread_calls) == 3
+        np.testing.assert_allclose(second.metrics, first.metrics)
+        assert set(streamed) == set(paths)
+
+
+def test_identity_is_captured_before_decoding(tmp_path: Path, monkeypatch) -> None:
+    img_path = _write_image(tmp_path / "a.png", seed=0)
+    hashed = []
+    real_identity = metrics_cache.file_identity
+    monkeypatch.setattr(
+        metrics_cache, "file_identity", lambda path, **kw: hashed.append(path) or real_identity(path, **kw)
+    )
+    real_read_image = analysis_frame.read_image
+
+    def read_then_rewrite(*args, **kwargs):
+        image = real_read_image(*args, **kwargs)
+        # The file changes while the old contents are being analyzed
+        _write_image(img_path, seed=1)
+        st = img_path.stat()
+        os.utime(img_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        return image
+
+    monkeypatch.setattr(analysis_frame, "read_image", read_then_rewrite)
+    with MetricsCache(tmp_path / "cache.sqlite", hash_content=True) as cache:
+        analyzer = DistortionAnalyzer(cache=cache)
+        analyzer.bind_image(path=img_path)
+        analyzer.analyze()
+        assert len(hashed) == 1
+
+        # Stored under the identity of the version that was analyzed, so the new file misses
+        assert len(cache) == 1
+        assert cache.get(img_path, analyzer.cache_config()) is None
+
+
+def test_nan_metrics_are_not_stored(tmp_path: Path) -> None:
+    img_path = _write_image(tmp_path / "a.png", seed=0)
+    with MetricsCache(tmp_path / "cache.sqlite") as cache:
+        cache.put(img_path, "cfg", DistortionMetrics(float("nan"), 1.0, 0.5, 0.0))
+        cache.put_many([(img_path, DistortionMetrics(2.0, 1.0, float("inf"), 0.0))], "other")
+        assert len(cache) == 1
+        assert cache.get(img_path, "cfg") is None
+        assert cache.get(img_path, "other").illumination_uniformity == float("inf")
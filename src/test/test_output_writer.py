@@ -0,0 +1,85 @@
+"""Unit tests for the background output writer."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from src.main import output_writer
+from src.main.output_writer import OutputWriter
+
+
+def _image() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return cv2.GaussianBlur(rng.integers(0, 256, size=(64, 96, 3), dtype=np.uint8), (0, 0), 2)
+
+
+def test_write_uses_configured_parameters_and_leaves_no_temp_files(tmp_path: Path) -> None:
+    img = _image()
+    low, high = tmp_path / "low" / "a.jpg", tmp_path / "high" / "a.jpg"
+    OutputWriter(workers=0, jpeg_quality=40).write(low, img)
+    result = OutputWriter(workers=0, jpeg_quality=98).write(high, img)
+
+    assert result.mode == "encoded" and result.nbytes == high.stat().st_size
+    assert low.stat().st_size < high.stat().st_size
+    assert [p.name for p in high.parent.iterdir()] == ["a.jpg"]
+
+    with pytest.raises(ValueError):
+        OutputWriter(jpeg_quality=101)
+    with pytest.raises(ValueError):
+        OutputWriter(reuse_source="symlink")
+
+
+def test_unchanged_images_reuse_the_source_file(tmp_path: Path) -> None:
+    img = _image()
+    source = tmp_path / "src.png"
+    cv2.imwrite(str(source), img, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+
+    linked = OutputWriter(workers=0).write(tmp_path / "out" / "a.png", img, source=source)
+    assert linked.mode == "linked"
+    assert linked.path.stat().st_ino == source.stat().st_ino
+
+    copied = OutputWriter(workers=0, reuse_source="copy").write(tmp_path / "out" / "b.png", img, source=source)
+    assert copied.mode == "copied"
+    assert copied.path.read_bytes() == source.read_bytes()
+    assert copied.path.stat().st_ino != source.stat().st_ino
+
+    # A different format, or reuse disabled, needs a real encode
+    assert OutputWriter(workers=0).write(tmp_path / "out" / "c.jpg", img, source=source).mode == "encoded"
+    assert OutputWriter(workers=0, reuse_source="off").write(tmp_path / "out" / "d.png", img, source=source).mode == (
+        "encoded"
+    )
+
+
+def test_failed_write_keeps_previous_output(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "a.png"
+    writer = OutputWriter(workers=0)
+    writer.write(path, _image())
+    before = path.read_bytes()
+
+    def broken_replace(src, dst):
+        raise OSError("disk full")
+
+    # Fail after the temporary file was written
+    monkeypatch.setattr(output_writer.os, "replace", broken_replace)
+    with pytest.raises(OSError):
+        writer.write(path, np.zeros_like(_image()))
+    monkeypatch.undo()
+
+    assert path.read_bytes() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["a.png"]
+
+
+def test_submit_runs_in_background_and_reports_errors(tmp_path: Path) -> None:
+    img = _image()
+    (tmp_path / "blocker").write_text("not a directory")
+    with OutputWriter(workers=2, max_pending=2) as writer:
+        futures = [writer.submit(tmp_path / f"{i}.png", img) for i in range(5)]
+        failed = writer.submit(tmp_path / "blocker" / "x.png", img)
+    assert [f.result().mode for f in futures] == ["encoded"] * 5
+    for i in range(5):
+        assert np.array_equal(cv2.imread(str(tmp_path / f"{i}.png")), img)
+    assert isinstance(failed.exception(), OSError)
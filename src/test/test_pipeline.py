@@ -0,0 +1,160 @@
+"""Unit tests for the end-to-end pipeline driver."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from src.main import pipeline
+from src.main.distortion_analyser import DistortionAnalyzer
+from src.main.enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan, EnhancementPlanner
+from src.main.enhancers_executor import apply_enhancement_plan
+
+
+def _make_image(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8), (0, 0), 1 + seed % 3)
+
+
+def _make_tree(root: Path) -> None:
+    (root / "nested" / "deeper").mkdir(parents=True)
+    for i, rel in enumerate(["a.png", "b.png", "nested/c.png", "nested/deeper/d.png"]):
+        cv2.imwrite(str(root / rel), _make_image(i))
+    (root / "nested" / "corrupt.jpg").write_bytes(b"not an image")
+    (root / "notes.txt").write_text("ignored")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pipeline_writes_outputs_and_manifest(tmp_path: Path, workers: int) -> None:
+    src, out = tmp_path / "in", tmp_path / "out"
+    _make_tree(src)
+
+    summary = pipeline.run_pipeline(src, out, workers=workers, log=None)
+    assert (summary.processed, summary.skipped, summary.failed) == (4, 0, 1)
+
+    records = pipeline.load_manifest(out / pipeline.MANIFEST_NAME)
+    assert set(records) == {"a.png", "b.png", "nested/c.png", "nested/deeper/d.png", "nested/corrupt.jpg"}
+    assert records["nested/corrupt.jpg"]["status"] == "error"
+
+    record = records["nested/c.png"]
+    assert set(record["timings_ms"]) == {"decode", "analyze", "plan", "enhance", "encode", "total"}
+    image = cv2.imread(str(src / "nested" / "c.png"))
+    analyzer = DistortionAnalyzer()
+    analyzer.bind_image(image=image)
+    plan = EnhancementPlanner().build_plan(analyzer.analyze())
+    assert record["plan"] == pipeline.plan_to_dict(plan)
+    assert np.array_equal(cv2.imread(str(out / "nested" / "c.png")), apply_enhancement_plan(image, plan))
+
+
+def test_pipeline_resumes_from_truncated_manifest(tmp_path: Path) -> None:
+    src, out = tmp_path / "in", tmp_path / "out"
+    _make_tree(src)
+    pipeline.run_pipeline(src, out, workers=1, log=None)
+
+    # Simulate a kill: keep one finished record plus a half-written line
+    manifest = out / pipeline.MANIFEST_NAME
+    kept = next(line for line in manifest.read_text().splitlines() if json.loads(line)["source"] == "b.png")
+    manifest.write_text(kept + "\n" + '{"source": "a.p')
+
+    summary = pipeline.run_pipeline(src, out, workers=1, log=None)
+    assert (summary.processed, summary.skipped, summary.failed) == (3, 1, 1)
+
+    # Everything is done now except the corrupt file, which is retried
+    assert pipeline.main([str(src), str(out), "--workers", "1"]) == 1
+    assert pipeline.completed_sources(pipeline.load_manifest(manifest), out) == {
+        "a.png",
+        "b.png",
+        "nested/c.png",
+        "nested/deeper/d.png",
+    }
+
+
+def test_pipeline_skips_output_tree_nested_in_input(tmp_path: Path) -> None:
+    src = tmp_path / "in"
+    _make_tree(src)
+    out = src / "enhanced"
+    manifest = src / "logs" / "run.jsonl"
+
+    for _ in range(2):
+        pipeline.run_pipeline(src, out, manifest_path=manifest, workers=1, log=None)
+    records = pipeline.load_manifest(manifest)
+    assert set(records) == {"a.png", "b.png", "nested/c.png", "nested/deeper/d.png", "nested/corrupt.jpg"}
+
+
+def test_pipeline_refuses_scale_without_criteria(tmp_path: Path) -> None:
+    src, out = tmp_path / "in", tmp_path / "out"
+    _make_tree(src)
+
+    # The default CSV only has full-resolution rows
+    with pytest.raises(ValueError, match="scale 2"):
+        pipeline.run_pipeline(src, out, workers=1, scale=2, log=None)
+    assert not out.exists()
+
+
+@pytest.mark.parametrize("frame_megapixels", [1.0, 0.001])
+def test_frame_handoff_matches_process_engine(tmp_path: Path, frame_megapixels: float) -> None:
+    src = tmp_path / "in"
+    _make_tree(src)
+    pipeline.run_pipeline(src, tmp_path / "process", workers=1, log=None)
+
+    # 0.001 MP slots are too small: frames fall back to being pickled
+    summary = pipeline.run_pipeline(
+        src, tmp_path / "frames", workers=2, decode_workers=1, frame_megapixels=frame_megapixels, log=None
+    )
+    assert (summary.processed, summary.failed) == (4, 1)
+
+    records = pipeline.load_manifest(tmp_path / "frames" / pipeline.MANIFEST_NAME)
+    assert records["nested/corrupt.jpg"]["error"].startswith("OSError")
+    assert set(records["a.png"]["timings_ms"]) == {"decode", "analyze", "plan", "enhance", "encode", "total"}
+    for rel in ("a.png", "b.png", "nested/c.png", "nested/deeper/d.png"):
+        assert np.array_equal(cv2.imread(str(tmp_path / "frames" / rel)), cv2.imread(str(tmp_path / "process" / rel)))
+
+
+def test_staged_engine_matches_process_engine(tmp_path: Path) -> None:
+    src = tmp_path / "in"
+    _make_tree(src)
+    pipeline.run_pipeline(src, tmp_path / "process", workers=1, log=None)
+
+    summary = pipeline.run_pipeline(
+        src, tmp_path / "staged", engine="staged", stage_workers={"decode": 2, "enhance": 2}, log=None
+    )
+    assert (summary.processed, summary.failed) == (4, 1)
+    assert [s.name for s in summary.stage_stats] == list(pipeline.STAGE_NAMES)
+    assert {s.name: s.workers for s in summary.stage_stats}["enhance"] == 2
+
+    records = pipeline.load_manifest(tmp_path / "staged" / pipeline.MANIFEST_NAME)
+    assert set(records["a.png"]["timings_ms"]) == set(pipeline.STAGE_NAMES) | {"total"}
+    assert records["nested/corrupt.jpg"]["error"].startswith("OSError")
+    for rel in ("a.png", "b.png", "nested/c.png", "nested/deeper/d.png"):
+        assert np.array_equal(cv2.imread(str(tmp_path / "staged" / rel)), cv2.imread(str(tmp_path / "process" / rel)))
+
+    with pytest.raises(ValueError):
+        pipeline.build_stages(stage_workers={"bogus": 2})
+
+
+@pytest.mark.parametrize("engine", ["process", "staged"])
+def test_unmodified_images_reuse_source_bytes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, engine: str) -> None:
+    src, out = tmp_path / "in", tmp_path / "out"
+    _make_tree(src)
+    original = EnhancementPlanner.build_plan
+
+    def build_plan(self, metrics):
+        plan = original(self, metrics)
+        if plan.sharpness_level.value == "Clear":
+            # Only MARK_AS_LOW_QUALITY: no pixel op
+            return EnhancementPlan(plan.sharpness_level, [EnhancementOp(EnhancementOpType.MARK_AS_LOW_QUALITY)], 1.0)
+        return plan
+
+    monkeypatch.setattr(EnhancementPlanner, "build_plan", build_plan)
+    pipeline.run_pipeline(src, out, workers=1, engine=engine, jpeg_quality=90, log=None)
+
+    records = pipeline.load_manifest(out / pipeline.MANIFEST_NAME)
+    modes = {rel: record["write"] for rel, record in records.items() if record["status"] == "ok"}
+    assert modes == {"a.png": "linked", "b.png": "encoded", "nested/c.png": "encoded", "nested/deeper/d.png": "linked"}
+    assert (out / "a.png").read_bytes() == (src / "a.png").read_bytes()
+    assert (out / "a.png").stat().st_ino == (src / "a.png").stat().st_ino
+    assert not list(out.rglob("*.tmp"))
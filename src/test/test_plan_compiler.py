@@ -0,0 +1,131 @@
+"""Unit tests for the EnhancementPlan compiler."""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+from src.main.buffer_arena import ImageArena
+from src.main.enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan, SharpnessLevel
+from src.main.enhancers_executor import apply_enhancement_plan, default_registry
+from src.main.plan_compiler import compile_plan, compose_kernels
+
+
+def _image() -> np.ndarray:
+    rng = np.random.default_rng(2)
+    return rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+
+
+def _plan(*ops: EnhancementOp) -> EnhancementPlan:
+    return EnhancementPlan(sharpness_level=SharpnessLevel.MODERATE_BLUR, ops=list(ops), quality_penalty=0.0)
+
+
+def test_compose_kernels_matches_sequential_filters() -> None:
+    img = _image().astype(np.float32)
+    registry = default_registry()
+    first = registry.get(EnhancementOpType.DEBLUR).kernel(0.6)
+    second = registry.get(EnhancementOpType.DEBLUR_AGGRESSIVE).kernel(1.0)
+    folded = compose_kernels(first, second)
+    assert folded.shape == (5, 5)
+
+    sequential = cv2.filter2D(cv2.filter2D(img, -1, first), -1, second)
+    fused = cv2.filter2D(img, -1, folded)
+    # Borders differ because each pass reflects the image edge separately
+    assert np.allclose(fused[2:-2, 2:-2], sequential[2:-2, 2:-2], atol=1e-2)
+
+
+def test_compiler_drops_no_ops_and_fuses_point_ops() -> None:
+    plan = _plan(
+        EnhancementOp(EnhancementOpType.DEBLUR, 0.6),
+        EnhancementOp(EnhancementOpType.SHARPEN_MEDIUM, 0.7),
+        EnhancementOp(EnhancementOpType.GAMMA_INCREASE, 0.2),
+        EnhancementOp(EnhancementOpType.MARK_AS_LOW_QUALITY),
+        EnhancementOp(EnhancementOpType.GAMMA_DECREASE, 0.4),
+    )
+    program = compile_plan(plan, default_registry())
+    # DEBLUR and the 13x13 Gaussian unsharp mask are too large to fold profitably
+    assert program.stages == ["enhance.deblur", "enhance.sharpen_medium", "enhance.lut"]
+
+    img = _image()
+    assert np.array_equal(apply_enhancement_plan(img, plan), apply_enhancement_plan(img, plan, debug=True))
+
+
+def test_compiler_folds_small_filters_only_on_request() -> None:
+    plan = _plan(
+        EnhancementOp(EnhancementOpType.DEBLUR, 0.6),
+        EnhancementOp(EnhancementOpType.DEBLUR_AGGRESSIVE, 1.0),
+    )
+    registry = default_registry()
+    assert compile_plan(plan, registry).stages == ["enhance.deblur", "enhance.deblur_aggressive"]
+    assert compile_plan(plan, registry, fuse_filters=True).stages == ["enhance.filter"]
+
+    # A smooth mid-grey image keeps the intermediate result unsaturated
+    img = cv2.GaussianBlur(_image() // 4 + 96, (0, 0), 3)
+    fused = apply_enhancement_plan(img, plan, fuse_filters=True).astype(int)
+    sequential = apply_enhancement_plan(img, plan, debug=True).astype(int)
+    assert np.abs(fused - sequential)[2:-2, 2:-2].max() <= 2
+
+
+def test_default_execution_matches_op_by_op_on_saturating_input() -> None:
+    plan = _plan(
+        EnhancementOp(EnhancementOpType.DEBLUR, 1.0),
+        EnhancementOp(EnhancementOpType.DEBLUR, 0.8),
+    )
+    # High-contrast content: the first pass clips edges to 0 and 255
+    img = cv2.GaussianBlur(_image(), (0, 0), 0.8)
+    img = np.where(img > 127, 255, 0).astype(np.uint8)
+    sequential = apply_enhancement_plan(img, plan, debug=True)
+    assert np.array_equal(apply_enhancement_plan(img, plan), sequential)
+
+    # Folding skips that clipping, so the opt-in fused result diverges
+    fused = apply_enhancement_plan(img, plan, fuse_filters=True)
+    assert np.abs(fused.astype(int) - sequential.astype(int))[2:-2, 2:-2].max() > 50
+
+
+def test_luminance_runs_share_one_conversion() -> None:
+    plan = _plan(
+        EnhancementOp(EnhancementOpType.GAMMA_INCREASE, 0.2),
+        EnhancementOp(EnhancementOpType.MARK_AS_LOW_QUALITY),
+        EnhancementOp(EnhancementOpType.SHARPEN_LIGHT, 0.5),
+        EnhancementOp(EnhancementOpType.DENOISE_LIGHT, 0.3),
+        EnhancementOp(EnhancementOpType.GAMMA_DECREASE, 0.4),
+        EnhancementOp(EnhancementOpType.DENOISE_LIGHT, 0.3),
+        EnhancementOp(EnhancementOpType.DEBLUR, 0.6),
+        EnhancementOp(EnhancementOpType.CLAHE, 1.0),
+    )
+    program = compile_plan(plan, default_registry(), luminance=True)
+    # A lone point op stays a BGR LUT pass; runs with CLAHE use its LAB space
+    assert program.stages == [
+        "enhance.luminance_ycrcb",
+        "enhance.denoise_light",
+        "enhance.gamma_decrease",
+        "enhance.denoise_light",
+        "enhance.luminance_lab",
+    ]
+
+
+def test_luminance_run_only_touches_luma() -> None:
+    plan = _plan(
+        EnhancementOp(EnhancementOpType.GAMMA_INCREASE, 0.2),
+        EnhancementOp(EnhancementOpType.SHARPEN_LIGHT, 0.5),
+        EnhancementOp(EnhancementOpType.DEBLUR, 0.6),
+    )
+    registry = default_registry()
+    img = cv2.GaussianBlur(_image(), (0, 0), 2)
+    result = apply_enhancement_plan(img, plan, luminance=True)
+
+    ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
+    y = ycrcb[:, :, 0]
+    for op in plan.ops:
+        y = registry.get(op.type).apply(y, op.strength)
+    ycrcb[:, :, 0] = y
+    assert np.array_equal(result, cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR))
+
+    arena = ImageArena()
+    assert np.array_equal(apply_enhancement_plan(img, plan, luminance=True, arena=arena), result)
+
+
+def test_luminance_mode_keeps_clahe_result() -> None:
+    plan = _plan(EnhancementOp(EnhancementOpType.CLAHE, 1.0))
+    img = _image()
+    assert np.array_equal(apply_enhancement_plan(img, plan, luminance=True), apply_enhancement_plan(img, plan))
@@ -0,0 +1,54 @@
+"""Unit tests for gamma lookup tables and point-operation composition."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.main.enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan, SharpnessLevel
+from src.main.enhancers_executor import apply_enhancement_plan, default_registry
+from src.main.enhancers_tone_localcontrast import GammaAdjustEnhancer
+from src.main.point_ops import IDENTITY_LUT, apply_lut, compose_luts
+
+
+def _image() -> np.ndarray:
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 256, size=(30, 36, 3), dtype=np.uint8)
+
+
+def test_gamma_table_is_rounded_and_memoized() -> None:
+    enhancer = GammaAdjustEnhancer()
+    table = enhancer.lut(0.4)
+    inv_gamma = 1.0 / (1.0 - 0.5 * 0.4)
+    expected = [min(255, max(0, round((i / 255.0) ** inv_gamma * 255))) for i in range(256)]
+    assert table.tolist() == expected
+    assert enhancer.lut(0.4000001) is table
+    assert GammaAdjustEnhancer().lut(0.0).tolist() == IDENTITY_LUT.tolist()
+
+
+def test_composed_luts_match_sequential_application() -> None:
+    img = _image()
+    enhancer = GammaAdjustEnhancer()
+    first, second = enhancer.lut(0.5), enhancer.lut(-0.7)
+    sequential = apply_lut(apply_lut(img, first), second)
+    assert np.array_equal(apply_lut(img, compose_luts([first, second])), sequential)
+    assert compose_luts([]) is IDENTITY_LUT
+    with pytest.raises(ValueError):
+        compose_luts([np.zeros(10, dtype=np.uint8)])
+
+
+def test_plan_collapses_point_ops() -> None:
+    img = _image()
+    ops = [
+        EnhancementOp(EnhancementOpType.DEBLUR, 0.6),
+        EnhancementOp(EnhancementOpType.GAMMA_INCREASE, 0.2),
+        EnhancementOp(EnhancementOpType.MARK_AS_LOW_QUALITY),
+        EnhancementOp(EnhancementOpType.GAMMA_DECREASE, 0.5),
+    ]
+    plan = EnhancementPlan(sharpness_level=SharpnessLevel.CLEAR, ops=ops, quality_penalty=0.0)
+
+    registry = default_registry()
+    expected = img
+    for op in ops:
+        expected = registry.apply(op, expected)
+    assert np.array_equal(apply_enhancement_plan(img, plan), expected)
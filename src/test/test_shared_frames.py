@@ -0,0 +1,70 @@
+"""Unit tests for the shared-memory frame pool."""
+
+from __future__ import annotations
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.main.shared_frames import FrameHandle, SharedFramePool
+
+
+def _image(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(48, 64, 3), dtype=np.uint8)
+
+
+def _invert_worker(pool: SharedFramePool, inbox, outbox) -> None:
+    # Runs in a child process: reads a frame and publishes a new one
+    handle = inbox.get()
+    out_handle, out = pool.allocate(handle.shape, handle.dtype)
+    np.subtract(255, pool.view(handle), out=out)
+    pool.release(handle)
+    outbox.put(out_handle)
+
+
+def test_allocate_view_and_recycle() -> None:
+    with SharedFramePool(slot_bytes=_image().nbytes, slots=2) as pool:
+        image = _image()
+        handle = pool.put(image)
+        assert isinstance(handle, FrameHandle) and handle.nbytes == image.nbytes
+        assert np.array_equal(pool.view(handle), image)
+
+        pool.retain(handle)
+        assert pool.refcount(handle) == 2
+        pool.release(handle)
+        pool.release(handle)
+        assert pool.refcount(handle) == 0 and pool.in_use == 0
+        with pytest.raises(ValueError):
+            pool.view(handle)
+
+        # Both slots in use: allocate() times out instead of overwriting
+        first, second = pool.put(image), pool.put(image)
+        with pytest.raises(TimeoutError):
+            pool.allocate(image.shape, timeout=0.01)
+        pool.release(first)
+        third = pool.put(_image(1))
+        assert third.slot == first.slot and third.generation == first.generation + 1
+        for h in (second, third):
+            pool.release(h)
+
+        with pytest.raises(ValueError):
+            pool.allocate((1000, 1000, 3))
+
+
+def test_frames_cross_process_boundaries() -> None:
+    ctx = multiprocessing.get_context()
+    image = _image()
+    with SharedFramePool(slot_bytes=image.nbytes, slots=2, context=ctx) as pool:
+        inbox, outbox = ctx.Queue(), ctx.Queue()
+        worker = ctx.Process(target=_invert_worker, args=(pool, inbox, outbox))
+        worker.start()
+        inbox.put(pool.put(image))
+        result = outbox.get(timeout=30)
+        worker.join(timeout=30)
+
+        assert worker.exitcode == 0
+        assert np.array_equal(pool.view(result), 255 - image)
+        pool.release(result)
+        assert pool.in_use == 0
@@ -0,0 +1,78 @@
+"""Unit tests for the staged producer/consumer pipeline engine."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from src.main.staged_pipeline import Stage, StagedPipeline
+
+
+def test_stages_run_in_sequence_and_report_failures() -> None:
+    def check(x: int) -> int:
+        if x == 6:
+            raise ValueError("bad item")
+        return x
+
+    engine = StagedPipeline(
+        [Stage("double", lambda x: 2 * x, workers=2), Stage("check", check), Stage("inc", lambda x: x + 1, workers=3)],
+        queue_size=2,
+    )
+    outcomes = list(engine.run(range(10)))
+
+    assert len(outcomes) == 10
+    assert sorted(o.value for o in outcomes if o.ok) == [2 * x + 1 for x in range(10) if x != 3]
+    (failed,) = [o for o in outcomes if not o.ok]
+    # A failed item skips the remaining stages and keeps its last good value
+    assert (failed.value, failed.stage, failed.error) == (6, "check", "ValueError: bad item")
+
+    stats = {s.name: s for s in engine.stats()}
+    assert [(s.items, s.failed) for s in stats.values()] == [(10, 0), (10, 1), (9, 0)]
+    assert all(0.0 <= s.utilization <= 1.0 for s in stats.values())
+
+
+def test_bounded_queues_limit_items_in_flight() -> None:
+    produced = 0
+    in_flight = []
+    lock = threading.Lock()
+
+    def source():
+        nonlocal produced
+        for i in range(40):
+            with lock:
+                produced += 1
+            yield i
+
+    def slow(x: int) -> int:
+        time.sleep(0.002)
+        with lock:
+            in_flight.append(produced - x)
+        return x
+
+    engine = StagedPipeline([Stage("fast", lambda x: x, workers=2), Stage("slow", slow)], queue_size=3)
+    assert len(list(engine.run(source()))) == 40
+
+    # Items read ahead of the slow stage: its queue, the fast stage's queue
+    # and workers, the source's pending put and the output queue
+    assert max(in_flight) <= 3 + 3 + 2 + 1 + 3 + 1
+    fast, slow_stats = engine.stats()
+    assert slow_stats.utilization > fast.utilization
+    assert fast.wait_output_s > 0
+    assert "slow" in engine.report()
+
+
+def test_closing_early_cancels_workers() -> None:
+    engine = StagedPipeline([Stage("id", lambda x: x, workers=2)], queue_size=1)
+    run = engine.run(iter(range(10_000)))
+    assert next(run).ok
+    run.close()
+    assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+
+def test_invalid_configuration() -> None:
+    with pytest.raises(ValueError):
+        StagedPipeline([])
+    with pytest.raises(ValueError):
+        StagedPipeline([Stage("x", lambda x: x, workers=0)])
@@ -0,0 +1,66 @@
+"""Unit tests for tiled, multi-threaded enhancer execution."""
+
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+from src.main.enhancement_strategy import EnhancementOp, EnhancementOpType, EnhancementPlan, SharpnessLevel
+from src.main.enhancers_denoise import DenoiseLightEnhancer, DenoiseStrongEnhancer
+from src.main.enhancers_executor import apply_enhancement_plan
+from src.main.enhancers_sharpen_deblur import DeblurEnhancer, SharpenMediumEnhancer
+from src.main.enhancers_tone_localcontrast import CLAHEEnhancer
+from src.main.tiled_executor import apply_tiled, iter_tiles, tiled_registry
+
+
+def _image() -> np.ndarray:
+    rng = np.random.default_rng(5)
+    img = cv2.GaussianBlur(rng.integers(0, 256, size=(90, 130, 3), dtype=np.uint8), (0, 0), 1.0)
+    return cv2.add(img, rng.integers(0, 24, size=img.shape, dtype=np.uint8))
+
+
+def test_tiles_cover_image_once() -> None:
+    covered = np.zeros((50, 70), dtype=int)
+    for rows, cols, core_rows, core_cols in iter_tiles(50, 70, 16, 3):
+        covered[rows, cols][core_rows, core_cols] += 1
+    assert (covered == 1).all()
+    with pytest.raises(ValueError):
+        list(iter_tiles(10, 10, 0, 1))
+
+
+@pytest.mark.parametrize(
+    "enhancer, strength",
+    [
+        (DenoiseStrongEnhancer(), 0.8),
+        (SharpenMediumEnhancer(), 0.7),
+        (DeblurEnhancer(), 0.6),
+        (CLAHEEnhancer(), 1.0),
+    ],
+)
+def test_tiled_output_is_identical(enhancer, strength) -> None:
+    img = _image()
+    expected = enhancer.apply(img, strength)
+    assert np.array_equal(apply_tiled(enhancer, img, strength, tile_size=32, workers=3), expected)
+
+
+def test_bilateral_differs_by_float_rounding_only() -> None:
+    img = _image()
+    enhancer = DenoiseLightEnhancer()
+    diff = np.abs(apply_tiled(enhancer, img, 0.5, tile_size=32).astype(int) - enhancer.apply(img, 0.5))
+    assert diff.max() <= 1 and (diff > 0).mean() < 1e-3
+
+
+def test_tiled_registry_matches_default_plan() -> None:
+    plan = EnhancementPlan(
+        sharpness_level=SharpnessLevel.MODERATE_BLUR,
+        ops=[
+            EnhancementOp(EnhancementOpType.DENOISE_STRONG, 0.8),
+            EnhancementOp(EnhancementOpType.SHARPEN_LIGHT, 0.5),
+            EnhancementOp(EnhancementOpType.CLAHE, 1.0),
+        ],
+        quality_penalty=0.0,
+    )
+    img = _image()
+    registry = tiled_registry(tile_size=40, workers=2)
+    assert np.array_equal(apply_enhancement_plan(img, plan, registry=registry), apply_enhancement_plan(img, plan))